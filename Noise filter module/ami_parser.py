@@ -18,6 +18,11 @@ from dataclasses import dataclass
 
 import pandas as pd
 
+from parse_cache import cached_chunks
+from tracing import current_span, traced
+
+PARSER_VERSION = "1"    # bump whenever chunk output changes, so cached parses are rebuilt
+
 # ---------------------------------------------------------------------------
 # Boilerplate patterns to strip from meeting transcripts
 # ---------------------------------------------------------------------------
@@ -182,10 +187,37 @@ def parse_ami_transcript(meeting_obj: dict) -> List[dict]:
     return chunks
 
 
+def _load_meetings_file(path: Path, source_type: str, n: Optional[int]) -> list:
+    if source_type == "json" or str(path).endswith(".json"):
+        return load_ami_from_json(path, n=n)
+    if source_type == "csv" or str(path).endswith(".csv"):
+        # If CSV format: load with pandas and convert to dict format
+        return pd.read_csv(path, nrows=n).to_dict("records")
+    raise ValueError(f"Unknown source_type: {source_type}")
+
+
+def _meetings_to_chunks(meetings: list) -> List[dict]:
+    # Parse all meetings
+    all_chunks = []
+    for meeting in meetings:
+        if isinstance(meeting, dict):
+            meeting_chunks = parse_ami_transcript(meeting)
+        else:
+            # Assume it's a HuggingFace dataset row (convert to dict)
+            meeting_chunks = parse_ami_transcript(dict(meeting))
+        all_chunks.extend(meeting_chunks)
+    current_span().set(meetings=len(meetings))
+
+    # Deduplicate by content
+    return deduplicate_chunks(all_chunks)
+
+
+@traced("parse.ami")
 def parse_to_chunks(
     data_source: str | Path | List[dict],
     source_type: str = "json",
-    n: Optional[int] = None
+    n: Optional[int] = None,
+    use_cache: Optional[bool] = None,
 ) -> List[dict]:
     """
     Full AMI pipeline: load → parse → deduplicate.
@@ -194,47 +226,32 @@ def parse_to_chunks(
         data_source: Path to JSON file, path to CSV, or list of meeting dicts
         source_type: "json", "csv", or "huggingface"
         n: If set, only load first n meetings
+        use_cache: Reuse / write the parse cache for file sources
+            (see parse_cache.py; default PARSE_CACHE)
     
     Returns:
         List of raw chunk dicts ready for classification
     """
-    meetings = []
-    
     if isinstance(data_source, str):
         data_source = Path(data_source)
     
     if isinstance(data_source, Path):
-        if source_type == "json" or str(data_source).endswith(".json"):
-            meetings = load_ami_from_json(data_source, n=n)
-        elif source_type == "csv" or str(data_source).endswith(".csv"):
-            # If CSV format: load with pandas and convert to dict format
-            df = pd.read_csv(data_source, nrows=n)
-            meetings = df.to_dict("records")
-        else:
-            raise ValueError(f"Unknown source_type: {source_type}")
+        path = data_source
+        unique_chunks, cache = cached_chunks(
+            "ami", PARSER_VERSION, path, lambda: _meetings_to_chunks(_load_meetings_file(path, source_type, n)),
+            options={"n": n, "source_type": source_type}, use_cache=use_cache,
+        )
+        current_span().set(cache=cache)
     elif source_type == "huggingface":
-        meetings = load_ami_from_huggingface(n=n)
+        unique_chunks = _meetings_to_chunks(load_ami_from_huggingface(n=n))
     elif isinstance(data_source, list):
-        meetings = data_source[:n] if n else data_source
+        unique_chunks = _meetings_to_chunks(data_source[:n] if n else data_source)
     else:
         raise ValueError("data_source must be a path, list, or 'huggingface' source_type")
     
-    # Parse all meetings
-    all_chunks = []
-    for meeting in meetings:
-        if isinstance(meeting, dict):
-            meeting_chunks = parse_ami_transcript(meeting)
-        else:
-            # Assume it's a HuggingFace dataset row (convert to dict)
-            meeting_chunks = parse_ami_transcript(dict(meeting))
-        all_chunks.extend(meeting_chunks)
-    
-    # Deduplicate by content
-    unique_chunks = deduplicate_chunks(all_chunks)
-    
+    current_span().set(chunks=len(unique_chunks))
     return unique_chunks
 
-
 if __name__ == "__main__":
     import sys
     
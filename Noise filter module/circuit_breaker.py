@@ -0,0 +1,153 @@
+"""
+circuit_breaker.py
+Process-wide circuit breaker for LLM provider calls.
+After BREAKER_FAILURE_THRESHOLD consecutive failures (connection errors,
+timeouts, 5xx) the breaker opens and every call is refused immediately with
+CircuitOpenError instead of sleeping through retries. After
+BREAKER_RESET_TIMEOUT_S one probe call is let through (half-open): success
+closes the breaker and runs the on_close callbacks, failure opens it again.
+
+The classifier and brd_pipeline share one breaker per provider
+(get_circuit_breaker(GROQ_BREAKER)), so an outage seen by either trips both.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+BREAKER_FAILURE_THRESHOLD = 5     # consecutive failures that open the breaker
+BREAKER_RESET_TIMEOUT_S = 30.0    # open → half-open after this long
+GROQ_BREAKER = "groq"
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of making a call while the breaker is open."""
+
+
+class CircuitBreaker:
+    """Closed → open after consecutive failures; open → half-open after a cool-down."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: Optional[int] = None,
+        reset_timeout_s: Optional[float] = None,
+        clock=time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = BREAKER_FAILURE_THRESHOLD if failure_threshold is None else failure_threshold
+        self.reset_timeout_s = BREAKER_RESET_TIMEOUT_S if reset_timeout_s is None else reset_timeout_s
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0          # consecutive
+        self._opened_at = 0.0
+        self._probe_out = False     # half-open: one trial call at a time
+        self._on_close: list[Callable[[], None]] = []
+        self.trips = 0
+        self.short_circuited = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state_locked()
+
+    def _state_locked(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout_s:
+            self._state = HALF_OPEN
+            self._probe_out = False
+        return self._state
+
+    def allow(self) -> bool:
+        """True if a call may go out now; a refused call is counted as short-circuited."""
+        with self._lock:
+            state = self._state_locked()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._probe_out:
+                self._probe_out = True
+                return True
+            self.short_circuited += 1
+            return False
+
+    def check(self):
+        """allow(), raising CircuitOpenError when the call is refused."""
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} circuit breaker is open")
+
+    def record_success(self):
+        with self._lock:
+            reopened = self._state != CLOSED
+            self._state = CLOSED
+            self._failures = 0
+            self._probe_out = False
+            callbacks = list(self._on_close) if reopened else []
+        if reopened:
+            logger.warning(f"{self.name} circuit breaker closed; provider calls resumed")
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"{self.name} circuit breaker on_close callback failed: {e}")
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            state = self._state_locked()
+            if state == HALF_OPEN or (state == CLOSED and self._failures >= self.failure_threshold):
+                self._state = OPEN
+                self._opened_at = self._clock()
+                self._probe_out = False
+                self.trips += 1
+                tripped = True
+            else:
+                tripped = False
+            failures = self._failures
+        if tripped:
+            logger.warning(f"{self.name} circuit breaker open after {failures} consecutive failures; "
+                           f"short-circuiting calls for {self.reset_timeout_s:.0f}s")
+
+    def record_abandoned(self):
+        """A call that ended without an outcome (e.g. cancelled); frees the half-open probe slot."""
+        with self._lock:
+            self._probe_out = False
+
+    def on_close(self, callback: Callable[[], None]):
+        """Run callback() (on the closing caller's thread) whenever the breaker closes again."""
+        with self._lock:
+            self._on_close.append(callback)
+
+    def reset(self):
+        """Force the breaker closed without running callbacks (tests, manual override)."""
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._probe_out = False
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                "state": self._state_locked(),
+                "consecutive_failures": self._failures,
+                "trips": self.trips,
+                "short_circuited": self.short_circuited,
+            }
+
+
+_BREAKERS: dict[str, CircuitBreaker] = {}
+_BREAKERS_LOCK = threading.Lock()
+
+
+def get_circuit_breaker(key: str = GROQ_BREAKER) -> CircuitBreaker:
+    """Process-wide breaker per provider, shared by every caller in this process."""
+    with _BREAKERS_LOCK:
+        if key not in _BREAKERS:
+            _BREAKERS[key] = CircuitBreaker(key)
+        return _BREAKERS[key]
@@ -1,44 +1,46 @@
 """
 classifier.py
 Two-phase parallel pipeline:
-  Phase 1 — parallel heuristic/domain-gate (8 threads, CPU-bound regex)
-  Phase 2 — batch LLM calls (batch=10, 2 concurrent, rate-safe)
+  Phase 1 — heuristic/domain-gate (serial, or sharded across processes for large inputs)
+  Phase 2 — batch LLM calls on asyncio (token-budgeted batches, continuously paced to the RPM/TPM quota)
 """
 
 from __future__ import annotations
 
 import json
+import queue
+import asyncio
+import inspect
+import contextlib
+import contextvars
 import os
 import re
 import time
 import logging
 import threading
+from dataclasses import asdict, dataclass
 from typing import Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from groq import Groq, APIConnectionError, RateLimitError, APIStatusError
+from groq import APIConnectionError, RateLimitError, APIStatusError, BadRequestError
 
-logging.basicConfig(
-    filename="pipeline_debug.log",
-    level=logging.DEBUG,
-    format="%(asctime)s | %(message)s"
+from prompts import (
+    build_classification_prompt, build_batch_classification_prompt, format_batch_chunk,
+    VALID_LABELS, PROMPT_VERSION,
+    COMPACT_SYSTEM_PROMPT, COMPACT_PROMPT_VERSION, LABEL_CODES,
+    build_compact_batch_prompt, build_compact_reasoning_prompt, format_compact_chunk,
 )
-
-def log_chunk_decision(chunk, path, label, confidence, reasoning):
-    logging.debug(
-        f"\n{'='*60}"
-        f"\nPATH: {path}"
-        f"\nSPEAKER: {chunk.get('speaker', 'Unknown')}"
-        f"\nSOURCE: {chunk.get('source_ref', '')}"
-        f"\nTEXT: {chunk.get('cleaned_text', '')[:150]}"
-        f"\nLABEL: {label}"
-        f"\nCONFIDENCE: {confidence}"
-        f"\nREASONING: {reasoning}"
-        f"\n{'='*60}"
-    )
-
-from prompts import build_classification_prompt, build_batch_classification_prompt, VALID_LABELS
 from schema import ClassifiedChunk, SignalLabel
+from decision_log import log_chunk_decision
+from llm_cache import ClassificationCache, LLM_FAILURE_REASONING, DEGRADED_REASONING
+from local_model import load_latest_model, classify_locally
+from near_dedup import collapse_near_duplicates
+from process_pool import spawn_pool
+from run_journal import RunJournal
+from hedging import Deadline, LatencyTracker, get_latency_tracker, hedged_call
+from circuit_breaker import CircuitOpenError, CLOSED, OPEN, get_circuit_breaker
+from provider_pool import AsyncProviderPool, make_async_client
+from rate_limiter import RateLimitScheduler, get_scheduler, approx_tokens, parse_reset_duration
+from tracing import current_span, span
 
 # ---------------------------------------------------------------------------
 # Heuristic rules (fast path — no API call needed)
@@ -131,6 +133,84 @@ _DISAGREEMENT = re.compile(
 _MIN_WORD_COUNT = 4  # Very short chunks are usually noise unless they contain keywords
 
 
+# ---------------------------------------------------------------------------
+# Compiled heuristic engine
+# ---------------------------------------------------------------------------
+# Every rule above can only match where one of its trigger keywords occurs.
+# A chunk is case-folded once and each rule's regex runs only to confirm a
+# keyword hit, so rules that cannot match (the common case) cost a substring
+# search instead of a backtracking scan.  Each rule is evaluated at most once.
+# A rule whose regex can match on a bare two-letter syllable (_MEETING_LOGISTICS:
+# "um", "uh", "er") has triggers that occur in nearly every chunk, so it is
+# left ungated (no triggers) and its regex simply runs.
+
+# Non-ASCII code points that re.IGNORECASE equates with ASCII letters but
+# str.lower() does not fold onto them. Applied before lower(), which would
+# turn "\u0130" into "i" + a combining dot.
+_REGEX_CASE_FOLD = str.maketrans({"\u0130": "i", "\u0131": "i", "\u017f": "s", "\u212a": "k"})
+
+_HEURISTIC_RULES: tuple[tuple[str, re.Pattern, tuple[str, ...]], ...] = (
+    ("system_mail", _SYSTEM_MAIL_PATTERNS, (
+        "delivery status notification", "out of office", "auto",
+        "undeliverable", "mailer-daemon", "postmaster",
+    )),
+    ("crosstalk", _CROSSTALK, (
+        "[crosstalk]", "[laughter]", "[inaudible]", "[pause]", "[silence]",
+        "[break]", "cross talk", "background noise",
+    )),
+    ("strict_meeting", _STRICT_MEETING, (
+        "dial-in", "webex", "zoom", "lunch", "room", "calendar invite",
+    )),
+    ("weak_meeting", _WEAK_MEETING, (
+        "meeting", "schedule", "calendar", "invite", "monday", "tuesday",
+        "wednesday", "thursday", "friday", "at ",
+    )),
+    ("meeting_logistics", _MEETING_LOGISTICS, ()),
+    ("project_timeline", _PROJECT_TIMELINE, (
+        "deadline", "milestone", "phase ", "go-live", "launch date",
+        "code freeze", "deliverable",
+    )),
+)
+
+# Thresholds in apply_heuristics never exceed 50 words, so counting stops there.
+_WORD_COUNT_CAP = 50
+
+
+def _rule_hits(text: str, rules=_HEURISTIC_RULES) -> set[str]:
+    folded = (text if text.isascii() else text.translate(_REGEX_CASE_FOLD)).lower()
+    hits = set()
+    for name, pattern, triggers in rules:
+        if not triggers:
+            if pattern.search(text):
+                hits.add(name)
+            continue
+        for trigger in triggers:
+            if trigger in folded:
+                if pattern.search(text):
+                    hits.add(name)
+                break
+    return hits
+
+
+def scan_heuristics(text: str, speaker: str = "") -> tuple[frozenset[str], int]:
+    """
+    Evaluate every heuristic rule against a chunk, each at most once.
+    Returns:
+      - hits: names of the rules that match (see _HEURISTIC_RULES, plus
+        "social_noise" for short pleasantries)
+      - word_count: number of words, capped at _WORD_COUNT_CAP + 1
+    """
+    hits = _rule_hits(text)
+    if speaker and "system_mail" not in hits:
+        hits |= _rule_hits(speaker, _HEURISTIC_RULES[:1])  # system_mail only
+
+    word_count = len(text.split(maxsplit=_WORD_COUNT_CAP))
+    if word_count < 10 and _SOCIAL_NOISE.match(text.strip()):
+        hits.add("social_noise")
+
+    return frozenset(hits), word_count
+
+
 def apply_heuristics(chunk: dict) -> Optional[str]:
     """
     Fast-path rule-based classification.
@@ -139,47 +219,35 @@ def apply_heuristics(chunk: dict) -> Optional[str]:
       - "timeline_reference": if confident it's a PROJECT deadline
       - None: inconclusive, send to LLM
     """
-    text = chunk.get("cleaned_text", "")
-    speaker = chunk.get("speaker", "")
-    word_count = len(text.split())
+    hits, word_count = scan_heuristics(
+        chunk.get("cleaned_text", ""), chunk.get("speaker", "")
+    )
+    is_timeline = "project_timeline" in hits
 
-    # System-generated mail (email specific)
-    if _SYSTEM_MAIL_PATTERNS.search(text) or _SYSTEM_MAIL_PATTERNS.search(speaker):
+    # System-generated mail, pure crosstalk / unintelligible, or short
+    # generic social noise — always noise
+    if "system_mail" in hits or "crosstalk" in hits or "social_noise" in hits:
         return "noise"
 
-    # Pure crosstalk / unintelligible (meeting-specific) — always noise
-    if _CROSSTALK.search(text):
+    # Meeting logistics + filler — noise if short
+    if "meeting_logistics" in hits and word_count < 30 and not is_timeline:
         return "noise"
 
-    # Pure social noise (short & generic)
-    if word_count < 10 and _SOCIAL_NOISE.match(text.strip()):
-        return "noise"
-    
-    # Meeting logistics + filler — noise if short
-    if _MEETING_LOGISTICS.search(text):
-        if word_count < 30:
-            if not _PROJECT_TIMELINE.search(text):
-                return "noise"
-        
     # Strict Meeting patterns → Always Noise (e.g. "dial-in details")
-    if _STRICT_MEETING.search(text):
-         if not _PROJECT_TIMELINE.search(text):
-            return "noise"
+    if "strict_meeting" in hits and not is_timeline:
+        return "noise"
 
     # Weak Meeting patterns → Noise ONLY if short (< 50 words)
     # This prevents killing "Let's discuss the requirements in the meeting on Monday..."
-    if _WEAK_MEETING.search(text):
-        if word_count < 50:
-            # Double check it's NOT a project deadline
-            if not _PROJECT_TIMELINE.search(text):
-                return "noise"
+    if "weak_meeting" in hits and word_count < 50 and not is_timeline:
+        return "noise"
 
     # Ultra-short junk
     if word_count < _MIN_WORD_COUNT:
         return "noise"
 
     # Project deadlines → Timeline
-    if _PROJECT_TIMELINE.search(text):
+    if is_timeline:
         return "timeline_reference"
 
     return None  # inconclusive — send to LLM
@@ -219,31 +287,94 @@ def _classify_single_heuristic(item: tuple[int, dict]) -> tuple[int, dict, Optio
         return (idx, chunk, None, "LLM_PENDING")
 
 
-def run_parallel_heuristics(chunks: list[dict]) -> tuple[dict[int, dict], list[tuple[int, dict]]]:
+# Process-pool sharding. Regex work is GIL-bound, so threads don't help;
+# worker processes do once the input is big enough to amortise their startup.
+HEURISTIC_WORKERS = 1                 # 1 → serial; 0 → one per CPU core
+HEURISTIC_SHARD_SIZE = 5000           # chunks per task sent to a worker
+MIN_CHUNKS_FOR_PROCESS_POOL = 20000   # smaller inputs always run serially
+
+
+def _classify_heuristic_shard(shard: list[tuple[str, str]]) -> list[tuple[Optional[str], str]]:
+    """
+    Worker entry point: classify one shard of (cleaned_text, speaker) pairs.
+    Returns [(label_or_None, path), ...] in shard order.
+    """
+    out = []
+    for text, speaker in shard:
+        _, _, label, path = _classify_single_heuristic(
+            (0, {"cleaned_text": text, "speaker": speaker})
+        )
+        out.append((label, path))
+    return out
+
+
+def _iter_heuristic_decisions(
+    chunks: list[dict],
+    workers: int,
+    shard_size: int,
+):
+    """Yield (index, chunk, label_or_None, path) in original order."""
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(chunks) < max(MIN_CHUNKS_FOR_PROCESS_POOL, 2 * shard_size):
+        for item in enumerate(chunks):
+            yield _classify_single_heuristic(item)
+        return
+
+    # Ship only the two fields the rules read; results come back as
+    # (label, path) so chunk dicts never cross the process boundary twice.
+    shards = [
+        [(c.get("cleaned_text", ""), c.get("speaker", "")) for c in chunks[i:i + shard_size]]
+        for i in range(0, len(chunks), shard_size)
+    ]
+    with spawn_pool(min(workers, len(shards))) as executor:
+        idx = 0
+        # map() yields shard results in submission order
+        for shard_result in executor.map(_classify_heuristic_shard, shards):
+            for label, path in shard_result:
+                yield idx, chunks[idx], label, path
+                idx += 1
+
+
+def run_parallel_heuristics(
+    chunks: list[dict],
+    workers: Optional[int] = None,
+    shard_size: Optional[int] = None,
+) -> tuple[dict[int, dict], list[tuple[int, dict]]]:
     """
-    Run heuristics on all chunks (direct loop — pure CPU/regex, GIL-bound).
+    Run heuristics + domain gate on all chunks.
+    Serial by default; with workers > 1 (or 0 for every core) and at least
+    MIN_CHUNKS_FOR_PROCESS_POOL chunks, the list is sharded across worker
+    processes and merged back in original index order.
     Returns:
       - fast_results: {index → result_dict} for heuristic-decided chunks
       - llm_pending:  [(index, chunk), ...] for chunks needing LLM
     """
+    if workers is None:
+        workers = HEURISTIC_WORKERS
     fast_results: dict[int, dict] = {}
     llm_pending: list[tuple[int, dict]] = []
-
-    for i, chunk in enumerate(chunks):
-        idx, chunk, label, path = _classify_single_heuristic((i, chunk))
-        if label is None:
-            llm_pending.append((idx, chunk))
-        else:
-            log_chunk_decision(chunk, path, label, 1.0,
-                               "Classified by heuristic rule." if path == "HEURISTIC"
-                               else "No project-relevant domain terms detected.")
-            fast_results[idx] = {
-                "label": label,
-                "confidence": 1.0,
-                "reasoning": ("Classified by heuristic rule." if path == "HEURISTIC"
-                              else "No project-relevant domain terms detected."),
-                "flagged_for_review": False,
-            }
+    paths: dict[str, int] = {}
+
+    with span("classify.heuristics", chunks=len(chunks), workers=workers) as s:
+        for idx, chunk, label, path in _iter_heuristic_decisions(
+            chunks, workers, shard_size or HEURISTIC_SHARD_SIZE
+        ):
+            if label is None:
+                llm_pending.append((idx, chunk))
+            else:
+                paths[path] = paths.get(path, 0) + 1
+                log_chunk_decision(chunk, path, label, 1.0,
+                                   "Classified by heuristic rule." if path == "HEURISTIC"
+                                   else "No project-relevant domain terms detected.")
+                fast_results[idx] = {
+                    "label": label,
+                    "confidence": 1.0,
+                    "reasoning": ("Classified by heuristic rule." if path == "HEURISTIC"
+                                  else "No project-relevant domain terms detected."),
+                    "flagged_for_review": False,
+                }
+        s.set(heuristic=paths.get("HEURISTIC", 0), domain_gate=paths.get("DOMAIN_GATE", 0),
+              llm_pending=len(llm_pending))
 
     return fast_results, llm_pending
 
@@ -253,132 +384,878 @@ def run_parallel_heuristics(chunks: list[dict]) -> tuple[dict[int, dict], list[t
 # ---------------------------------------------------------------------------
 
 MODEL_NAME = "meta-llama/llama-4-maverick-17b-128e-instruct"
+CASCADE_SMALL_MODEL = "llama-3.1-8b-instant"   # first tier of the two-model cascade
 MAX_RETRIES = 5
-BATCH_SIZE = 10
-MAX_CONCURRENT_BATCHES = 2
+BATCH_MAX_ITEMS = 25              # chunks per request, at most
+BATCH_INPUT_TOKEN_BUDGET = 4000   # estimated prompt tokens per request, template included
+MAX_CONCURRENT_BATCHES = 4      # requests kept in flight per run; quota is enforced by the scheduler
+OUTPUT_TOKENS_PER_CHUNK = 60    # label + confidence + short reasoning, for budgeting only
+LLM_CALL_TIMEOUT_S = 60.0       # per request; a timed-out call is retried like a connection error
+LLM_RUN_BUDGET_S: Optional[float] = None  # whole Phase 2 of one run; None = bounded only per call
+HEDGE_REQUESTS = True           # duplicate calls slower than the model's p95 latency (hedging.py)
 
+_JSON_SYSTEM_PROMPT = "You are a helpful assistant that outputs strictly in JSON format."
 
-def classify_batch_with_llm(
-    index_batch: list[tuple[int, dict]],
-    client: Groq
-) -> dict[int, dict]:
+# "full": definitions and per-chunk reasoning in every batch prompt.
+# "compact": definitions in a fixed system prompt, numeric ids, single-letter
+# labels; reasoning only for verdicts below AUTO_ACCEPT_CONFIDENCE (prompts.py).
+PROMPT_MODE = "full"
+PROMPT_VERSIONS = {"full": PROMPT_VERSION, "compact": COMPACT_PROMPT_VERSION}
+COMPACT_OUTPUT_TOKENS_PER_CHUNK = 12    # [id, "R", 0.95]
+COMPACT_NO_REASONING = "No reasoning requested (compact prompt mode)"
+
+# Confidence bands (see apply_confidence_threshold)
+AUTO_ACCEPT_CONFIDENCE = 0.90   # below this a verdict is flagged for review
+MIN_ACCEPT_CONFIDENCE = 0.70    # below this it is also forced to noise
+
+# Tokens of the fixed batch template (definitions + output instructions)
+_BATCH_TEMPLATE_TOKENS = approx_tokens(build_batch_classification_prompt([]))
+_COMPACT_TEMPLATE_TOKENS = approx_tokens(COMPACT_SYSTEM_PROMPT) + approx_tokens(build_compact_batch_prompt([]))
+
+
+def _resolve_prompt_mode(prompt_mode: Optional[str]) -> str:
+    prompt_mode = prompt_mode or PROMPT_MODE
+    if prompt_mode not in PROMPT_VERSIONS:
+        raise ValueError(f"Unknown prompt mode {prompt_mode!r} (expected one of {sorted(PROMPT_VERSIONS)})")
+    return prompt_mode
+
+
+def pack_batches(
+    llm_pending: list[tuple[int, dict]],
+    max_input_tokens: Optional[int] = None,
+    max_items: Optional[int] = None,
+    prompt_mode: Optional[str] = None,
+) -> list[list[tuple[int, dict]]]:
     """
-    Classify a batch of (index, chunk) pairs in a single Groq call.
-    Returns {index → raw_result_dict}.
-    Falls back to noise on any failure.
+    Pack (index, chunk) pairs into requests by estimated prompt size instead
+    of a fixed count: each batch holds at most `max_items` chunks and stays
+    under `max_input_tokens` including the template (the system prompt, in
+    compact mode). Chunks are packed in size order, so a batch holds chunks
+    of similar length — many one-line chat messages share one request while
+    long emails get small batches.
+    A chunk too large for the budget on its own gets a batch of one.
     """
-    indices = [i for i, _ in index_batch]
-    batch_chunks = [c for _, c in index_batch]
-    fallback = {i: {"label": "noise", "confidence": 0.0, "reasoning": "Batch LLM failed."} for i in indices}
+    max_input_tokens = max_input_tokens or BATCH_INPUT_TOKEN_BUDGET
+    max_items = max_items or BATCH_MAX_ITEMS
+    if _resolve_prompt_mode(prompt_mode) == "compact":
+        format_chunk, template_tokens = format_compact_chunk, _COMPACT_TEMPLATE_TOKENS
+    else:
+        format_chunk, template_tokens = format_batch_chunk, _BATCH_TEMPLATE_TOKENS
 
-    prompt = build_batch_classification_prompt(batch_chunks)
+    sized = sorted(
+        ((approx_tokens(format_chunk(0, chunk)), idx, chunk) for idx, chunk in llm_pending),
+        key=lambda item: (item[0], item[1]),
+    )
 
-    for attempt in range(MAX_RETRIES):
+    batches: list[list[tuple[int, dict]]] = []
+    batch: list[tuple[int, dict]] = []
+    used = template_tokens
+    for tokens, idx, chunk in sized:
+        if batch and (len(batch) >= max_items or used + tokens > max_input_tokens):
+            batches.append(batch)
+            batch, used = [], template_tokens
+        batch.append((idx, chunk))
+        used += tokens
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+async def _create_completion(client, **kwargs):
+    """
+    Await an AsyncGroq-style client directly; run a sync client's blocking
+    call in a worker thread so it never stalls the event loop.
+    """
+    create = client.chat.completions.create
+    if inspect.iscoroutinefunction(create):
+        return await create(**kwargs)
+    return await asyncio.to_thread(create, **kwargs)
+
+
+class BatchRecoveryStats:
+    """Per-run counters for malformed batch responses and how they were recovered."""
+
+    def __init__(self):
+        self.requests = 0       # LLM calls answered (batch + single-chunk)
+        self.malformed = 0      # batch responses missing some or all results
+        self.salvaged = 0       # chunks recovered from malformed responses
+        self.requeued = 0       # chunks re-sent after a partial salvage
+        self.splits = 0         # batches halved after yielding nothing usable
+        self.single_calls = 0   # single-chunk requests (build_classification_prompt)
+        self.failed = 0         # chunks that ended as the noise fallback
+        self.degraded = 0       # chunks left unanswered because the circuit breaker was open
+        self.reasoning_calls = 0  # compact mode: second-pass requests for low-confidence reasoning
+        self.tokens = 0         # tokens used by answered requests (provider-reported when available)
+
+    def as_dict(self) -> dict:
+        return dict(vars(self))
+
+    def add(self, other: "BatchRecoveryStats"):
+        for name, value in vars(other).items():
+            setattr(self, name, getattr(self, name) + value)
+
+
+SINGLE_CHUNK_ATTEMPTS = 2       # parse attempts for a chunk that failed in every batch
+
+# Complete, brace-free JSON objects — result entries in a truncated response
+_RESULT_OBJECT = re.compile(r"\{[^{}]*\}")
+
+# Compact-mode entries: [id, "R", 0.93] verdicts and [id, "reason"] explanations
+_COMPACT_VERDICT = re.compile(r'\[\s*(\d+)\s*,\s*"([A-Za-z])"\s*,\s*(-?[\d.]+)\s*\]')
+_COMPACT_REASON = re.compile(r'\[\s*(\d+)\s*,\s*("(?:[^"\\]|\\.)*")\s*\]')
+
+
+def _normalize_result(entry) -> Optional[dict]:
+    """Coerce one model verdict to {label, confidence, reasoning}; None if unusable."""
+    if not isinstance(entry, dict) or "label" not in entry:
+        return None
+    try:
+        confidence = float(entry.get("confidence", 0.0))
+    except (TypeError, ValueError):
+        return None
+    label = str(entry.get("label", "noise")).lower().strip()
+    if label not in VALID_LABELS:
+        label = "noise"
+    return {
+        "label": label,
+        "confidence": max(0.0, min(1.0, confidence)),
+        "reasoning": str(entry.get("reasoning", "")),
+    }
+
+
+def _salvage_batch_results(raw: str, n: int) -> dict[int, dict]:
+    """
+    Recover {position → result} from a batch response, even a malformed one.
+    Entries are matched by their "index" field; a response without indices is
+    only trusted positionally when it has exactly n entries. Unparseable JSON
+    (e.g. a truncated response) is scanned for complete result objects.
+    """
+    try:
+        parsed = json.loads(raw)
+        entries = parsed.get("results") if isinstance(parsed, dict) else parsed
+        if not isinstance(entries, list):
+            entries = []
+    except json.JSONDecodeError:
+        entries = []
+        for match in _RESULT_OBJECT.finditer(raw):
+            try:
+                entries.append(json.loads(match.group()))
+            except json.JSONDecodeError:
+                pass
+
+    out: dict[int, dict] = {}
+    if not any(isinstance(e, dict) and "index" in e for e in entries):
+        if len(entries) == n:
+            for pos, entry in enumerate(entries):
+                result = _normalize_result(entry)
+                if result is not None:
+                    out[pos] = result
+        return out
+
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
         try:
-            chat_completion = client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that outputs strictly in JSON format."},
-                    {"role": "user", "content": prompt}
-                ],
-                model=MODEL_NAME,
-                temperature=0.0,
+            pos = int(entry.get("index"))
+        except (TypeError, ValueError):
+            continue
+        if 0 <= pos < n and pos not in out:
+            result = _normalize_result(entry)
+            if result is not None:
+                out[pos] = result
+    return out
+
+
+def _salvage_compact_results(raw: str, n: int) -> dict[int, dict]:
+    """
+    Recover {position → result} from a compact CLASSIFY response. Entries are
+    matched by pattern rather than parsed as a whole, so the complete entries
+    of a truncated response are kept too. Reasoning is left empty.
+    """
+    out: dict[int, dict] = {}
+    for match in _COMPACT_VERDICT.finditer(raw):
+        pos, code, confidence = int(match.group(1)), match.group(2).upper(), match.group(3)
+        if code not in LABEL_CODES or not 0 <= pos < n or pos in out:
+            continue
+        result = _normalize_result({"label": LABEL_CODES[code], "confidence": confidence})
+        if result is not None:
+            out[pos] = result
+    return out
+
+
+def _parse_compact_reasons(raw: str, n: int) -> dict[int, str]:
+    out: dict[int, str] = {}
+    for match in _COMPACT_REASON.finditer(raw):
+        pos = int(match.group(1))
+        if 0 <= pos < n and pos not in out:
+            try:
+                out[pos] = json.loads(match.group(2))
+            except json.JSONDecodeError:
+                pass
+    return out
+
+
+def _parse_single_response(raw: str) -> Optional[dict]:
+    try:
+        parsed = json.loads(raw)
+    except json.JSONDecodeError:
+        return None
+    if isinstance(parsed, dict) and isinstance(parsed.get("results"), list) and len(parsed["results"]) == 1:
+        parsed = parsed["results"][0]
+    return _normalize_result(parsed)
+
+
+async def _request_json(
+    client,
+    prompt: str,
+    est_tokens: int,
+    scheduler: Optional[RateLimitScheduler],
+    timeout: float,
+    system_prompt: str = _JSON_SYSTEM_PROMPT,
+    model: Optional[str] = None,
+    stats: Optional[BatchRecoveryStats] = None,
+    deadline: Optional[Deadline] = None,
+    latency: Optional[LatencyTracker] = None,
+) -> Optional[str]:
+    """
+    One logical JSON-mode LLM call to `model` (MODEL_NAME by default).
+    Rate limits, connection errors, timeouts and 5xx are retried up to
+    MAX_RETRIES; a request the model could not answer as JSON (HTTP 400)
+    returns "" so the caller treats it as malformed, and any other 4xx
+    (e.g. 401 for a bad key) returns None at once. Token use of answered
+    requests is added to `stats`.
+
+    Each attempt's timeout is `timeout` capped by what is left of the run's
+    `deadline`; once it has expired no further attempt is made. With
+    HEDGE_REQUESTS, an attempt still outstanding after the model's p95
+    latency (`latency`, the model's process-wide tracker by default) gets a
+    duplicate request, paced by the scheduler like any other, and the first
+    answer wins.
+
+    Every attempt goes through the shared Groq circuit breaker: connection
+    errors, timeouts and 5xx count as failures, any other answer as success.
+    While the breaker is open no request is made and CircuitOpenError is
+    raised at once, instead of sleeping through the remaining retries.
+    Returns the raw response text, or None when the API keeps failing.
+    """
+    model = model or MODEL_NAME
+    breaker = get_circuit_breaker()
+    if latency is None and HEDGE_REQUESTS:
+        latency = get_latency_tracker(model)
+    if deadline is None:
+        deadline = Deadline(None)
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": prompt}
+    ]
+
+    async def attempt_call(hedge: bool):
+        if not hedge or scheduler is None:
+            return await _create_completion(
+                client, messages=messages, model=model, temperature=0.0,
                 response_format={"type": "json_object"},
             )
+        await scheduler.acquire_async(est_tokens)
+        try:
+            return await attempt_call(False)
+        finally:
+            scheduler.record(est_tokens)
+
+    batch_span = current_span()
+    with span("llm.request", model=model, est_tokens=est_tokens) as s:
+        for attempt in range(MAX_RETRIES):
+            if deadline.expired():
+                logging.error(f"LLM run budget exhausted; giving up on a {model} call")
+                return None
+            s.set(attempts=attempt + 1)
+            breaker.check()
+            settled = False     # outcome reported to the breaker
+            used_tokens = None
+            try:
+                if scheduler is not None:
+                    waited = time.perf_counter()
+                    await scheduler.acquire_async(est_tokens)  # paired with record() below
+                    s.add("quota_wait_ms", round((time.perf_counter() - waited) * 1000, 1))
+                if deadline.expired():
+                    raise asyncio.TimeoutError("run budget spent waiting for quota")
+                chat_completion = await asyncio.wait_for(
+                    hedged_call(attempt_call, latency), timeout=deadline.timeout(timeout),
+                )
+                settled = True
+                breaker.record_success()
+                usage = getattr(chat_completion, "usage", None)
+                used_tokens = getattr(usage, "total_tokens", None)
+                if stats is not None:
+                    stats.tokens += used_tokens or est_tokens
+                s.set(prompt_tokens=getattr(usage, "prompt_tokens", None),
+                      completion_tokens=getattr(usage, "completion_tokens", None), total_tokens=used_tokens)
+                batch_span.add("llm.total_tokens", used_tokens or est_tokens)
+                return chat_completion.choices[0].message.content or ""
+
+            except RateLimitError as e:
+                settled = True
+                breaker.record_success()    # throttled, but the provider is up
+                s.add("rate_limited", 1)
+                headers = getattr(getattr(e, "response", None), "headers", None)
+                if scheduler is not None:
+                    # The next acquire_async() waits until the pause ends, for every caller
+                    wait = scheduler.penalize(headers)
+                else:
+                    wait = parse_reset_duration((headers or {}).get("retry-after")) or min(2 ** attempt + 2, 60)
+                    await asyncio.sleep(min(wait, deadline.remaining()))
+                logging.warning(f"Rate limit. Waiting {wait:.1f}s (attempt {attempt+1}/{MAX_RETRIES})")
+                continue
 
-            raw = chat_completion.choices[0].message.content
-            if not raw:
-                raise ValueError("Empty response from LLM")
-
-            parsed = json.loads(raw)
-            results_raw = parsed.get("results", [])
+            except BadRequestError as e:
+                # e.g. json_validate_failed: the model's output was not valid JSON
+                settled = True
+                breaker.record_success()
+                logging.warning(f"Batch rejected by API: {e}")
+                return ""
+
+            except (APIConnectionError, APIStatusError, asyncio.TimeoutError) as e:
+                settled = True
+                if getattr(e, "status_code", 500) >= 500:
+                    breaker.record_failure()
+                else:
+                    # 401 / 403 / 404...: Groq answered, and the same request would only be refused again
+                    breaker.record_success()
+                    logging.error(f"Batch rejected by API: {e!r}")
+                    return None
+                if attempt < MAX_RETRIES - 1:
+                    if breaker.state == CLOSED:
+                        await asyncio.sleep(min(2 ** attempt, deadline.remaining()))
+                    continue    # an open breaker fails the next attempt immediately
+                logging.error(f"Batch API error: {e!r}")
+                return None
+
+            except Exception as e:
+                logging.error(f"Unexpected batch error: {e}")
+                return None
+
+            finally:
+                if not settled:
+                    breaker.record_abandoned()
+                if scheduler is not None:
+                    scheduler.record(est_tokens, used_tokens)
+
+        return None
+
+
+def _failure_result() -> dict:
+    return {"label": "noise", "confidence": 0.0, "reasoning": LLM_FAILURE_REASONING}
+
+
+# Fallback verdicts that carry no model answer
+_UNANSWERED = (LLM_FAILURE_REASONING, DEGRADED_REASONING)
+
+
+def _degraded_result() -> dict:
+    """Verdict for a chunk that passed the domain gate while the breaker was open."""
+    return {"label": "noise", "confidence": 0.0, "reasoning": DEGRADED_REASONING}
+
+
+async def _classify_single_with_llm(
+    item: tuple[int, dict],
+    client,
+    scheduler: Optional[RateLimitScheduler],
+    timeout: float,
+    stats: BatchRecoveryStats,
+    model: Optional[str] = None,
+    deadline: Optional[Deadline] = None,
+) -> dict:
+    """Last-resort path: classify one chunk with the single-chunk prompt."""
+    _, chunk = item
+    prompt = build_classification_prompt(
+        chunk.get("cleaned_text", ""), chunk.get("speaker", ""), chunk.get("source_ref", "")
+    )
+    est_tokens = approx_tokens(prompt) + OUTPUT_TOKENS_PER_CHUNK
+    for _attempt in range(SINGLE_CHUNK_ATTEMPTS):
+        raw = await _request_json(client, prompt, est_tokens, scheduler, timeout,
+                                  model=model, stats=stats, deadline=deadline)
+        if raw is None:
+            break
+        stats.requests += 1
+        stats.single_calls += 1
+        result = _parse_single_response(raw)
+        if result is not None:
+            return result
+    stats.failed += 1
+    return _failure_result()
+
+
+async def _explain_with_llm(
+    explain: list[tuple[dict, dict]],
+    client,
+    scheduler: Optional[RateLimitScheduler],
+    timeout: float,
+    stats: BatchRecoveryStats,
+    model: Optional[str] = None,
+    deadline: Optional[Deadline] = None,
+):
+    """
+    Compact mode's second pass: one EXPLAIN request fills in `reasoning` for
+    (chunk, result) verdicts in place. Verdicts it cannot explain keep
+    COMPACT_NO_REASONING; labels and confidences are never changed here.
+    """
+    prompt = build_compact_reasoning_prompt([(c, r["label"], r["confidence"]) for c, r in explain])
+    est_tokens = (approx_tokens(COMPACT_SYSTEM_PROMPT) + approx_tokens(prompt)
+                  + OUTPUT_TOKENS_PER_CHUNK * len(explain))
+    raw = await _request_json(client, prompt, est_tokens, scheduler, timeout, COMPACT_SYSTEM_PROMPT,
+                              model=model, stats=stats, deadline=deadline)
+    if raw is None:
+        return
+    stats.requests += 1
+    stats.reasoning_calls += 1
+    for pos, reasoning in _parse_compact_reasons(raw, len(explain)).items():
+        explain[pos][1]["reasoning"] = reasoning
+
+
+async def classify_batch_with_llm_async(
+    index_batch: list[tuple[int, dict]],
+    client,
+    scheduler: Optional[RateLimitScheduler] = None,
+    timeout: Optional[float] = None,
+    stats: Optional[BatchRecoveryStats] = None,
+    prompt_mode: Optional[str] = None,
+    model: Optional[str] = None,
+    deadline: Optional[Deadline] = None,
+    escalate_below: float = 0.0,
+) -> dict[int, dict]:
+    """
+    Classify a batch of (index, chunk) pairs in a single Groq call to
+    `model` (MODEL_NAME by default).
+    Every attempt waits for the shared scheduler's RPM/TPM budget, and a 429
+    pauses all callers for as long as its Retry-After / x-ratelimit headers say.
+    Each attempt is bounded by `timeout` seconds (LLM_CALL_TIMEOUT_S by default),
+    or less once the run's `deadline` is close, and slow attempts are hedged
+    (see _request_json).
+
+    A malformed response is not thrown away: every valid, indexed entry is
+    kept and only the missing chunks are re-sent. A batch that yields nothing
+    is split in halves, down to single-chunk calls with the single-chunk
+    prompt. Only chunks that still fail — or any chunk when the API itself
+    is unavailable — fall back to noise. Counts go to `stats`.
+    Once the circuit breaker is open, every chunk not answered yet gets the
+    degraded verdict (noise, confidence 0, DEGRADED_REASONING) instead;
+    apply_confidence_threshold flags it for review and iter_classified_async
+    can re-queue it.
+
+    prompt_mode="compact" (PROMPT_MODE by default) sends the chunks as a
+    short CLASSIFY message under COMPACT_SYSTEM_PROMPT and reads back
+    single-letter labels with no reasoning; verdicts below
+    AUTO_ACCEPT_CONFIDENCE then get their reasoning from one extra EXPLAIN
+    request. Verdicts below `escalate_below` are left out of it: the cascade
+    sends those to the large model, which explains them itself. Recovery
+    works the same in both modes.
+    Returns {index → raw_result_dict}; cancellation propagates to the caller.
+    """
+    with span("llm.batch", chunks=len(index_batch), prompt_mode=_resolve_prompt_mode(prompt_mode),
+              model=model or MODEL_NAME):
+        if stats is None:
+            stats = BatchRecoveryStats()
+        timeout = LLM_CALL_TIMEOUT_S if timeout is None else timeout
+        compact = _resolve_prompt_mode(prompt_mode) == "compact"
+        out: dict[int, dict] = {}
+        terse: set[int] = set()     # compact verdicts, which carry no reasoning yet
+        work = [index_batch]
+        batch: list[tuple[int, dict]] = []
 
-            if not isinstance(results_raw, list) or len(results_raw) != len(batch_chunks):
-                raise ValueError(f"Expected {len(batch_chunks)} results, got {len(results_raw)}")
+        try:
+            while work:
+                batch = work.pop()
+                if len(batch) == 1:
+                    out[batch[0][0]] = await _classify_single_with_llm(
+                        batch[0], client, scheduler, timeout, stats, model, deadline,
+                    )
+                    continue
+
+                if compact:
+                    prompt = build_compact_batch_prompt([c for _, c in batch])
+                    est_tokens = (approx_tokens(COMPACT_SYSTEM_PROMPT) + approx_tokens(prompt)
+                                  + COMPACT_OUTPUT_TOKENS_PER_CHUNK * len(batch))
+                    raw = await _request_json(client, prompt, est_tokens, scheduler, timeout, COMPACT_SYSTEM_PROMPT,
+                                              model=model, stats=stats, deadline=deadline)
+                else:
+                    prompt = build_batch_classification_prompt([c for _, c in batch])
+                    est_tokens = approx_tokens(prompt) + OUTPUT_TOKENS_PER_CHUNK * len(batch)
+                    raw = await _request_json(client, prompt, est_tokens, scheduler, timeout,
+                                              model=model, stats=stats, deadline=deadline)
+                if raw is None:
+                    # API unavailable — smaller requests would not fare better
+                    for idx, _ in batch:
+                        out[idx] = _failure_result()
+                    stats.failed += len(batch)
+                    continue
+                stats.requests += 1
+
+                salvaged = (_salvage_compact_results if compact else _salvage_batch_results)(raw, len(batch))
+                for pos, result in salvaged.items():
+                    out[batch[pos][0]] = result
+                    if compact:
+                        terse.add(batch[pos][0])
+                if len(salvaged) == len(batch):
+                    continue
+
+                stats.malformed += 1
+                stats.salvaged += len(salvaged)
+                missing = [item for pos, item in enumerate(batch) if pos not in salvaged]
+                logging.warning(f"Malformed batch response: {len(salvaged)}/{len(batch)} results usable")
+                if salvaged:
+                    stats.requeued += len(missing)
+                    work.append(missing)
+                else:
+                    stats.splits += 1
+                    mid = len(batch) // 2
+                    work.extend([batch[mid:], batch[:mid]])
+        except CircuitOpenError:
+            # Degraded mode: the current batch and everything still queued behind it
+            for idx, _ in [*batch, *(item for pending in work for item in pending)]:
+                if idx not in out:
+                    out[idx] = _degraded_result()
+                    stats.degraded += 1
+
+        if terse:
+            idx_to_chunk = dict(index_batch)
+            explain = [(idx_to_chunk[idx], out[idx]) for idx in sorted(terse)
+                       if escalate_below <= out[idx]["confidence"] < AUTO_ACCEPT_CONFIDENCE]
+            if explain:
+                with contextlib.suppress(CircuitOpenError):  # verdicts keep COMPACT_NO_REASONING
+                    await _explain_with_llm(explain, client, scheduler, timeout, stats, model, deadline)
+            for idx in terse:
+                if not out[idx]["reasoning"]:
+                    out[idx]["reasoning"] = COMPACT_NO_REASONING
+        return out
 
-            out = {}
-            for idx, r in zip(indices, results_raw):
-                label = r.get("label", "noise").lower().strip()
-                if label not in VALID_LABELS:
-                    label = "noise"
-                out[idx] = {
-                    "label": label,
-                    "confidence": max(0.0, min(1.0, float(r.get("confidence", 0.0)))),
-                    "reasoning": str(r.get("reasoning", "")),
-                }
-            return out
 
-        except RateLimitError as e:
-            wait = min(2 ** attempt + 2, 60)
-            logging.warning(f"Rate limit. Waiting {wait}s (attempt {attempt+1}/{MAX_RETRIES})")
-            time.sleep(wait)
-            continue
+def classify_batch_with_llm(
+    index_batch: list[tuple[int, dict]],
+    client,
+    scheduler: Optional[RateLimitScheduler] = None,
+    stats: Optional[BatchRecoveryStats] = None,
+    prompt_mode: Optional[str] = None,
+    model: Optional[str] = None,
+) -> dict[int, dict]:
+    """Blocking wrapper around classify_batch_with_llm_async() (either prompt mode)."""
+    return asyncio.run(classify_batch_with_llm_async(
+        index_batch, client, scheduler, stats=stats, prompt_mode=prompt_mode, model=model,
+    ))
 
-        except (APIConnectionError, APIStatusError) as e:
-            if attempt < MAX_RETRIES - 1:
-                time.sleep(2 ** attempt)
-                continue
-            logging.error(f"Batch API error: {e}")
-            return fallback
 
-        except (json.JSONDecodeError, ValueError) as e:
-            logging.warning(f"Batch parse error (attempt {attempt+1}): {e}")
-            if attempt < MAX_RETRIES - 1:
-                time.sleep(1)
-                continue
-            return fallback
+# ---------------------------------------------------------------------------
+# Two-model cascade
+# ---------------------------------------------------------------------------
 
-        except Exception as e:
-            logging.error(f"Unexpected batch error: {e}")
-            return fallback
+@dataclass
+class CascadeConfig:
+    """
+    Every batch goes to small_model first; chunks it scores below
+    escalate_below go to large_model, whose verdict replaces the small one.
+    escalate_below=AUTO_ACCEPT_CONFIDENCE escalates everything that would be
+    flagged for review; MIN_ACCEPT_CONFIDENCE only what would be forced to
+    noise. enabled=False sends every batch straight to large_model.
+    """
+    enabled: bool = True
+    small_model: str = CASCADE_SMALL_MODEL
+    large_model: str = MODEL_NAME
+    escalate_below: float = AUTO_ACCEPT_CONFIDENCE
+
+    def cache_key(self) -> str:
+        """Model name the LLM cache keys verdicts on: a cascade's answers differ from either model's."""
+        if not self.enabled:
+            return self.large_model
+        return f"{self.small_model}>{self.large_model}@{self.escalate_below:g}"
+
+
+DEFAULT_CASCADE = CascadeConfig()
+
+
+class CascadeStats:
+    """Per-tier latency and token use, escalations and small/large agreement for one run."""
+
+    def __init__(self):
+        self.tiers = {
+            tier: {"requests": 0, "chunks": 0, "tokens": 0, "latency_s": 0.0}
+            for tier in ("small", "large")
+        }
+        self.escalated = 0      # chunks the small model was not confident about
+        self.compared = 0       # escalated chunks both tiers actually classified
+        self.agreed = 0         # ... where both gave the same label
+
+    def record(self, tier: str, chunks: int, latency_s: float, stats: BatchRecoveryStats):
+        t = self.tiers[tier]
+        t["requests"] += stats.requests
+        t["chunks"] += chunks
+        t["tokens"] += stats.tokens
+        t["latency_s"] += latency_s
+
+    def agreement_rate(self) -> Optional[float]:
+        return self.agreed / self.compared if self.compared else None
+
+    def as_dict(self) -> dict:
+        return {"tiers": {k: dict(v) for k, v in self.tiers.items()}, "escalated": self.escalated,
+                "compared": self.compared, "agreed": self.agreed, "agreement_rate": self.agreement_rate()}
+
+    def summary(self) -> str:
+        parts = []
+        for tier, t in self.tiers.items():
+            if t["chunks"]:
+                parts.append(f"{tier}: {t['chunks']} chunks, {t['requests']} req, "
+                             f"{t['tokens'] / t['chunks']:.0f} tok/chunk, "
+                             f"{t['latency_s'] * 1000 / t['chunks']:.0f} ms/chunk")
+        rate = self.agreement_rate()
+        parts.append(f"escalated {self.escalated}"
+                     + (f" (agreement {rate:.0%} of {self.compared})" if rate is not None else ""))
+        return "  |  ".join(parts)
+
+
+async def classify_batch_cascade_async(
+    index_batch: list[tuple[int, dict]],
+    client,
+    cascade: CascadeConfig,
+    scheduler: Optional[RateLimitScheduler] = None,
+    small_scheduler: Optional[RateLimitScheduler] = None,
+    timeout: Optional[float] = None,
+    stats: Optional[BatchRecoveryStats] = None,
+    prompt_mode: Optional[str] = None,
+    cascade_stats: Optional[CascadeStats] = None,
+    deadline: Optional[Deadline] = None,
+) -> dict[int, dict]:
+    """
+    Classify one batch through the cascade (see CascadeConfig). The small
+    tier is paced by `small_scheduler` (provider quotas are per model) and
+    the large tier by `scheduler`. Per-tier counts go to `cascade_stats`;
+    both tiers' recovery counts go to `stats`.
+    """
+    if stats is None:
+        stats = BatchRecoveryStats()
+    if cascade_stats is None:
+        cascade_stats = CascadeStats()
+
+    async def run_tier(tier, model, items, tier_scheduler, escalate_below=0.0):
+        tier_stats = BatchRecoveryStats()
+        t0 = time.perf_counter()
+        try:
+            return await classify_batch_with_llm_async(
+                items, client, tier_scheduler, timeout, tier_stats, prompt_mode, model, deadline,
+                escalate_below=escalate_below,
+            )
+        finally:
+            cascade_stats.record(tier, len(items), time.perf_counter() - t0, tier_stats)
+            stats.add(tier_stats)
+
+    if not cascade.enabled:
+        return await run_tier("large", cascade.large_model, index_batch, scheduler)
+
+    out = await run_tier("small", cascade.small_model, index_batch, small_scheduler or scheduler,
+                         escalate_below=cascade.escalate_below)
+    escalate = [(idx, chunk) for idx, chunk in index_batch
+                if out[idx]["confidence"] < cascade.escalate_below]
+    if not escalate:
+        return out
+
+    cascade_stats.escalated += len(escalate)
+    large = await run_tier("large", cascade.large_model, escalate, scheduler)
+    for idx, result in large.items():
+        small = out[idx]
+        if small["reasoning"] not in _UNANSWERED and result["reasoning"] not in _UNANSWERED:
+            cascade_stats.compared += 1
+            cascade_stats.agreed += small["label"] == result["label"]
+        if result["reasoning"] not in _UNANSWERED or small["reasoning"] in _UNANSWERED:
+            out[idx] = result
+    return out
+
+
+async def iter_llm_results_async(
+    llm_pending: list[tuple[int, dict]],
+    client,
+    progress_callback,
+    cache: Optional[ClassificationCache] = None,
+    scheduler: Optional[RateLimitScheduler] = None,
+    max_in_flight: Optional[int] = None,
+    timeout: Optional[float] = None,
+    log_fn=None,
+    stats: Optional[BatchRecoveryStats] = None,
+    prompt_mode: Optional[str] = None,
+    cascade: Optional[CascadeConfig] = None,
+    small_scheduler: Optional[RateLimitScheduler] = None,
+    cascade_stats: Optional[CascadeStats] = None,
+    deadline: Optional[Deadline] = None,
+    journal: Optional[RunJournal] = None,
+):
+    """
+    Process LLM-pending chunks in token-budgeted batches (pack_batches), keeping up to
+    `max_in_flight` (MAX_CONCURRENT_BATCHES) requests in flight continuously
+    on the event loop, and yield (index, result) as each batch completes.
+    Pacing comes from the shared RateLimitScheduler (RPM + TPM buckets), so
+    a slow batch never stalls the other slots.
+    With a cache, previously classified content is answered from it first
+    (and yielded immediately), and every completed batch is written back.
+    Malformed responses are recovered per classify_batch_with_llm_async and
+    counted in `stats`. `prompt_mode` selects the full or compact prompt.
+    Each batch runs through the two-model `cascade` (DEFAULT_CASCADE unless
+    given; see classify_batch_cascade_async), with per-tier figures in
+    `cascade_stats`.
+    Every call's timeout is capped by `deadline` (LLM_RUN_BUDGET_S from the
+    start of this phase unless given); once it expires, the chunks still
+    unanswered fall back to noise.
+    While the shared circuit breaker is open, batches are not sent at all:
+    their chunks get the degraded verdict in milliseconds (see
+    classify_batch_with_llm_async and requeue_when_closed).
+    With a run `journal`, chunks it already holds a verdict for are answered
+    from it without any call, and every completed batch's verdicts are
+    journaled before they are yielded (failure fallbacks excepted, so a
+    resumed run retries them).
+    Closing the generator, or cancelling its consumer, cancels every
+    outstanding batch.
+    """
+    emit = log_fn or print
+    if scheduler is None:
+        scheduler = RateLimitScheduler()
+    if stats is None:
+        stats = BatchRecoveryStats()
+    if cascade is None:
+        cascade = DEFAULT_CASCADE
+    if cascade_stats is None:
+        cascade_stats = CascadeStats()
+    if deadline is None:
+        deadline = Deadline(LLM_RUN_BUDGET_S)
+
+    if journal is not None:
+        done = await asyncio.to_thread(journal.completed)
+        journaled = {idx: done[idx] for idx, _ in llm_pending if idx in done}
+        if journaled:
+            idx_to_chunk = dict(llm_pending)
+            llm_pending = [(idx, chunk) for idx, chunk in llm_pending if idx not in journaled]
+            emit(f"  → Run journal: {len(journaled)} chunks already classified  |  {len(llm_pending)} remaining")
+            progress_callback(len(journaled))
+            for idx, result in journaled.items():
+                result = apply_confidence_threshold(result)
+                log_chunk_decision(idx_to_chunk[idx], "LLM_JOURNAL", result["label"],
+                                   result["confidence"], result["reasoning"])
+                yield idx, result
+
+    if cache is not None:
+        idx_to_chunk = dict(llm_pending)
+        cached, llm_pending = await asyncio.to_thread(cache.lookup, llm_pending)
+        if cached:
+            progress_callback(len(cached))
+        for idx, result in cached.items():
+            result = apply_confidence_threshold(result)
+            log_chunk_decision(idx_to_chunk[idx], "LLM_CACHE", result["label"],
+                               result["confidence"], result["reasoning"])
+            yield idx, result
+
+    batches = pack_batches(llm_pending, prompt_mode=prompt_mode)
+
+    slots = asyncio.Semaphore(max_in_flight or MAX_CONCURRENT_BATCHES)
+
+    async def run_batch(batch):
+        async with slots:
+            return batch, await classify_batch_cascade_async(
+                batch, client, cascade, scheduler, small_scheduler, timeout, stats, prompt_mode,
+                cascade_stats, deadline,
+            )
 
-    return fallback
+    tasks = [asyncio.create_task(run_batch(batch)) for batch in batches]
+    try:
+        for n_done, next_done in enumerate(asyncio.as_completed(tasks), 1):
+            batch, batch_result = await next_done
+            if cache is not None:
+                await asyncio.to_thread(cache.store, batch, batch_result)
+            if journal is not None:
+                await asyncio.to_thread(journal.record_results, {
+                    idx: result for idx, result in batch_result.items() if result["reasoning"] not in _UNANSWERED
+                })
+            progress_callback(len(batch))
+
+            if n_done % 10 == 0 or n_done == len(batches):
+                tp = scheduler.throughput()
+                emit(f"  → LLM throughput: {tp['requests_per_min']:.0f} req/min  "
+                     f"|  {tp['tokens_per_min']:.0f} tok/min  |  throttled {tp['throttled_s']}s")
+
+            # O(1) lookup dict instead of O(n) linear scan per result
+            idx_to_chunk = {i: c for i, c in batch}
+            # Apply confidence thresholding
+            for idx, result in batch_result.items():
+                result = apply_confidence_threshold(result)
+                log_chunk_decision(idx_to_chunk[idx], "LLM_BATCH", result["label"],
+                                   result["confidence"], result["reasoning"])
+                yield idx, result
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    if stats.malformed or stats.failed:
+        emit(f"  → LLM recovery: {stats.malformed} malformed  |  {stats.salvaged} salvaged  "
+             f"|  {stats.requeued} re-queued  |  {stats.splits} splits  "
+             f"|  {stats.single_calls} single calls  |  {stats.failed} failed")
+    if stats.degraded:
+        emit(f"  → Circuit breaker open: {stats.degraded} chunks marked noise pending re-classification, "
+             f"flagged for review  |  breaker {get_circuit_breaker().summary()['state']}")
+    if stats.reasoning_calls:
+        emit(f"  → Compact prompt: {stats.reasoning_calls} reasoning requests for low-confidence verdicts")
+    if cascade.enabled and batches:
+        emit(f"  → Cascade: {cascade_stats.summary()}")
+    if HEDGE_REQUESTS and batches:
+        models = [cascade.small_model, cascade.large_model] if cascade.enabled else [cascade.large_model]
+        for model in models:
+            emit(f"  → LLM latency {model} (process-wide): {get_latency_tracker(model).summary()}")
+
+    if cache is not None:
+        await asyncio.to_thread(cache.evict)
+
+
+async def run_parallel_batches_async(
+    llm_pending: list[tuple[int, dict]],
+    client,
+    progress_callback,
+    cache: Optional[ClassificationCache] = None,
+    scheduler: Optional[RateLimitScheduler] = None,
+    max_in_flight: Optional[int] = None,
+    timeout: Optional[float] = None,
+    log_fn=None,
+    stats: Optional[BatchRecoveryStats] = None,
+    prompt_mode: Optional[str] = None,
+    cascade: Optional[CascadeConfig] = None,
+    small_scheduler: Optional[RateLimitScheduler] = None,
+    cascade_stats: Optional[CascadeStats] = None,
+    deadline: Optional[Deadline] = None,
+    journal: Optional[RunJournal] = None,
+) -> dict[int, dict]:
+    """Collect iter_llm_results_async() into {index → result}."""
+    stream = iter_llm_results_async(
+        llm_pending, client, progress_callback, cache=cache, scheduler=scheduler,
+        max_in_flight=max_in_flight, timeout=timeout, log_fn=log_fn, stats=stats,
+        prompt_mode=prompt_mode, cascade=cascade, small_scheduler=small_scheduler,
+        cascade_stats=cascade_stats, deadline=deadline, journal=journal,
+    )
+    async with contextlib.aclosing(stream):
+        return {idx: result async for idx, result in stream}
 
 
 def run_parallel_batches(
     llm_pending: list[tuple[int, dict]],
-    client: Groq,
-    progress_callback
+    client,
+    progress_callback,
+    cache: Optional[ClassificationCache] = None,
+    scheduler: Optional[RateLimitScheduler] = None,
+    stats: Optional[BatchRecoveryStats] = None,
+    prompt_mode: Optional[str] = None,
+    cascade: Optional[CascadeConfig] = None,
+    cascade_stats: Optional[CascadeStats] = None,
+    timeout: Optional[float] = None,
+    budget_s: Optional[float] = None,
 ) -> dict[int, dict]:
     """
-    Process LLM-pending chunks in batches of BATCH_SIZE,
-    running MAX_CONCURRENT_BATCHES batches at a time.
-    Sleeps 1s between groups (not between individual batches) to stay rate-safe.
+    Blocking wrapper around run_parallel_batches_async(); `budget_s` is the
+    run's deadline (LLM_RUN_BUDGET_S by default).
     """
-    # Split into batches
-    batches = [
-        llm_pending[i:i + BATCH_SIZE]
-        for i in range(0, len(llm_pending), BATCH_SIZE)
-    ]
-
-    llm_results: dict[int, dict] = {}
-
-    # Process in groups of MAX_CONCURRENT_BATCHES
-    for group_start in range(0, len(batches), MAX_CONCURRENT_BATCHES):
-        group = batches[group_start: group_start + MAX_CONCURRENT_BATCHES]
-
-        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_BATCHES) as executor:
-            future_to_batch = {
-                executor.submit(classify_batch_with_llm, batch, client): batch
-                for batch in group
-            }
-            for future, batch in future_to_batch.items():
-                batch_result = future.result()
-                # O(1) lookup dict instead of O(n) linear scan per result
-                idx_to_chunk = {i: c for i, c in batch}
-                # Apply confidence thresholding
-                for idx, result in batch_result.items():
-                    result = apply_confidence_threshold(result)
-                    chunk = idx_to_chunk[idx]
-                    log_chunk_decision(chunk, "LLM_BATCH", result["label"],
-                                       result["confidence"], result["reasoning"])
-                    llm_results[idx] = result
-                progress_callback(len(batch))
-
-        # Sleep between groups (not within) — avoids rate limits while maximising throughput
-        if group_start + MAX_CONCURRENT_BATCHES < len(batches):
-            time.sleep(1.0)
-
-    return llm_results
+    return asyncio.run(run_parallel_batches_async(
+        llm_pending, client, progress_callback, cache=cache, scheduler=scheduler, stats=stats,
+        prompt_mode=prompt_mode, cascade=cascade, cascade_stats=cascade_stats, timeout=timeout,
+        deadline=Deadline(LLM_RUN_BUDGET_S if budget_s is None else budget_s),
+    ))
 
 
 # ---------------------------------------------------------------------------
@@ -395,9 +1272,9 @@ def apply_confidence_threshold(result: dict) -> dict:
     confidence = result["confidence"]
     result["flagged_for_review"] = False
 
-    if confidence >= 0.90:
+    if confidence >= AUTO_ACCEPT_CONFIDENCE:
         pass  # auto-accept
-    elif confidence >= 0.70:
+    elif confidence >= MIN_ACCEPT_CONFIDENCE:
         result["flagged_for_review"] = True
     else:
         result["label"] = "noise"
@@ -410,64 +1287,509 @@ def apply_confidence_threshold(result: dict) -> dict:
 # Main orchestrator
 # ---------------------------------------------------------------------------
 
-def classify_chunks(chunks: list[dict], api_key: str, log_fn=None) -> list[ClassifiedChunk]:
-    """
-    Two-phase parallel classification pipeline.
+def _to_classified(chunk: dict, result: dict) -> ClassifiedChunk:
+    return ClassifiedChunk(
+        source_ref=chunk.get("source_ref", ""),
+        speaker=chunk.get("speaker"),
+        raw_text=chunk.get("raw_text", ""),
+        cleaned_text=chunk.get("cleaned_text", ""),
+        label=SignalLabel(result["label"]),
+        confidence=result["confidence"],
+        reasoning=result["reasoning"],
+        flagged_for_review=result.get("flagged_for_review", False),
+        duplicate_of=result.get("duplicate_of"),
+    )
 
-    Phase 1 — Parallel heuristics (8 threads, CPU-bound):
-      Regex + domain-gate run simultaneously on all chunks.
-      Chunks decided here never touch the API.
 
-    Phase 2 — Controlled batch LLM (batch=10, 2 concurrent):
-      LLM-pending chunks are grouped into batches of 10.
-      Two batches run concurrently, then a 1s sleep before the next pair.
-      This maximises throughput without hitting Groq's RPM limit.
+def _near_duplicate_result(result: dict, representative: dict, similarity: float) -> dict:
+    """Copy a representative's verdict to a cluster member, recording where it came from."""
+    return {**result, "duplicate_of": representative.get("source_ref", ""), "similarity": round(similarity, 3)}
+
+
+async def iter_classified_async(
+    chunks: list[dict],
+    api_key: str,
+    ordered: bool = False,
+    log_fn=None,
+    heuristic_workers: Optional[int] = None,
+    use_cache: bool = True,
+    client=None,
+    scheduler: Optional[RateLimitScheduler] = None,
+    max_in_flight: Optional[int] = None,
+    near_dedup: bool = True,
+    use_local_model: bool = True,
+    prompt_mode: Optional[str] = None,
+    cascade: Optional[CascadeConfig] = None,
+    budget_s: Optional[float] = None,
+    run_id: Optional[str] = None,
+):
+    """
+    Two-phase parallel classification pipeline, on the caller's event loop,
+    yielding each ClassifiedChunk as soon as its decision exists.
+
+    Phase 1 — Heuristics (CPU-bound):
+      Regex + domain-gate run on all chunks in a worker thread; serial for
+      small inputs, sharded across `heuristic_workers` processes for large
+      ones (see run_parallel_heuristics). Chunks decided here never touch
+      the API and are yielded right after the phase.
+
+    Local model (optional):
+      With use_local_model and a trained artifact in models/ (see
+      local_model.py), domain-gate survivors the local classifier is
+      confident about are accepted without an LLM call; the rest escalate.
+
+    Phase 2 — Controlled batch LLM (token-budgeted batches, 4 in flight):
+      LLM-pending chunks are packed into batches of similar-sized chunks up to
+      BATCH_INPUT_TOKEN_BUDGET / BATCH_MAX_ITEMS and kept flowing
+      through a token-bucket scheduler sized to the RPM/TPM quota, so the
+      run sits at the provider's ceiling without hitting 429s. The scheduler
+      is shared by every run on the same API key in this process, so many
+      concurrent sessions stay inside one quota.
+      With use_cache, content classified by an earlier run (same text, model
+      and prompt version) is answered from the AKS cache with no API call.
+      With near_dedup, near-identical chunks (quoted replies, reposts — see
+      near_dedup.py) are collapsed first: one representative per cluster goes
+      to the LLM and the others reuse its verdict, with `duplicate_of` set.
+      prompt_mode picks the full or compact batch prompt (PROMPT_MODE by
+      default); each mode has its own cache entries.
+      Batches run through a two-model `cascade` (DEFAULT_CASCADE unless
+      given): a small model first, the large one only for chunks the small
+      one is not confident about.
+      `budget_s` (LLM_RUN_BUDGET_S by default) bounds the whole run: each
+      call's timeout is derived from what is left of it, and slow calls are
+      hedged with a duplicate request (see hedging.py).
+      With a `run_id`, the run is journaled (run_journal.py): inputs and
+      settings up front, then every LLM batch's verdicts as it completes.
+      Running the same run_id again — see resume_run() — skips every
+      journaled chunk and sends only the remaining batches.
+
+    ordered=False yields in completion order. ordered=True yields in input
+    order, buffering only chunks that finished ahead of an earlier one.
+    Progress lines go to `log_fn` (print by default). `client` defaults to a
+    client owned by this call: AsyncGroq, or an AsyncProviderPool when several
+    keys / endpoints are configured (see provider_pool.py).
     """
     if not chunks:
-        return []
-
-    client = Groq(api_key=api_key)
+        return
+
+    deadline = Deadline(LLM_RUN_BUDGET_S if budget_s is None else budget_s)
+    prompt_mode = _resolve_prompt_mode(prompt_mode)
+    if cascade is None:
+        cascade = DEFAULT_CASCADE
+    emit = log_fn or print
+    journal = None
+    if run_id is not None:
+        settings = {"prompt_mode": prompt_mode, "cascade": asdict(cascade), "use_cache": use_cache,
+                    "near_dedup": near_dedup, "use_local_model": use_local_model}
+        journal = await asyncio.to_thread(RunJournal.create, run_id, chunks, settings)
+        emit(f"  → Run {run_id}: journal at {journal.path}")
+    owns_client = client is None
+    if owns_client:
+        client = make_async_client(api_key)
+    # Provider quotas are per model: the cascade's small tier gets its own budget
+    small_scheduler = scheduler
+    if scheduler is None and isinstance(client, AsyncProviderPool):
+        # The pool's combined quota; each member still paces itself within its own
+        scheduler = get_scheduler(client.key, rpm=client.rpm, tpm=client.tpm)
+        small_scheduler = get_scheduler(f"{client.key}:{cascade.small_model}", rpm=client.rpm, tpm=client.tpm)
+        max_in_flight = max_in_flight or MAX_CONCURRENT_BATCHES * len(client)
+        emit(f"  → Provider pool: {len(client)} providers  |  up to {max_in_flight} requests in flight")
+    elif scheduler is None:
+        scheduler = get_scheduler(api_key or "")
+        small_scheduler = get_scheduler(f"{api_key or ''}:{cascade.small_model}")
     total = len(chunks)
 
-    # Shared thread-safe progress counter
+    # Progress counter (updated from the event loop only)
     _done = {"n": 0}
-    _lock = threading.Lock()
 
     def progress_callback(n: int):
-        with _lock:
-            _done["n"] += n
-            done = _done["n"]
-            if done % 10 == 0 or done == total:
-                print(f"  Classified {done}/{total} chunks...")
-
-    # ── Phase 1: parallel heuristics ────────────────────────────────────────
-    fast_results, llm_pending = run_parallel_heuristics(chunks)
-    progress_callback(len(fast_results))
-
-    fast_path_count = len(fast_results)
-    llm_count = len(llm_pending)
-    print(f"  → Heuristic/domain gate: {fast_path_count} chunks  |  LLM queue: {llm_count} chunks")
-
-    # ── Phase 2: batch LLM calls ─────────────────────────────────────────────
-    llm_results: dict[int, dict] = {}
-    if llm_pending:
-        llm_results = run_parallel_batches(llm_pending, client, progress_callback)
-
-    # ── Assemble in original order ────────────────────────────────────────────
-    all_results = {**fast_results, **llm_results}
-
-    classified: list[ClassifiedChunk] = []
-    for i, chunk in enumerate(chunks):
-        result = all_results[i]
-        classified.append(ClassifiedChunk(
-            source_ref=chunk.get("source_ref", ""),
-            speaker=chunk.get("speaker"),
-            raw_text=chunk.get("raw_text", ""),
-            cleaned_text=chunk.get("cleaned_text", ""),
-            label=SignalLabel(result["label"]),
-            confidence=result["confidence"],
-            reasoning=result["reasoning"],
-            flagged_for_review=result.get("flagged_for_review", False),
-        ))
-
-    return classified
+        _done["n"] += n
+        done = _done["n"]
+        if done % 10 == 0 or done == total:
+            emit(f"  Classified {done}/{total} chunks...")
+
+    # Ordered mode: results that finished ahead of `next_idx`
+    pending_out: dict[int, ClassifiedChunk] = {}
+    next_idx = 0
+
+    def release(idx: int, result: dict) -> list[ClassifiedChunk]:
+        nonlocal next_idx
+        item = _to_classified(chunks[idx], result)
+        if not ordered:
+            return [item]
+        pending_out[idx] = item
+        ready = []
+        while next_idx in pending_out:
+            ready.append(pending_out.pop(next_idx))
+            next_idx += 1
+        return ready
+
+    try:
+        # ── Phase 1: heuristics (optionally process-sharded) ────────────────
+        fast_results, llm_pending = await asyncio.to_thread(
+            run_parallel_heuristics, chunks, heuristic_workers
+        )
+        progress_callback(len(fast_results))
+
+        fast_path_count = len(fast_results)
+        llm_count = len(llm_pending)
+        emit(f"  → Heuristic/domain gate: {fast_path_count} chunks  |  LLM queue: {llm_count} chunks")
+
+        for idx, result in fast_results.items():
+            for item in release(idx, result):
+                yield item
+
+        # ── Local model tier ─────────────────────────────────────────────────
+        local_model = await asyncio.to_thread(load_latest_model) if use_local_model and llm_pending else None
+        if local_model is not None:
+            with span("classify.local_model", chunks=len(llm_pending), version=local_model.version) as s:
+                local_results, llm_pending = await asyncio.to_thread(classify_locally, local_model, llm_pending)
+                s.set(accepted=len(local_results))
+            emit(f"  → Local model v{local_model.version}: {len(local_results)} accepted  "
+                 f"|  {len(llm_pending)} escalated to LLM")
+            if local_results:
+                progress_callback(len(local_results))
+            for idx, result in local_results.items():
+                result = apply_confidence_threshold(result)
+                log_chunk_decision(chunks[idx], "LOCAL_MODEL", result["label"],
+                                   result["confidence"], result["reasoning"])
+                for item in release(idx, result):
+                    yield item
+
+        # ── Near-duplicate collapsing ────────────────────────────────────────
+        members: dict[int, list[tuple[int, float]]] = {}
+        if near_dedup and len(llm_pending) > 1:
+            with span("classify.near_dedup", chunks=len(llm_pending)) as s:
+                llm_pending, members = await asyncio.to_thread(collapse_near_duplicates, llm_pending)
+                s.set(representatives=len(llm_pending))
+            collapsed = sum(len(m) for m in members.values())
+            if collapsed:
+                emit(f"  → Near-duplicates: {collapsed} chunks reuse {len(members)} representatives' verdicts")
+
+        # ── Phase 2: batch LLM calls ─────────────────────────────────────────
+        if llm_pending:
+            cache = (await asyncio.to_thread(ClassificationCache, cascade.cache_key(), PROMPT_VERSIONS[prompt_mode])
+                     if use_cache else None)
+
+            stream = iter_llm_results_async(
+                llm_pending, client, progress_callback, cache=cache, scheduler=scheduler,
+                max_in_flight=max_in_flight, log_fn=log_fn, prompt_mode=prompt_mode,
+                cascade=cascade, small_scheduler=small_scheduler, deadline=deadline, journal=journal,
+            )
+            async with contextlib.aclosing(stream):
+                async for idx, result in stream:
+                    for item in release(idx, result):
+                        yield item
+                    for member_idx, similarity in members.get(idx, ()):
+                        copied = _near_duplicate_result(result, chunks[idx], similarity)
+                        log_chunk_decision(chunks[member_idx], "LLM_NEAR_DUP", copied["label"],
+                                           copied["confidence"], copied["reasoning"],
+                                           duplicate_of=copied["duplicate_of"],
+                                           similarity=copied["similarity"])
+                        progress_callback(1)
+                        for item in release(member_idx, copied):
+                            yield item
+            if cache is not None:
+                stats = cache.stats()
+                emit(f"  → LLM cache: {stats['hits']} hits  |  {stats['misses']} misses  "
+                     f"|  {stats['evictions']} evicted")
+        if journal is not None:
+            await asyncio.to_thread(journal.mark_complete)
+        if isinstance(client, AsyncProviderPool):
+            for member in client.summary():
+                emit(f"  → Provider {member['provider']}: {member['requests']} requests  "
+                     f"|  {member['failures']} failed  |  {member['rate_limited']} rate-limited  "
+                     f"|  {member['health']}")
+    finally:
+        if journal is not None:
+            journal.close()
+        if owns_client:
+            await client.close()
+
+
+async def classify_chunks_async(
+    chunks: list[dict],
+    api_key: str,
+    log_fn=None,
+    heuristic_workers: Optional[int] = None,
+    use_cache: bool = True,
+    client=None,
+    scheduler: Optional[RateLimitScheduler] = None,
+    max_in_flight: Optional[int] = None,
+    near_dedup: bool = True,
+    use_local_model: bool = True,
+    prompt_mode: Optional[str] = None,
+    cascade: Optional[CascadeConfig] = None,
+    budget_s: Optional[float] = None,
+    run_id: Optional[str] = None,
+) -> list[ClassifiedChunk]:
+    """
+    Classify every chunk (see iter_classified_async) and return them in
+    input order once the whole run is done.
+    """
+    stream = iter_classified_async(
+        chunks, api_key, ordered=True, log_fn=log_fn, heuristic_workers=heuristic_workers,
+        use_cache=use_cache, client=client, scheduler=scheduler, max_in_flight=max_in_flight,
+        near_dedup=near_dedup, use_local_model=use_local_model, prompt_mode=prompt_mode,
+        cascade=cascade, budget_s=budget_s, run_id=run_id,
+    )
+    with span("classify.run", chunks=len(chunks), run_id=run_id):
+        async with contextlib.aclosing(stream):
+            return [item async for item in stream]
+
+
+_STREAM_END = object()
+
+
+def iter_classified(
+    chunks: list[dict],
+    api_key: str,
+    ordered: bool = False,
+    log_fn=None,
+    heuristic_workers: Optional[int] = None,
+    use_cache: bool = True,
+    near_dedup: bool = True,
+    use_local_model: bool = True,
+    prompt_mode: Optional[str] = None,
+    cascade: Optional[CascadeConfig] = None,
+    budget_s: Optional[float] = None,
+    run_id: Optional[str] = None,
+):
+    """
+    Blocking generator over iter_classified_async(). The run executes on an
+    event loop in a background thread, so classification keeps going while
+    the caller handles each yielded chunk (e.g. writes it to storage).
+    Closing the generator early cancels the run.
+    """
+    out: queue.Queue = queue.Queue()
+    errors: list[BaseException] = []
+    started = threading.Event()
+    running = {}
+
+    async def pump():
+        running["loop"] = asyncio.get_running_loop()
+        running["task"] = asyncio.current_task()
+        started.set()
+        stream = iter_classified_async(
+            chunks, api_key, ordered=ordered, log_fn=log_fn,
+            heuristic_workers=heuristic_workers, use_cache=use_cache, near_dedup=near_dedup,
+            use_local_model=use_local_model, prompt_mode=prompt_mode, cascade=cascade,
+            budget_s=budget_s, run_id=run_id,
+        )
+        with span("classify.run", chunks=len(chunks), run_id=run_id):
+            async with contextlib.aclosing(stream):
+                async for item in stream:
+                    out.put(item)
+
+    def run():
+        try:
+            asyncio.run(pump())
+        except asyncio.CancelledError:
+            pass
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            started.set()
+            out.put(_STREAM_END)
+
+    # copy_context: the run's spans nest under the caller's current trace span
+    worker = threading.Thread(target=contextvars.copy_context().run, args=(run,), name="iter_classified", daemon=True)
+    worker.start()
+    try:
+        while True:
+            item = out.get()
+            if item is _STREAM_END:
+                break
+            yield item
+        if errors:
+            raise errors[0]
+    finally:
+        if worker.is_alive():
+            started.wait()
+            try:
+                running["loop"].call_soon_threadsafe(running["task"].cancel)
+            except (KeyError, RuntimeError):
+                pass  # run already finished
+            worker.join()
+
+
+def classify_chunks(
+    chunks: list[dict],
+    api_key: str,
+    log_fn=None,
+    heuristic_workers: Optional[int] = None,
+    use_cache: bool = True,
+    near_dedup: bool = True,
+    use_local_model: bool = True,
+    prompt_mode: Optional[str] = None,
+    cascade: Optional[CascadeConfig] = None,
+    budget_s: Optional[float] = None,
+    run_id: Optional[str] = None,
+) -> list[ClassifiedChunk]:
+    """
+    Blocking wrapper around classify_chunks_async() for scripts and threads
+    without a running event loop.
+    """
+    return asyncio.run(classify_chunks_async(
+        chunks, api_key, log_fn=log_fn,
+        heuristic_workers=heuristic_workers, use_cache=use_cache, near_dedup=near_dedup,
+        use_local_model=use_local_model, prompt_mode=prompt_mode, cascade=cascade,
+        budget_s=budget_s, run_id=run_id,
+    ))
+
+
+def resume_run(
+    run_id: str,
+    api_key: str,
+    log_fn=None,
+    heuristic_workers: Optional[int] = None,
+    budget_s: Optional[float] = None,
+) -> list[ClassifiedChunk]:
+    """
+    Continue a journaled run (see iter_classified_async's run_id) after a
+    crash or interrupt: same input chunks and settings, journaled LLM
+    verdicts reused, only the remaining batches sent. Returns every chunk
+    of the run in input order, like classify_chunks().
+    """
+    journal = RunJournal.open(run_id)
+    try:
+        chunks, settings = journal.chunks(), journal.settings()
+    finally:
+        journal.close()
+    cascade = CascadeConfig(**settings["cascade"]) if settings.get("cascade") else None
+    return classify_chunks(
+        chunks, api_key, log_fn=log_fn, heuristic_workers=heuristic_workers,
+        use_cache=settings.get("use_cache", True), near_dedup=settings.get("near_dedup", True),
+        use_local_model=settings.get("use_local_model", True), prompt_mode=settings.get("prompt_mode"),
+        cascade=cascade, budget_s=budget_s, run_id=run_id,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Re-queue of chunks classified while the circuit breaker was open
+# ---------------------------------------------------------------------------
+
+_requeue_lock = threading.Lock()
+_requeue_jobs: list[tuple[list[ClassifiedChunk], str, object, dict]] = []
+_requeue_state = {"running": False, "listening_to": None}   # breaker whose on_close drains the queue
+
+
+def is_degraded(chunk: ClassifiedChunk) -> bool:
+    """True for a chunk that got the degraded verdict (LLM skipped, breaker open)."""
+    return chunk.reasoning == DEGRADED_REASONING
+
+
+def pending_requeue() -> int:
+    """Chunks parked until the circuit breaker closes."""
+    with _requeue_lock:
+        return sum(len(items) for items, *_ in _requeue_jobs)
+
+
+def requeue_when_closed(chunks: list[ClassifiedChunk], api_key: str, on_reclassified, **classify_kwargs):
+    """
+    Park degraded chunks until the shared Groq circuit breaker closes, then
+    classify them again (classify_chunks(..., **classify_kwargs)) on a
+    background thread and pass the updated chunks — same chunk_id and
+    session_id, new verdict — to on_reclassified (e.g. a storage update).
+    Chunks that come back degraded again stay parked for the next close.
+    """
+    chunks = [c for c in chunks if is_degraded(c)]
+    if not chunks:
+        return
+    breaker = get_circuit_breaker()
+    with _requeue_lock:
+        _requeue_jobs.append((chunks, api_key, on_reclassified, classify_kwargs))
+        if _requeue_state["listening_to"] is not breaker:
+            _requeue_state["listening_to"] = breaker
+            breaker.on_close(_start_requeue)
+    if breaker.state == CLOSED:
+        _start_requeue()
+
+
+
+def wait_for_requeue(timeout_s: float, poll_s: float = 1.0) -> int:
+    """
+    Block until every parked chunk is re-classified or timeout_s has passed,
+    for callers that exit when done (main.py, main_ami.py) instead of serving
+    more traffic. Nothing else probes the breaker there, so once it turns
+    half-open the queue is drained on this thread, its first request being
+    the probe. Returns the number of chunks still parked.
+    """
+    deadline = Deadline(timeout_s)
+    while pending_requeue() and not deadline.expired():
+        if get_circuit_breaker().state != OPEN:
+            _drain_requeue()        # returns at once while the on_close thread drains
+        if pending_requeue():
+            time.sleep(min(poll_s, deadline.remaining()))
+    return pending_requeue()
+
+
+def requeue_and_wait(classified: list[ClassifiedChunk], api_key: str, on_reclassified, timeout_s: float,
+                     **classify_kwargs) -> int:
+    """
+    requeue_when_closed() for the degraded chunks of `classified`, then
+    wait_for_requeue(timeout_s). Re-classified chunks are passed to
+    on_reclassified and also replace their entries in `classified`.
+    Returns the number of chunks still degraded.
+    """
+    position = {c.chunk_id: i for i, c in enumerate(classified)}
+
+    def reclassified(updated: list[ClassifiedChunk]):
+        on_reclassified(updated)
+        for c in updated:
+            classified[position[c.chunk_id]] = c
+
+    requeue_when_closed(classified, api_key, reclassified, **classify_kwargs)
+    wait_for_requeue(timeout_s)
+    return sum(is_degraded(c) for c in classified)
+
+def _start_requeue():
+    threading.Thread(target=_drain_requeue, name="classifier_requeue", daemon=True).start()
+
+
+def _drain_requeue():
+    with _requeue_lock:
+        if _requeue_state["running"]:
+            return
+        _requeue_state["running"] = True
+    try:
+        while True:
+            with _requeue_lock:
+                # Stop under the same lock that saw nothing to do, so a job parked
+                # right after this starts a new drain instead of finding us "running".
+                # Half-open is fine: the first request is the breaker's probe.
+                if not _requeue_jobs or get_circuit_breaker().state == OPEN:
+                    _requeue_state["running"] = False
+                    return
+                jobs = list(_requeue_jobs)
+                _requeue_jobs.clear()
+            for n, (chunks, api_key, on_reclassified, classify_kwargs) in enumerate(jobs):
+                try:
+                    results = classify_chunks(
+                        [{"source_ref": c.source_ref, "speaker": c.speaker, "raw_text": c.raw_text,
+                          "cleaned_text": c.cleaned_text} for c in chunks],
+                        api_key, log_fn=logging.info, **classify_kwargs,
+                    )
+                    updated = [
+                        new.model_copy(update={"chunk_id": old.chunk_id, "session_id": old.session_id,
+                                               "source_type": old.source_type, "created_at": old.created_at})
+                        for old, new in zip(chunks, results) if not is_degraded(new)
+                    ]
+                    if updated:
+                        on_reclassified(updated)
+                    logging.info(f"Re-queued {len(updated)}/{len(chunks)} degraded chunks after the breaker closed")
+                except Exception as e:
+                    logging.error(f"Re-classifying degraded chunks failed: {e}")
+                    # Parked for the next close; retrying now would just fail again
+                    with _requeue_lock:
+                        _requeue_jobs[:0] = jobs[n:]
+                        _requeue_state["running"] = False
+                    return
+                still = [old for old, new in zip(chunks, results) if is_degraded(new)]
+                if still:
+                    with _requeue_lock:
+                        _requeue_jobs.append((still, api_key, on_reclassified, classify_kwargs))
+    except BaseException:
+        with _requeue_lock:
+            _requeue_state["running"] = False
+        raise
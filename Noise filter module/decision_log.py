@@ -0,0 +1,185 @@
+"""
+decision_log.py
+Per-chunk classification decisions as JSONL, written off the hot path.
+log_chunk_decision() only builds a small dict and enqueues it; a background
+listener thread serialises records and writes them to a file that rotates
+by size and by age. Each decision path can be sampled, and nothing at all
+is done when the decision logger is disabled.
+
+Config (env overrides the defaults below):
+    DECISION_LOG_PATH       file to write (default pipeline_decisions.jsonl in the cwd)
+    DECISION_LOG_LEVEL      DEBUG to record decisions, anything higher to switch them off
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import threading
+import time
+from typing import Optional
+
+DECISION_LOG_PATH = os.getenv("DECISION_LOG_PATH", "pipeline_decisions.jsonl")
+DECISION_LOG_LEVEL = os.getenv("DECISION_LOG_LEVEL", "DEBUG")
+DECISION_LOG_MAX_BYTES = 50 * 1024 * 1024   # rotate when the file exceeds this size...
+DECISION_LOG_MAX_AGE_S = 24 * 3600          # ...or is older than this
+DECISION_LOG_BACKUPS = 5
+
+# Share of decisions recorded per path group. Heuristic / domain-gate
+# decisions are numerous and reproducible, so they are sampled by default.
+DECISION_LOG_SAMPLING = {
+    "HEURISTIC": 0.1,
+    "DOMAIN_GATE": 0.1,
+    "LOCAL_MODEL": 1.0,
+    "LLM": 1.0,          # LLM_BATCH, LLM_CACHE, LLM_NEAR_DUP
+}
+
+_TEXT_PREVIEW = 150
+
+logger = logging.getLogger("noise_filter.decisions")
+logger.propagate = False
+
+_lock = threading.Lock()
+_listener: Optional[logging.handlers.QueueListener] = None
+_config: dict = {}   # settings of the last configure_decision_log() (empty → defaults); replaced, never mutated
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Enqueue the record untouched; formatting happens on the listener thread."""
+
+    def prepare(self, record):
+        return record
+
+
+class _JsonlFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {"ts": round(record.created, 3), **record.msg}
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SizeAndAgeRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """RotatingFileHandler that also rolls over once the current file is max_age_s old."""
+
+    def __init__(self, filename, max_bytes=0, max_age_s=0, backup_count=0, encoding="utf-8"):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count,
+                         encoding=encoding, delay=True)
+        self.max_age_s = max_age_s
+        self._opened_at = self._file_start()
+
+    def _file_start(self) -> float:
+        try:
+            return os.path.getmtime(self.baseFilename) if os.path.getsize(self.baseFilename) else time.time()
+        except OSError:
+            return time.time()
+
+    def shouldRollover(self, record):
+        if self.max_age_s and time.time() - self._opened_at >= self.max_age_s \
+                and os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename):
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        self._opened_at = time.time()
+
+
+def configure_decision_log(
+    path: Optional[str] = None,
+    level: Optional[str] = None,
+    sampling: Optional[dict] = None,
+    max_bytes: Optional[int] = None,
+    max_age_s: Optional[float] = None,
+    backup_count: Optional[int] = None,
+):
+    """(Re)start the background writer; unspecified settings fall back to the module defaults."""
+    global _config
+    with _lock:
+        _stop_locked()
+        # A new dict, so log_chunk_decision never sees a half-filled one
+        _config = dict(
+            path=path or DECISION_LOG_PATH,
+            level=level or DECISION_LOG_LEVEL,
+            sampling=dict(DECISION_LOG_SAMPLING if sampling is None else sampling),
+            max_bytes=DECISION_LOG_MAX_BYTES if max_bytes is None else max_bytes,
+            max_age_s=DECISION_LOG_MAX_AGE_S if max_age_s is None else max_age_s,
+            backup_count=DECISION_LOG_BACKUPS if backup_count is None else backup_count,
+        )
+        _start_locked()
+
+
+def _start_locked():
+    global _listener, _config
+    if not _config:
+        _config = dict(
+            path=DECISION_LOG_PATH, level=DECISION_LOG_LEVEL, sampling=dict(DECISION_LOG_SAMPLING),
+            max_bytes=DECISION_LOG_MAX_BYTES, max_age_s=DECISION_LOG_MAX_AGE_S,
+            backup_count=DECISION_LOG_BACKUPS,
+        )
+    logger.setLevel(getattr(logging, str(_config["level"]).upper(), logging.DEBUG))
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+
+    file_handler = SizeAndAgeRotatingFileHandler(
+        _config["path"], max_bytes=_config["max_bytes"],
+        max_age_s=_config["max_age_s"], backup_count=_config["backup_count"],
+    )
+    file_handler.setFormatter(_JsonlFormatter())
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    logger.addHandler(_DeferredQueueHandler(records))
+    _listener = logging.handlers.QueueListener(records, file_handler)
+    _listener.start()
+
+
+def _stop_locked():
+    global _listener
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    if _listener is not None:
+        _listener.stop()  # drains the queue before returning
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def flush_decision_log():
+    """Write out everything queued so far and stop the writer (it restarts on the next record)."""
+    with _lock:
+        _stop_locked()
+
+
+atexit.register(flush_decision_log)
+
+
+def _path_group(path: str) -> str:
+    return "LLM" if path.startswith("LLM") else path
+
+
+def log_chunk_decision(chunk, path, label, confidence, reasoning, **extra):
+    """Record one classification decision (sampled per path group; no-op when disabled)."""
+    if _listener is None:
+        if logger.level > logging.DEBUG:
+            return  # disabled: no formatting, no I/O
+        with _lock:
+            if _listener is None:
+                _start_locked()
+        if _listener is None:
+            return
+    rate = _config.get("sampling", DECISION_LOG_SAMPLING).get(_path_group(path), 1.0)
+    if rate < 1.0 and random.random() >= rate:
+        return
+    logger.debug({
+        "path": path,
+        "speaker": chunk.get("speaker", "Unknown"),
+        "source_ref": chunk.get("source_ref", ""),
+        "text": chunk.get("cleaned_text", "")[:_TEXT_PREVIEW],
+        "label": label,
+        "confidence": confidence,
+        "reasoning": reasoning,
+        "sample_rate": rate,
+        **extra,
+    })
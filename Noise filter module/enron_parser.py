@@ -2,17 +2,29 @@
 enron_parser.py
 Ingests the Enron Email Dataset CSV, deduplicates, strips boilerplate,
 and returns a list of raw chunk dicts ready for classification.
+iter_chunks() streams the same chunks in fixed-size row windows, so the
+full 1.4 GB emails.csv never has to fit in memory.
 """
 
 from __future__ import annotations
 
+import io
+import os
+import itertools
 import re
 import email
+from collections import deque
 from pathlib import Path
 from typing import Optional
 
+import numpy as np
 import pandas as pd
 
+from parse_cache import cached_chunks
+from process_pool import spawn_pool
+from row_index import RowIndex
+from tracing import current_span, traced
+
 # ---------------------------------------------------------------------------
 # Boilerplate patterns to strip from email bodies
 # ---------------------------------------------------------------------------
@@ -42,9 +54,160 @@ _TIMESTAMP_DIVIDER = re.compile(
 
 _EXCESS_WHITESPACE = re.compile(r"\n{3,}")
 
+# A divider starts at the first dash of a run: (?<!-) keeps a long run of
+# dashes from being retried at every position inside it
+_THREAD_DIVIDER = re.compile(
+    r"(?<!-)-{3,}\s*(?:Original Message|Forwarded by|Forwarded Message)[^\n]*\n",
+    re.IGNORECASE,
+)
+
+
+# Building blocks of the line scan in strip_boilerplate. None ends in .* or
+# can backtrack past the whitespace run after the position it is tried at,
+# so every character is examined a bounded number of times.
+_FORWARD_TAIL = re.compile(r"\s*(?:Original Message|Forwarded by|Forwarded Message)", re.IGNORECASE)
+_DISCLAIMER_START = re.compile(
+    r"(?=[TCI])(?:"         # lets the search skip ahead to a possible first letter
+    r"This (?:message|e-?mail) is intended only for|"
+    r"CONFIDENTIAL|"
+    r"This communication contains|"
+    r"The information contained in this|"
+    r"If you have received this (?:message|e-?mail) in error)",
+    re.IGNORECASE,
+)
+_CANDIDATE_LINE = re.compile(r"^(?:[\s>\-]|\d|$)", re.MULTILINE)
+_RULE_LINE_START = re.compile(r"^(?:>|\d|[^\S\n]*---+)", re.MULTILINE)
+
+
+class _Cleaned(str):
+    """Output of strip_boilerplate that is already a fixed point of it."""
+
+    __slots__ = ()
+
 
 def strip_boilerplate(text: str) -> str:
-    """Remove forwarded headers, legal disclaimers, signatures, and quoted lines."""
+    """
+    Remove forwarded headers, legal disclaimers, signatures, and quoted lines.
+
+    One scan over the lines, in linear time on any input; the result is
+    identical to applying _FORWARDED_HEADER, _TIMESTAMP_DIVIDER,
+    _DISCLAIMER, _SIGNATURE_DIVIDER and _REPLY_QUOTE one after another
+    (_strip_boilerplate_regex). The first forwarded header, disclaimer or
+    signature ends the text; timestamp dividers and quoted lines are blanked.
+    Only lines that start with whitespace, '-', '>' or a digit can match a
+    rule, so only those are looked at; text between them is copied as is.
+    Results that cleaning would not change again come back marked, so a
+    second call on them returns at once.
+    """
+    if isinstance(text, _Cleaned):
+        return text
+    if not isinstance(text, str):
+        return ""
+    pieces: list[str] = []
+    copy_from = 0                   # start of the text not yet copied to pieces
+    skip_to = 0                     # lines before this were swallowed by a timestamp divider
+    prev_end = -2                   # end of the last line looked at
+    blank_run_start = None          # start of the whitespace-only lines just before this one
+    searched_to = 0                 # disclaimers are searched for up to the line being looked at
+    cut = len(text)                 # start of the first disclaimer
+    stop = None                     # where the text ends, once a rule ends it
+
+    for line_start in _CANDIDATE_LINE.finditer(text):
+        pos = line_start.start()
+        if pos < skip_to:
+            continue
+        end = text.find("\n", pos)
+        if end < 0:
+            end = len(text)
+        if searched_to < end:
+            disclaimer = _DISCLAIMER_START.search(text, searched_to, end)
+            if disclaimer:
+                cut = disclaimer.start()
+            searched_to = len(text) if disclaimer else end
+        if cut < pos:
+            stop = cut
+            break
+        line = text[pos:end]
+        if prev_end + 1 != pos:
+            blank_run_start = None
+        prev_end = end
+
+        if not line or line.isspace():
+            if blank_run_start is None:
+                blank_run_start = pos
+            continue
+
+        first = line[0]
+        if (first == "-" or first.isspace()) and _is_forward_header(text, pos, line):
+            # The text ends where the blank lines before the header begin
+            stop = pos if blank_run_start is None else blank_run_start
+            break
+        blank_run_start = None
+
+        if first.isdecimal():
+            divider = _TIMESTAMP_DIVIDER.match(text, pos)
+            # A divider can run on over whitespace-only lines up to a dash line;
+            # when that line is a forwarded header, the text ends before it instead
+            if divider and divider.end() > end:
+                tail_start = text.rfind("\n", pos, divider.end()) + 1
+                if _is_forward_header(text, tail_start, text[tail_start:divider.end()]):
+                    divider = None
+            if divider:
+                pieces.append(text[copy_from:pos])
+                copy_from = skip_to = prev_end = divider.end()
+                if cut < copy_from:     # the disclaimer was part of the divider
+                    cut, searched_to = len(text), copy_from
+                else:
+                    searched_to = max(searched_to, copy_from)
+                continue
+
+        if cut < end:
+            stop = pos if first == ">" else cut
+            break
+        if first == "-" and pos and end < len(text) and line.startswith("--") and (len(line) == 2 or line[2:].isspace()):
+            stop = pos - 1          # signature: everything from the "\n--" on goes
+            break
+        if first == ">":
+            pieces.append(text[copy_from:pos])
+            copy_from = end
+
+    if stop is None:
+        if searched_to < len(text):
+            disclaimer = _DISCLAIMER_START.search(text, searched_to)
+            if disclaimer:
+                cut = disclaimer.start()
+        stop = cut
+    pieces.append(text[copy_from:max(stop, copy_from)])
+    result = _EXCESS_WHITESPACE.sub("\n\n", "".join(pieces)).strip()
+    return _Cleaned(result) if _is_fixed_point(result) else result
+
+
+def _is_forward_header(text: str, pos: int, line: str) -> bool:
+    """Whether the line at pos is ---+ then a forwarding keyword (possibly on a later line)."""
+    stripped = line.lstrip()
+    if not stripped.startswith("---"):
+        return False
+    return bool(_FORWARD_TAIL.match(text, pos + len(line) - len(stripped.lstrip("-"))))
+
+
+def _is_fixed_point(cleaned: str) -> bool:
+    """
+    Whether strip_boilerplate would return `cleaned` unchanged. Disclaimers
+    and signatures never survive a pass, but blanking quoted lines and
+    dividers (or the final strip) can bring a quote, divider or forwarded
+    header together that the next pass would remove.
+    """
+    for match in _RULE_LINE_START.finditer(cleaned):
+        if match.group().endswith("-"):
+            if _FORWARD_TAIL.match(cleaned, match.end()):
+                return False
+        elif match.group() == ">" or _TIMESTAMP_DIVIDER.match(cleaned, match.start()):
+            return False
+    return True
+
+
+def _strip_boilerplate_regex(text: str) -> str:
+    """The previous six-pass implementation; the reference for parity tests and benchmarks."""
     if not isinstance(text, str):
         return ""
     text = _FORWARDED_HEADER.sub("", text)
@@ -63,11 +226,7 @@ def flatten_thread(text: str) -> list[str]:
     Returns a list of cleaned text segments (at least one).
     """
     # Split on forwarded message dividers
-    parts = re.split(
-        r"-{3,}\s*(?:Original Message|Forwarded by|Forwarded Message)[^\n]*\n",
-        text,
-        flags=re.IGNORECASE,
-    )
+    parts = _THREAD_DIVIDER.split(text)
     chunks = []
     for part in parts:
         cleaned = strip_boilerplate(part)
@@ -83,9 +242,40 @@ def deduplicate(df: pd.DataFrame) -> pd.DataFrame:
     return df.reset_index(drop=True)
 
 
+def parse_raw_message(raw_msg) -> dict:
+    """Header fields and text/plain body of one raw RFC 822 message ({} if it cannot be parsed)."""
+    try:
+        msg = email.message_from_string(raw_msg)
+
+        # Extract body
+        body = ""
+        if msg.is_multipart():
+            for part in msg.walk():
+                if part.get_content_type() == "text/plain":
+                    payload = part.get_payload(decode=True)
+                    if payload:
+                        body += payload.decode("utf-8", errors="replace")
+        else:
+            payload = msg.get_payload(decode=True)
+            if payload:
+                body = payload.decode("utf-8", errors="replace")
+
+        return {
+            "Message-ID": msg.get("Message-ID", ""),
+            "From": msg.get("From", ""),
+            "X-From": msg.get("X-From", ""),
+            "Subject": msg.get("Subject", ""),
+            "body": body
+        }
+    except Exception:
+        return {}
+
+
+@traced("parse.enron.load")
 def load_emails(csv_path: str | Path, n: Optional[int] = None) -> pd.DataFrame:
     """
-    Load the Enron emails CSV.
+    Load the Enron emails CSV into one DataFrame (see iter_chunks for a
+    streaming reader).
     Args:
         csv_path: Path to emails.csv
         n: If set, only load the first n rows (for testing / demo)
@@ -94,7 +284,6 @@ def load_emails(csv_path: str | Path, n: Optional[int] = None) -> pd.DataFrame:
     if not path.exists():
         raise FileNotFoundError(f"CSV not found: {path}")
 
-    # For large files, use chunking if n is large, but here pd.read_csv handles nrows efficiently
     df = pd.read_csv(path, nrows=n)
 
     # Normalise column names (strip whitespace)
@@ -102,36 +291,8 @@ def load_emails(csv_path: str | Path, n: Optional[int] = None) -> pd.DataFrame:
 
     # If raw 'message' column exists (standard Enron format), parse it
     if "message" in df.columns and "body" not in df.columns:
-        
-        def parse_raw(raw_msg):
-            try:
-                msg = email.message_from_string(raw_msg)
-                
-                # Extract body
-                body = ""
-                if msg.is_multipart():
-                    for part in msg.walk():
-                        if part.get_content_type() == "text/plain":
-                            payload = part.get_payload(decode=True)
-                            if payload:
-                                body += payload.decode("utf-8", errors="replace")
-                else:
-                    payload = msg.get_payload(decode=True)
-                    if payload:
-                        body = payload.decode("utf-8", errors="replace")
-                
-                return {
-                    "Message-ID": msg.get("Message-ID", ""),
-                    "From": msg.get("From", ""),
-                    "X-From": msg.get("X-From", ""),
-                    "Subject": msg.get("Subject", ""),
-                    "body": body
-                }
-            except Exception:
-                return {}
-
         # Parse messages — build DataFrame from list of dicts (faster than .apply(pd.Series))
-        parsed = pd.DataFrame(df["message"].apply(parse_raw).tolist())
+        parsed = pd.DataFrame(df["message"].apply(parse_raw_message).tolist())
         
         # Combine
         df = pd.concat([df, parsed], axis=1)
@@ -144,52 +305,202 @@ def load_emails(csv_path: str | Path, n: Optional[int] = None) -> pd.DataFrame:
     return df
 
 
-def parse_to_chunks(csv_path: str | Path, n: Optional[int] = None) -> list[dict]:
-    """
-    Full pipeline: load → deduplicate → strip boilerplate → flatten threads.
-    Returns a list of raw chunk dicts with keys:
-        source_ref, speaker, raw_text, cleaned_text, subject
-    """
-    df = load_emails(csv_path, n=n)
-    df = deduplicate(df)
-    # Rename columns with hyphens for itertuples() compatibility
-    df = df.rename(columns={"X-From": "X_From", "Message-ID": "Message_ID"})
+# ---------------------------------------------------------------------------
+# Streaming reader
+# ---------------------------------------------------------------------------
+
+PARSER_VERSION = "1"        # bump whenever chunk output changes, so cached parses are rebuilt
+ITER_BATCH_ROWS = 2_000     # CSV rows read, parsed and cleaned per window
+
+_ROW_FIELDS = ("Message-ID", "From", "X-From", "Subject", "body")
+_NAN_ID = object()          # stands in for every missing Message-ID (they are all duplicates of each other)
+
+
+def _row_chunks(message_id, sender, x_from, subject, body, row_number: int) -> list[dict]:
+    """Chunk dicts for one email: subject + body, flattened into thread turns, boilerplate stripped."""
+    raw_body = str(body or "")
+    subject = str(subject or "")
+    speaker = str(x_from or sender or "")
+    source_ref = str(message_id or "")
+
+    # Use Message-ID as source_ref or fallback
+    if not source_ref:
+        source_ref = f"row_{row_number}"
+
+    # Combine subject + body so subject line is also classified
+    full_text = f"Subject: {subject}\n\n{raw_body}" if subject else raw_body
 
     chunks = []
+    # Flatten thread into sub-chunks
+    for sub in flatten_thread(full_text):
+        cleaned = strip_boilerplate(sub)
+        if not cleaned or not cleaned.strip():
+            continue
+
+        chunks.append(
+            {
+                "source_ref": source_ref,
+                "speaker": speaker.strip(),
+                "raw_text": sub,
+                "cleaned_text": cleaned,
+                "subject": subject,
+            }
+        )
+    return chunks
 
-    # itertuples() is 5-10× faster than iterrows() (avoids pd.Series per row)
-    for row in df.itertuples(index=True):
-        i = row.Index
-        raw_body = str(getattr(row, "body", "") or "")
-        subject = str(getattr(row, "Subject", "") or "")
-        speaker = str(getattr(row, "X_From", "") or getattr(row, "From", "") or "")
-        source_ref = str(getattr(row, "Message_ID", "") or "")
 
-        # Use Message-ID as source_ref or fallback
-        if not source_ref:
-            source_ref = f"row_{i}"
+def _window_rows(window: pd.DataFrame):
+    """(Message-ID, From, X-From, Subject, body) per row of one CSV window."""
+    if "message" in window.columns and "body" not in window.columns:
+        for raw in window["message"]:
+            parsed = parse_raw_message(raw)
+            yield tuple(parsed.get(field, float("nan")) for field in _ROW_FIELDS)
+        return
+    blank = [""] * len(window)
+    yield from zip(*(window[field] if field in window.columns else blank for field in _ROW_FIELDS))
+
+
+def iter_chunks(
+    csv_path: str | Path,
+    n: Optional[int] = None,
+    batch_rows: int = ITER_BATCH_ROWS,
+    workers: Optional[int] = None,
+    shard_bytes: Optional[int] = None,
+):
+    """
+    Stream the Enron CSV in windows of `batch_rows` rows: parse MIME, drop
+    repeated Message-IDs, strip boilerplate, flatten threads and yield chunk
+    dicts — the same dicts, in the same order, as parse_to_chunks. Memory
+    stays flat in the file size: one window of rows is held at a time, plus
+    the set of Message-IDs seen so far.
+
+    With workers > 1 (or 0 for every core), a whole file of at least
+    MIN_BYTES_FOR_PROCESS_POOL is split into byte ranges of about
+    `shard_bytes` (PARSE_SHARD_BYTES) on record boundaries and parsed by
+    worker processes (see _iter_sharded); the output does not change.
+    """
+    path = Path(csv_path)
+    if not path.exists():
+        raise FileNotFoundError(f"CSV not found: {path}")
+    workers = PARSE_WORKERS if workers is None else workers
+    workers = workers or os.cpu_count() or 1
+    if n is None and workers > 1 and path.stat().st_size >= MIN_BYTES_FOR_PROCESS_POOL:
+        yield from _iter_sharded(path, workers, shard_bytes or PARSE_SHARD_BYTES, batch_rows)
+        return
+
+    seen_ids: set = set()
+    kept = 0
+    with pd.read_csv(path, nrows=n, chunksize=batch_rows) as reader:
+        for window in reader:
+            window.columns = [c.strip() for c in window.columns]
+            for message_id, sender, x_from, subject, body in _window_rows(window):
+                key = _NAN_ID if pd.isna(message_id) else message_id
+                if key in seen_ids:
+                    continue
+                seen_ids.add(key)
+                yield from _row_chunks(message_id, sender, x_from, subject, body, kept)
+                kept += 1
 
-        # Combine subject + body so subject line is also classified
-        full_text = f"Subject: {subject}\n\n{raw_body}" if subject else raw_body
 
-        # Flatten thread into sub-chunks
-        sub_chunks = flatten_thread(full_text)
+# ---------------------------------------------------------------------------
+# Multiprocess parsing
+# ---------------------------------------------------------------------------
 
-        for sub in sub_chunks:
-            cleaned = strip_boilerplate(sub)
-            if not cleaned or not cleaned.strip():
-                continue
+# MIME parsing and boilerplate regexes are GIL-bound, so threads don't help;
+# worker processes do once the file is big enough to amortise their startup.
+PARSE_WORKERS = 1                             # 1 → serial; 0 → one per CPU core
+PARSE_SHARD_BYTES = 32 * 1024 * 1024          # CSV bytes per task sent to a worker
+MIN_BYTES_FOR_PROCESS_POOL = 64 * 1024 * 1024  # smaller files always parse serially
+
+
+def shard_ranges(path: str | Path, shard_bytes: int) -> list[tuple[int, int]]:
+    """
+    Split a CSV file's data rows into (start, end) byte ranges of about
+    `shard_bytes`, each starting on a record boundary taken from the file's
+    row index (row_index.py), so multi-line quoted messages are never cut
+    and a re-run reuses the saved index. The header line is excluded.
+    """
+    offsets = RowIndex.open(path).offsets
+    starts = [int(offsets[0])]
+    # Next shard starts at the first record past start + shard_bytes; offsets[-1] is the file size
+    while (i := int(np.searchsorted(offsets, starts[-1] + shard_bytes, side="right"))) < len(offsets) - 1:
+        starts.append(int(offsets[i]))
+    ends = starts[1:] + [int(offsets[-1])]
+    return [(start, end) for start, end in zip(starts, ends) if end > start]
 
-            chunks.append(
-                {
-                    "source_ref": source_ref,
-                    "speaker": speaker.strip(),
-                    "raw_text": sub,
-                    "cleaned_text": cleaned,
-                    "subject": subject,
-                }
-            )
 
+def _parse_shard(task: tuple[str, int, int, list[str], int]) -> list[tuple]:
+    """
+    Worker: parse one byte range of the CSV into (Message-ID, chunks) per
+    row, in file order. Deduplication and row_N ids are left to the parent,
+    which sees every shard in order.
+    """
+    path, start, end, columns, batch_rows = task
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    out = []
+    with pd.read_csv(io.BytesIO(data), header=None, names=columns, chunksize=batch_rows) as reader:
+        for window in reader:
+            window.columns = [c.strip() for c in window.columns]
+            for row in _window_rows(window):
+                out.append((row[0], _row_chunks(*row, 0)))
+    return out
+
+
+def _iter_sharded(path: Path, workers: int, shard_bytes: int, batch_rows: int):
+    """
+    iter_chunks across worker processes: shards are parsed in parallel and
+    merged in file order, where repeated Message-IDs are dropped and rows
+    without one get their row_N id from their position among kept rows —
+    exactly as in the serial reader. At most 2 × workers shards are in
+    flight, so memory stays bounded.
+    """
+    columns = list(pd.read_csv(path, nrows=0).columns)
+    tasks = [(str(path), start, end, columns, batch_rows) for start, end in shard_ranges(path, shard_bytes)]
+    seen_ids: set = set()
+    kept = 0
+    with spawn_pool(min(workers, len(tasks))) as executor:
+        queued = iter(tasks)
+        pending = deque(executor.submit(_parse_shard, task) for task in itertools.islice(queued, 2 * workers))
+        while pending:
+            rows = pending.popleft().result()
+            task = next(queued, None)
+            if task is not None:
+                pending.append(executor.submit(_parse_shard, task))
+            for message_id, chunks in rows:
+                key = _NAN_ID if pd.isna(message_id) else message_id
+                if key in seen_ids:
+                    continue
+                seen_ids.add(key)
+                if not str(message_id or ""):
+                    for chunk in chunks:
+                        chunk["source_ref"] = f"row_{kept}"
+                kept += 1
+                yield from chunks
+
+
+@traced("parse.enron")
+def parse_to_chunks(
+    csv_path: str | Path,
+    n: Optional[int] = None,
+    workers: Optional[int] = None,
+    use_cache: Optional[bool] = None,
+) -> list[dict]:
+    """
+    Full pipeline: load → deduplicate → strip boilerplate → flatten threads.
+    With workers > 1 (or 0 for every core) large files are parsed by worker
+    processes (see iter_chunks). Unless use_cache is False (default
+    PARSE_CACHE), the result is cached per CSV state and reused — see
+    parse_cache.py.
+    Returns a list of raw chunk dicts with keys:
+        source_ref, speaker, raw_text, cleaned_text, subject
+    """
+    chunks, cache = cached_chunks(
+        "enron", PARSER_VERSION, csv_path, lambda: list(iter_chunks(csv_path, n=n, workers=workers)),
+        options={"n": n}, use_cache=use_cache,
+    )
+    current_span().set(chunks=len(chunks), workers=PARSE_WORKERS if workers is None else workers, cache=cache)
     return chunks
 
 
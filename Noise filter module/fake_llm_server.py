@@ -0,0 +1,302 @@
+"""
+fake_llm_server.py
+Local stand-in for the Groq chat-completions endpoint, for tests and benchmarks.
+Speaks the OpenAI-compatible /openai/v1/chat/completions protocol that the
+groq clients use, so real Groq / AsyncGroq clients (base_url=server.base_url)
+exercise their actual HTTP path, timeouts included. Responses follow the
+prompt formats in prompts.py; latency, 429s and malformed JSON can be
+injected per request from a seeded RNG, so runs are reproducible.
+
+With hashed_labels, each chunk's verdict is derived from a hash of its text:
+deterministic, identical across prompt modes, and spread over every label.
+With a cassette (llm_cassette.py) recorded responses are replayed; with an
+upstream as well, misses are forwarded to the real provider and recorded.
+
+Usage:
+    with FakeLLMServer(delay_s=0.05, slow_fraction=0.05, slow_delay_s=3) as server:
+        client = AsyncGroq(api_key="test", base_url=server.base_url)
+
+    python fake_llm_server.py [--port 8765] [--delay 0.2] [--jitter 0.5] [--rate-limit 0.02]
+                              [--malformed 0.01] [--hashed-labels] [--seed 0]
+                              [--replay cassette.jsonl | --record cassette.jsonl]
+    GROQ_BASE_URL=http://127.0.0.1:8765 python main.py ...
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+
+import httpx
+
+from llm_cassette import Cassette
+from prompts import LABEL_CODES, VALID_LABELS
+
+GROQ_UPSTREAM = "https://api.groq.com"   # --record forwards cassette misses here
+
+_CHUNK_MARKER = re.compile(r"--- CHUNK (\d+) ---")
+_COMPACT_ID = re.compile(r"^\[(\d+)\]", re.MULTILINE)
+_BATCH_CONTENT = re.compile(r"--- CHUNK (\d+) ---\n.*?\nContent:\n(.*?)\n\n(?=--- CHUNK \d+ ---|Return a strictly)",
+                            re.DOTALL)
+_COMPACT_LINE = re.compile(r"^\[(\d+)\] [^:\n]*: (.*)$", re.MULTILINE)
+_SINGLE_CONTENT = re.compile(r"CHUNK CONTENT:\n(.*?)\nEND CHUNK CONTENT", re.DOTALL)
+_LABEL_CODE = {label: code for code, label in LABEL_CODES.items()}
+
+HASHED_TEXT_CHARS = 200     # verdicts hash this much of the whitespace-normalised text
+
+
+def hashed_verdict(text: str) -> dict:
+    """Deterministic verdict for a chunk text (same answer in every prompt mode)."""
+    digest = hashlib.sha256(" ".join(text.split())[:HASHED_TEXT_CHARS].encode("utf-8")).digest()
+    return {"label": VALID_LABELS[digest[0] % len(VALID_LABELS)],
+            "confidence": round(0.5 + digest[1] / 510, 2), "reasoning": "fake server"}
+
+
+def fake_completion_text(messages: list[dict], json_mode: bool, hashed_labels: bool = False) -> str:
+    """Answer a chat request the way the pipeline's prompts expect."""
+    prompt = messages[-1]["content"] if messages else ""
+    fixed = {"label": "requirement", "confidence": 0.95, "reasoning": "fake server"}
+
+    def verdict(text: str) -> dict:
+        return hashed_verdict(text) if hashed_labels else fixed
+
+    if prompt.startswith("CLASSIFY"):
+        rows = []
+        for i, text in _COMPACT_LINE.findall(prompt):
+            v = verdict(text)
+            rows.append([int(i), _LABEL_CODE[v["label"]], v["confidence"]])
+        return json.dumps({"r": rows})
+    if prompt.startswith("EXPLAIN"):
+        return json.dumps({"r": [[int(i), "fake server"] for i in _COMPACT_ID.findall(prompt)]})
+    indices = _CHUNK_MARKER.findall(prompt)
+    if indices:
+        texts = dict(_BATCH_CONTENT.findall(prompt))
+        return json.dumps({"results": [{"index": int(i), **verdict(texts.get(i, ""))} for i in indices]})
+    single = _SINGLE_CONTENT.search(prompt)
+    if single:
+        return json.dumps(verdict(single.group(1)))
+    return json.dumps({}) if json_mode else "Generated section text from the fake LLM server."
+
+
+class FakeLLMServer:
+    """
+    Threaded HTTP server on 127.0.0.1 answering chat completions.
+    Each request waits delay_s, or slow_delay_s for a seeded random
+    `slow_fraction` of requests; `delay_fn(request_number)` overrides both.
+    `jitter` multiplies delays by a seeded lognormal factor (sigma=jitter).
+    A seeded `rate_limit_fraction` of requests gets a 429 (Retry-After:
+    retry_after_s) and a `malformed_fraction` gets truncated JSON.
+    While `fail_status` is set (e.g. 503, 429) every request is answered
+    with that HTTP error instead — an outage or an exhausted quota.
+    """
+
+    def __init__(
+        self,
+        delay_s: float = 0.0,
+        slow_fraction: float = 0.0,
+        slow_delay_s: float = 0.0,
+        delay_fn: Optional[Callable[[int], float]] = None,
+        seed: int = 0,
+        fail_status: Optional[int] = None,
+        jitter: float = 0.0,
+        rate_limit_fraction: float = 0.0,
+        retry_after_s: float = 1.0,
+        malformed_fraction: float = 0.0,
+        hashed_labels: bool = False,
+        cassette: Optional[Cassette] = None,
+        upstream: Optional[str] = None,
+        port: int = 0,
+    ):
+        self.delay_s = delay_s
+        self.slow_fraction = slow_fraction
+        self.slow_delay_s = slow_delay_s
+        self.delay_fn = delay_fn
+        self.fail_status = fail_status
+        self.jitter = jitter
+        self.rate_limit_fraction = rate_limit_fraction
+        self.retry_after_s = retry_after_s
+        self.malformed_fraction = malformed_fraction
+        self.hashed_labels = hashed_labels
+        self.cassette = cassette
+        self.upstream = upstream
+        self.port = port
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.models: dict[str, int] = {}
+        self.rate_limited = 0
+        self.malformed = 0
+        self.replayed = 0
+        self.recorded = 0
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _next_request(self, model: str) -> tuple[float, Optional[str]]:
+        """(delay, injected fault or None) for the next request, drawn in arrival order."""
+        with self._lock:
+            self.requests += 1
+            n = self.requests
+            self.models[model] = self.models.get(model, 0) + 1
+            slow = self._rng.random() < self.slow_fraction
+            factor = self._rng.lognormvariate(0.0, self.jitter) if self.jitter else 1.0
+            faulty = self.rate_limit_fraction or self.malformed_fraction
+            roll = self._rng.random() if faulty else 1.0
+            fault = None
+            if roll < self.rate_limit_fraction:
+                fault = "rate_limit"
+                self.rate_limited += 1
+            elif roll < self.rate_limit_fraction + self.malformed_fraction:
+                fault = "malformed"
+                self.malformed += 1
+        if self.delay_fn is not None:
+            return self.delay_fn(n), fault
+        return (self.slow_delay_s if slow else self.delay_s) * factor, fault
+
+    def _answer(self, body: dict, authorization: str) -> tuple[int, dict]:
+        """(status, response body) from the cassette, the upstream provider or the fake."""
+        if self.cassette is not None:
+            recorded = self.cassette.get(body)
+            if recorded is not None:
+                with self._lock:
+                    self.replayed += 1
+                return 200, recorded
+            if self.upstream is not None:
+                response = httpx.post(f"{self.upstream.rstrip('/')}/openai/v1/chat/completions", json=body,
+                                      headers={"Authorization": authorization}, timeout=120.0)
+                payload = response.json()
+                if response.status_code == 200:
+                    self.cassette.put(body, payload)
+                    with self._lock:
+                        self.recorded += 1
+                return response.status_code, payload
+        json_mode = (body.get("response_format") or {}).get("type") == "json_object"
+        return 200, {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", ""),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant",
+                                     "content": fake_completion_text(body.get("messages", []), json_mode,
+                                                                     self.hashed_labels)}}],
+            "usage": {"prompt_tokens": 100, "completion_tokens": 20, "total_tokens": 120},
+        }
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send(self, status: int, payload: dict, headers: Optional[dict] = None):
+                data = json.dumps(payload).encode("utf-8")
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    for name, value in (headers or {}).items():
+                        self.send_header(name, value)
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the client gave up (timeout or a hedge won)
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                delay, fault = server._next_request(body.get("model", ""))
+                time.sleep(delay)
+                status = server.fail_status
+                if status is None and fault == "rate_limit":
+                    status = 429
+                if status is not None:
+                    headers = {"Retry-After": f"{server.retry_after_s:g}"} if status == 429 else None
+                    self._send(status, {"error": {"message": f"fake server error {status}"}}, headers)
+                    return
+                status, payload = server._answer(body, self.headers.get("Authorization", ""))
+                if fault == "malformed" and status == 200:
+                    content = payload["choices"][0]["message"]["content"]
+                    payload = {**payload, "choices": [{**payload["choices"][0], "message": {
+                        "role": "assistant", "content": content[: len(content) // 2]}}]}
+                self._send(status, payload)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "FakeLLMServer":
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", self.port), self._handler())
+        self._httpd.daemon_threads = True
+        self._httpd.block_on_close = False
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake_llm_server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self) -> "FakeLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+_FLOAT_FLAGS = {"--delay": "delay_s", "--jitter": "jitter", "--rate-limit": "rate_limit_fraction",
+                "--malformed": "malformed_fraction", "--retry-after": "retry_after_s"}
+
+
+def main():
+    args = sys.argv[1:]
+    kwargs: dict = {"port": 8765}
+    try:
+        while args:
+            flag = args.pop(0)
+            if flag in _FLOAT_FLAGS:
+                kwargs[_FLOAT_FLAGS[flag]] = float(args.pop(0))
+            elif flag in ("--port", "--seed"):
+                kwargs[flag[2:]] = int(args.pop(0))
+            elif flag == "--hashed-labels":
+                kwargs["hashed_labels"] = True
+            elif flag in ("--replay", "--record"):
+                kwargs["cassette"] = Cassette(args.pop(0))
+                kwargs["upstream"] = GROQ_UPSTREAM if flag == "--record" else None
+            else:
+                raise ValueError(flag)
+    except (IndexError, ValueError):
+        print(__doc__)
+        sys.exit(1)
+
+    server = FakeLLMServer(**kwargs).start()
+    mode = "recording" if kwargs.get("upstream") else "replaying" if kwargs.get("cassette") else "faking"
+    print(f"Fake LLM server on {server.base_url} ({mode}); set GROQ_BASE_URL={server.base_url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print(f"{server.requests} requests  |  {server.rate_limited} rate-limited  |  {server.malformed} malformed  "
+              f"|  {server.replayed} replayed  |  {server.recorded} recorded")
+
+
+if __name__ == "__main__":
+    main()
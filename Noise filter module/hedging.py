@@ -0,0 +1,154 @@
+"""
+hedging.py
+Deadlines and hedged requests for LLM calls.
+A run gets one time budget (Deadline) and every call's timeout is derived
+from what is left of it, so a hung connection can cost at most the rest of
+the run, never more. LatencyTracker keeps recent call latencies per model;
+once a call has been outstanding for longer than the HEDGE_PERCENTILE
+latency, a duplicate request is fired and whichever answers first wins —
+the other is cancelled.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+HEDGE_PERCENTILE = 95       # fire the duplicate once a call is slower than this percentile
+HEDGE_MIN_SAMPLES = 20      # no hedging until this many latencies have been seen
+LATENCY_WINDOW = 500        # recent latencies kept per tracker
+LATENCY_BUCKETS_S = (0.25, 0.5, 1, 2, 4, 8, 16, 32, 64)
+
+
+class Deadline:
+    """A run-level time budget; budget_s=None never expires."""
+
+    def __init__(self, budget_s: Optional[float], clock=time.monotonic):
+        self._clock = clock
+        self.expires_at = None if budget_s is None else clock() + budget_s
+
+    def remaining(self) -> float:
+        if self.expires_at is None:
+            return math.inf
+        return max(0.0, self.expires_at - self._clock())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def timeout(self, per_call: float) -> float:
+        """Timeout for the next call: the per-call cap, or less if the budget is nearly spent."""
+        return min(per_call, self.remaining())
+
+
+class LatencyTracker:
+    """Rolling call latencies, the hedge delay derived from them, and hedge counts."""
+
+    def __init__(
+        self,
+        percentile: Optional[float] = None,
+        min_samples: Optional[int] = None,
+        window: Optional[int] = None,
+    ):
+        self.percentile_target = HEDGE_PERCENTILE if percentile is None else percentile
+        self.min_samples = HEDGE_MIN_SAMPLES if min_samples is None else min_samples
+        self._lock = threading.Lock()
+        self._samples: deque[float] = deque(maxlen=window or LATENCY_WINDOW)
+        self.calls = 0
+        self.hedged = 0         # duplicates fired
+        self.hedge_wins = 0     # ... that answered first
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+            self.calls += 1
+
+    def percentile(self, p: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, math.ceil(p / 100 * len(samples)) - 1)]
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None while there is too little history."""
+        if len(self._samples) < self.min_samples:
+            return None
+        return self.percentile(self.percentile_target)
+
+    def histogram(self, buckets=LATENCY_BUCKETS_S) -> dict[str, int]:
+        with self._lock:
+            samples = list(self._samples)
+        counts = {f"<={b}s": 0 for b in buckets}
+        counts[f">{buckets[-1]}s"] = 0
+        for s in samples:
+            for b in buckets:
+                if s <= b:
+                    counts[f"<={b}s"] += 1
+                    break
+            else:
+                counts[f">{buckets[-1]}s"] += 1
+        return counts
+
+    def summary(self) -> str:
+        if not self._samples:
+            return "no calls"
+        p = {q: self.percentile(q) for q in (50, 95, 99, 100)}
+        return (f"p50 {p[50]:.2f}s  |  p95 {p[95]:.2f}s  |  p99 {p[99]:.2f}s  |  max {p[100]:.2f}s  "
+                f"|  hedged {self.hedged} (won {self.hedge_wins})")
+
+
+_TRACKERS: dict[str, LatencyTracker] = {}
+_TRACKERS_LOCK = threading.Lock()
+
+
+def get_latency_tracker(key: str) -> LatencyTracker:
+    """Process-wide tracker per model, so every run hedges from the same history."""
+    with _TRACKERS_LOCK:
+        if key not in _TRACKERS:
+            _TRACKERS[key] = LatencyTracker()
+        return _TRACKERS[key]
+
+
+async def hedged_call(
+    make_call: Callable[[bool], Awaitable],
+    tracker: Optional[LatencyTracker] = None,
+):
+    """
+    Await make_call(False); if it is still outstanding after the tracker's
+    hedge delay, also start make_call(True) and return whichever succeeds
+    first, cancelling the other. An error only propagates once both calls
+    have failed. The answering call's own latency goes to the tracker.
+    """
+    hedge_after = tracker.hedge_delay() if tracker is not None else None
+
+    async def timed(hedge: bool):
+        t0 = time.monotonic()
+        result = await make_call(hedge)
+        return result, time.monotonic() - t0, hedge
+
+    tasks = {asyncio.ensure_future(timed(False))}
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+        if not done:
+            tracker.hedged += 1
+            tasks.add(asyncio.ensure_future(timed(True)))
+        error = None
+        while tasks:
+            done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    result, elapsed, hedge = task.result()
+                    if tracker is not None:
+                        tracker.record(elapsed)
+                        tracker.hedge_wins += hedge
+                    return result
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            task.cancel()
+
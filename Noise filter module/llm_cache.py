@@ -0,0 +1,124 @@
+"""
+llm_cache.py
+Persistent, content-addressed cache of LLM classification verdicts.
+Backed by the AKS database (see storage.py); keyed on the MD5 of the
+chunk's cleaned_text, the model name and the prompt version.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+
+from storage import (
+    init_classification_cache,
+    get_cached_classifications,
+    store_cached_classifications,
+    evict_classification_cache,
+)
+
+CACHE_MAX_ENTRIES = 200_000
+
+# Verdicts carrying this reasoning are failure fallbacks, never real answers
+LLM_FAILURE_REASONING = "Batch LLM failed."
+# ...and this one marks chunks that reached the LLM stage while its circuit breaker was open
+DEGRADED_REASONING = "LLM unavailable (circuit breaker open): marked noise pending re-classification."
+
+
+def content_hash(text: str) -> str:
+    """Same MD5 content hash main.py and ami_parser use for exact dedup."""
+    return hashlib.md5(text.encode("utf-8")).hexdigest()
+
+
+class ClassificationCache:
+    """
+    Read-through / write-back cache used by run_parallel_batches.
+    Database errors are logged and treated as misses — the cache never
+    fails a classification run.
+    """
+
+    def __init__(self, model_name: str, prompt_version: str, max_entries: int = CACHE_MAX_ENTRIES):
+        self.model_name = model_name
+        self.prompt_version = prompt_version
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._ready = False
+
+    def _ensure_table(self) -> bool:
+        if not self._ready:
+            try:
+                init_classification_cache()
+                self._ready = True
+            except Exception as e:
+                logging.warning(f"LLM cache unavailable: {e}")
+        return self._ready
+
+    def lookup(
+        self, pending: list[tuple[int, dict]]
+    ) -> tuple[dict[int, dict], list[tuple[int, dict]]]:
+        """
+        Split (index, chunk) pairs into cached verdicts and remaining work.
+        Returns ({index → raw_result_dict}, [(index, chunk), ...] still to classify).
+        """
+        keyed = [(i, c, content_hash(c.get("cleaned_text", ""))) for i, c in pending]
+        found: dict[str, dict] = {}
+        if keyed and self._ensure_table():
+            try:
+                found = get_cached_classifications(
+                    [h for _, _, h in keyed], self.model_name, self.prompt_version
+                )
+            except Exception as e:
+                logging.warning(f"LLM cache lookup failed: {e}")
+
+        cached: dict[int, dict] = {}
+        remaining: list[tuple[int, dict]] = []
+        for i, c, h in keyed:
+            if h in found:
+                cached[i] = dict(found[h])
+            else:
+                remaining.append((i, c))
+        self.hits += len(cached)
+        self.misses += len(remaining)
+        return cached, remaining
+
+    def store(self, batch: list[tuple[int, dict]], results: dict[int, dict]):
+        """Write back raw (pre-threshold) verdicts for one completed batch."""
+        entries = {}
+        for i, c in batch:
+            r = results.get(i)
+            if r is None or r.get("reasoning") in (LLM_FAILURE_REASONING, DEGRADED_REASONING):
+                continue
+            entries[content_hash(c.get("cleaned_text", ""))] = {
+                "label": r["label"],
+                "confidence": r["confidence"],
+                "reasoning": r["reasoning"],
+            }
+        if not entries or not self._ensure_table():
+            return
+        try:
+            store_cached_classifications(entries, self.model_name, self.prompt_version)
+            self.writes += len(entries)
+        except Exception as e:
+            logging.warning(f"LLM cache write failed: {e}")
+
+    def evict(self):
+        """Trim the table back to max_entries, least recently used first."""
+        if not self._ready:
+            return
+        try:
+            self.evictions += evict_classification_cache(self.max_entries)
+        except Exception as e:
+            logging.warning(f"LLM cache eviction failed: {e}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,60 @@
+"""
+llm_cassette.py
+Record/replay store for chat-completion responses.
+Each response is keyed by a hash of the request fields that determine the
+answer (model, messages, response format, sampling settings), so a run
+replayed from a cassette gets byte-identical responses with no network and
+no provider latency. Cassettes are append-only JSONL files; fake_llm_server
+records into them (proxying to the real provider) and replays from them.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+CASSETTE_KEY_FIELDS = ("model", "messages", "response_format", "temperature", "max_tokens", "top_p")
+
+
+def request_key(body: dict) -> str:
+    """Stable hash of the parts of a chat-completions request that decide its answer."""
+    material = {field: body.get(field) for field in CASSETTE_KEY_FIELDS}
+    return hashlib.sha256(json.dumps(material, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    """Responses by request_key(), loaded from and appended to one JSONL file."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict] = {}
+        if self.path.exists():
+            with self.path.open(encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries[entry["key"]] = entry["response"]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, body: dict) -> Optional[dict]:
+        with self._lock:
+            return self._entries.get(request_key(body))
+
+    def put(self, body: dict, response: dict):
+        """Store a response; the first recording of a request wins."""
+        key = request_key(body)
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = response
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps({"key": key, "model": body.get("model"), "recorded_at": time.time(),
+                                    "response": response}, ensure_ascii=False) + "\n")
@@ -0,0 +1,349 @@
+"""
+local_model.py
+CPU-only fallback classifier between the domain gate and the LLM.
+A hashed word + bigram softmax model (multinomial logistic regression),
+trained offline on the LLM verdicts already stored in the AKS. Confident
+predictions are accepted locally; everything else is escalated to the LLM.
+
+Usage:
+    python local_model.py retrain [min_confidence]   # train + write models/local_classifier_v<N>.json
+    python local_model.py report                     # re-evaluate the latest model on held-out rows
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import random
+import re
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, Optional
+
+from prompts import VALID_LABELS, PROMPT_VERSION
+from llm_cache import LLM_FAILURE_REASONING, DEGRADED_REASONING
+
+_HERE = Path(__file__).parent
+
+MODEL_DIR = _HERE / "models"
+MODEL_FORMAT = 1
+HASH_DIM = 1 << 20
+LOCAL_MODEL_MIN_CONFIDENCE = 0.90   # accept locally at or above this probability
+MIN_TRAINING_ROWS = 200
+HOLDOUT_PERCENT = 20                # rows held out for the report, chosen by text hash
+EPOCHS = 8
+LEARNING_RATE = 0.5
+
+LOCAL_MODEL_REASONING_PREFIX = "Local model"
+
+# Verdicts that did not come from the LLM — never used as training labels
+_NON_LLM_REASONING = {
+    "Classified by heuristic rule.",
+    "No project-relevant domain terms detected.",
+    LLM_FAILURE_REASONING,
+    DEGRADED_REASONING,
+}
+
+_WORD = re.compile(r"[a-z0-9']+")
+_MODEL_FILE = re.compile(r"local_classifier_v(\d+)\.json$")
+
+
+def featurize(text: str, dim: int = HASH_DIM) -> dict[int, float]:
+    """L2-normalised counts of hashed words and bigrams (crc32: stable across processes)."""
+    words = _WORD.findall(text.lower())
+    feats: dict[int, float] = {}
+    for gram in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+        f = zlib.crc32(gram.encode("utf-8")) % dim
+        feats[f] = feats.get(f, 0.0) + 1.0
+    norm = math.sqrt(sum(v * v for v in feats.values())) or 1.0
+    return {f: v / norm for f, v in feats.items()}
+
+
+def _softmax(scores: list[float]) -> list[float]:
+    top = max(scores)
+    exps = [math.exp(s - top) for s in scores]
+    total = sum(exps)
+    return [e / total for e in exps]
+
+
+class LocalClassifier:
+    """Sparse linear model over hashed features; only trained features are stored."""
+
+    def __init__(self, labels: list[str], weights: dict[int, list[float]], bias: list[float],
+                 version: int = 0, hash_dim: int = HASH_DIM, meta: Optional[dict] = None):
+        self.labels = labels
+        self.weights = weights
+        self.bias = bias
+        self.version = version
+        self.hash_dim = hash_dim
+        self.meta = meta or {}
+
+    def predict_proba(self, text: str) -> list[float]:
+        scores = list(self.bias)
+        for f, v in featurize(text, self.hash_dim).items():
+            w = self.weights.get(f)
+            if w is not None:
+                for k, wk in enumerate(w):
+                    scores[k] += wk * v
+        return _softmax(scores)
+
+    def predict(self, text: str) -> tuple[str, float]:
+        probs = self.predict_proba(text)
+        k = max(range(len(probs)), key=probs.__getitem__)
+        return self.labels[k], probs[k]
+
+    def save(self, model_dir: Optional[Path] = None) -> Path:
+        """Write the next versioned artifact (local_classifier_v<N>.json) and return its path."""
+        model_dir = Path(model_dir or MODEL_DIR)
+        model_dir.mkdir(parents=True, exist_ok=True)
+        self.version = max((v for v, _ in _model_files(model_dir)), default=0) + 1
+        path = model_dir / f"local_classifier_v{self.version}.json"
+        payload = {
+            "format": MODEL_FORMAT,
+            "version": self.version,
+            "labels": self.labels,
+            "hash_dim": self.hash_dim,
+            "bias": self.bias,
+            "weights": {str(f): [round(x, 6) for x in w] for f, w in self.weights.items()},
+            "meta": self.meta,
+        }
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(payload), encoding="utf-8")
+        tmp.replace(path)
+        return path
+
+    @classmethod
+    def load(cls, path: Path) -> "LocalClassifier":
+        payload = json.loads(Path(path).read_text(encoding="utf-8"))
+        if payload.get("format") != MODEL_FORMAT:
+            raise ValueError(f"Unsupported local model format: {payload.get('format')}")
+        return cls(
+            labels=payload["labels"],
+            weights={int(f): w for f, w in payload["weights"].items()},
+            bias=payload["bias"],
+            version=payload["version"],
+            hash_dim=payload["hash_dim"],
+            meta=payload.get("meta", {}),
+        )
+
+
+def _model_files(model_dir: Path) -> list[tuple[int, Path]]:
+    if not model_dir.exists():
+        return []
+    return sorted(
+        (int(m.group(1)), p) for p in model_dir.iterdir() if (m := _MODEL_FILE.search(p.name))
+    )
+
+
+_loaded: dict = {}
+_loaded_lock = threading.Lock()
+
+
+def load_latest_model(model_dir: Optional[Path] = None) -> Optional[LocalClassifier]:
+    """Highest-versioned artifact in model_dir, cached per process; None if none exists."""
+    files = _model_files(Path(model_dir or MODEL_DIR))
+    if not files:
+        return None
+    _, path = files[-1]
+    key = (str(path), path.stat().st_mtime)
+    with _loaded_lock:
+        if _loaded.get("key") != key:
+            try:
+                _loaded["model"] = LocalClassifier.load(path)
+            except (OSError, ValueError, KeyError) as e:
+                logging.warning(f"Local model {path.name} unusable: {e}")
+                _loaded["model"] = None
+            _loaded["key"] = key
+        return _loaded["model"]
+
+
+def classify_locally(
+    model: LocalClassifier,
+    pending: list[tuple[int, dict]],
+    min_confidence: Optional[float] = None,
+) -> tuple[dict[int, dict], list[tuple[int, dict]]]:
+    """
+    Split (index, chunk) pairs into {index → result} accepted locally and
+    the pairs to escalate to the LLM.
+    """
+    min_confidence = LOCAL_MODEL_MIN_CONFIDENCE if min_confidence is None else min_confidence
+    accepted: dict[int, dict] = {}
+    escalated: list[tuple[int, dict]] = []
+    for idx, chunk in pending:
+        label, prob = model.predict(chunk.get("cleaned_text", ""))
+        if prob >= min_confidence:
+            accepted[idx] = {
+                "label": label,
+                "confidence": round(prob, 3),
+                "reasoning": f"{LOCAL_MODEL_REASONING_PREFIX} v{model.version} (p={prob:.2f}).",
+            }
+        else:
+            escalated.append((idx, chunk))
+    return accepted, escalated
+
+
+# ---------------------------------------------------------------------------
+# Training
+# ---------------------------------------------------------------------------
+
+def training_examples(chunks: Iterable) -> list[tuple[str, str]]:
+    """
+    (text, label) pairs from stored ClassifiedChunks whose label came from the
+    LLM itself: heuristic, failure, local-model and near-duplicate verdicts are
+    skipped, as are low-confidence rows (their label was forced to noise) and
+    manually restored ones. Duplicate texts keep their newest verdict.
+    """
+    from classifier import MIN_ACCEPT_CONFIDENCE    # classifier imports this module at load time
+
+    seen: set[str] = set()
+    examples = []
+    for c in chunks:
+        if (c.reasoning in _NON_LLM_REASONING
+                or c.reasoning.startswith(LOCAL_MODEL_REASONING_PREFIX)
+                or getattr(c, "duplicate_of", None)
+                or c.manually_restored
+                or c.confidence < MIN_ACCEPT_CONFIDENCE):
+            continue
+        text = (c.cleaned_text or "").strip()
+        if text and text not in seen:
+            seen.add(text)
+            examples.append((text, c.label.value))
+    return examples
+
+
+def split_holdout(examples: list[tuple[str, str]]) -> tuple[list, list]:
+    """Deterministic by text hash, so a row stays on the same side across retrains."""
+    train, holdout = [], []
+    for ex in examples:
+        (holdout if zlib.crc32(ex[0].encode("utf-8")) % 100 < HOLDOUT_PERCENT else train).append(ex)
+    return train, holdout
+
+
+def fit(examples: list[tuple[str, str]], epochs: int = EPOCHS, seed: int = 0) -> LocalClassifier:
+    """Plain SGD on the softmax cross-entropy, learning rate decaying per epoch."""
+    labels = list(VALID_LABELS)
+    label_id = {label: k for k, label in enumerate(labels)}
+    data = [(list(featurize(text).items()), label_id[label]) for text, label in examples]
+    weights: dict[int, list[float]] = {}
+    bias = [0.0] * len(labels)
+    rng = random.Random(seed)
+    order = list(range(len(data)))
+
+    for epoch in range(epochs):
+        rng.shuffle(order)
+        step = LEARNING_RATE / (1 + epoch)
+        for i in order:
+            feats, y = data[i]
+            scores = list(bias)
+            for f, v in feats:
+                w = weights.get(f)
+                if w is not None:
+                    for k, wk in enumerate(w):
+                        scores[k] += wk * v
+            grad = _softmax(scores)
+            grad[y] -= 1.0
+            for k, g in enumerate(grad):
+                bias[k] -= step * g
+            for f, v in feats:
+                w = weights.setdefault(f, [0.0] * len(labels))
+                for k, g in enumerate(grad):
+                    w[k] -= step * g * v
+
+    return LocalClassifier(labels, weights, bias)
+
+
+def evaluate(model: LocalClassifier, holdout: list[tuple[str, str]],
+             min_confidence: Optional[float] = None) -> dict:
+    """
+    Accuracy against held-out LLM labels, overall and on the predictions that
+    would be accepted locally, plus the share of LLM calls those save.
+    """
+    min_confidence = LOCAL_MODEL_MIN_CONFIDENCE if min_confidence is None else min_confidence
+    correct = accepted = accepted_correct = 0
+    per_label: dict[str, Counter] = {}
+    for text, label in holdout:
+        pred, prob = model.predict(text)
+        hit = pred == label
+        correct += hit
+        stats = per_label.setdefault(label, Counter())
+        stats["support"] += 1
+        if prob >= min_confidence:
+            accepted += 1
+            accepted_correct += hit
+            stats["accepted"] += 1
+            stats["accepted_correct"] += hit
+    n = len(holdout)
+    return {
+        "holdout_rows": n,
+        "min_confidence": min_confidence,
+        "accuracy": round(correct / n, 4) if n else None,
+        "accepted_accuracy": round(accepted_correct / accepted, 4) if accepted else None,
+        "llm_calls_saved": round(accepted / n, 4) if n else None,
+        "per_label": {label: dict(stats) for label, stats in sorted(per_label.items())},
+    }
+
+
+def retrain(min_confidence: Optional[float] = None, chunks=None,
+            model_dir: Optional[Path] = None) -> tuple[Path, dict]:
+    """Train on stored LLM verdicts (or `chunks`), report on the held-out share, save a new version."""
+    if chunks is None:
+        from storage import get_labelled_chunks
+        chunks = get_labelled_chunks()
+    examples = training_examples(chunks)
+    if len(examples) < MIN_TRAINING_ROWS:
+        raise ValueError(f"Only {len(examples)} LLM-labelled rows; need {MIN_TRAINING_ROWS} to train")
+
+    train, holdout = split_holdout(examples)
+    t0 = time.perf_counter()
+    model = fit(train)
+    report = evaluate(model, holdout, min_confidence)
+    model.meta = {
+        "trained_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "train_rows": len(train),
+        "train_seconds": round(time.perf_counter() - t0, 2),
+        "label_counts": dict(Counter(label for _, label in train)),
+        "teacher_prompt_version": PROMPT_VERSION,
+        "report": report,
+    }
+    return model.save(model_dir), report
+
+
+def print_report(report: dict):
+    print(f"  Held-out rows:        {report['holdout_rows']}")
+    print(f"  Accuracy (all):       {report['accuracy']}")
+    print(f"  Accepted locally:     {report['llm_calls_saved']}  (share of LLM calls saved, "
+          f"p ≥ {report['min_confidence']})")
+    print(f"  Accuracy (accepted):  {report['accepted_accuracy']}")
+    for label, stats in report["per_label"].items():
+        print(f"    {label:<22} support {stats.get('support', 0):>5}  "
+              f"accepted {stats.get('accepted', 0):>5}  correct {stats.get('accepted_correct', 0):>5}")
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "report"
+    if command == "retrain":
+        threshold = float(sys.argv[2]) if len(sys.argv) > 2 else None
+        try:
+            path, report = retrain(threshold)
+        except ValueError as e:
+            print(f"ERROR: {e}")
+            sys.exit(1)
+        print(f"Saved {path.name}")
+        print_report(report)
+    elif command == "report":
+        model = load_latest_model()
+        if model is None:
+            print(f"No model in {MODEL_DIR}. Run: python local_model.py retrain")
+            sys.exit(1)
+        from storage import get_labelled_chunks
+        _, holdout = split_holdout(training_examples(get_labelled_chunks()))
+        print(f"Local model v{model.version} (trained {model.meta.get('trained_at')})")
+        print_report(evaluate(model, holdout))
+    else:
+        print("Usage: python local_model.py [retrain [min_confidence] | report]")
+        sys.exit(1)
@@ -2,6 +2,10 @@
 main.py
 Entry point for the Noise Filter Module.
 Runs the full pipeline: parse Enron CSV → classify → print summary.
+
+Usage:
+    python main.py                   # new run (journaled under runs/)
+    python main.py --resume <run_id> # continue an interrupted run
 """
 
 from __future__ import annotations
@@ -20,8 +24,10 @@ from dotenv import load_dotenv
 _HERE = Path(__file__).parent
 load_dotenv(_HERE / ".env")
 
-from classifier import classify_chunks
+from classifier import classify_chunks, is_degraded, requeue_and_wait, resume_run
 from enron_parser import parse_to_chunks
+from run_journal import new_run_id
+from tracing import span
 
 # ---------------------------------------------------------------------------
 # Config
@@ -29,6 +35,8 @@ from enron_parser import parse_to_chunks
 
 CSV_PATH = _HERE / "emails.csv" / "emails.csv"
 N_EMAILS = 500  # number of emails to process in demo mode
+HEURISTIC_WORKERS = 0  # Phase 1 worker processes (0 → one per core; small runs stay serial)
+REQUEUE_WAIT_S = 120  # how long to wait for Groq to recover before exiting with degraded chunks
 
 def print_confidence_distribution(classified):
     llm_items = [c for c in classified 
@@ -109,6 +117,25 @@ def main():
         print("ERROR: GROQ_CLOUD_API not set in .env")
         sys.exit(1)
 
+    resume_id = None
+    if "--resume" in sys.argv:
+        pos = sys.argv.index("--resume")
+        if pos + 1 >= len(sys.argv):
+            print("Usage: python main.py --resume <run_id>   (see: python run_journal.py list)")
+            sys.exit(1)
+        resume_id = sys.argv[pos + 1]
+
+    if resume_id:
+        from storage import init_db, store_chunks, update_chunk_verdicts
+        init_db()
+        print(f"Resuming run {resume_id}...")
+        _t_cls = time.perf_counter()
+        classified = _run_classification(resume_id, lambda: resume_run(
+            resume_id, api_key=api_key, heuristic_workers=HEURISTIC_WORKERS))
+        print(f"  → Done. {len(classified)} chunks classified in {time.perf_counter() - _t_cls:.1f}s\n")
+        _store_and_report(classified, store_chunks, update_chunk_verdicts, api_key, _t0)
+        return
+
     print(f"Loading and parsing {N_EMAILS} emails from Enron dataset...")
     chunks = parse_to_chunks(CSV_PATH, n=N_EMAILS)
     
@@ -128,15 +155,30 @@ def main():
     print(f"  → {len(unique_chunks)} unique chunks after content deduplication\n")
     chunks = unique_chunks
     # Initialize the database
-    from storage import init_db, store_chunks
+    from storage import init_db, store_chunks, update_chunk_verdicts
     init_db()
     print("AKS Database initialized.")
 
-    print("Classifying chunks...")
+    run_id = new_run_id()
+    print(f"Classifying chunks (run {run_id})...")
     _t_cls = time.perf_counter()
-    classified = classify_chunks(chunks, api_key=api_key)
+    classified = _run_classification(run_id, lambda: classify_chunks(
+        chunks, api_key=api_key, heuristic_workers=HEURISTIC_WORKERS, run_id=run_id))
     print(f"  → Done. {len(classified)} chunks classified in {time.perf_counter() - _t_cls:.1f}s\n")
-    
+    _store_and_report(classified, store_chunks, update_chunk_verdicts, api_key, _t0)
+
+
+def _run_classification(run_id, classify):
+    """Run classify(); on Ctrl-C, say how to pick the journaled run back up."""
+    try:
+        return classify()
+    except KeyboardInterrupt:
+        print(f"\nInterrupted. Completed LLM batches are journaled; continue with:\n"
+              f"  python main.py --resume {run_id}")
+        sys.exit(130)
+
+
+def _store_and_report(classified, store_chunks, update_chunk_verdicts, api_key, _t0):
     # --- Integration Point for BRD Pipeline ---
 
     
@@ -150,6 +192,13 @@ def main():
     print("Writing chunks to AKS Database...")
     store_chunks(classified)
     print(f"  → Done. Stored {len(classified)} chunks to DB for session {session_id}\n")
+    degraded = sum(is_degraded(c) for c in classified)
+    if degraded:
+        print(f"  → {degraded} chunks were classified while Groq was unavailable (circuit breaker open): "
+              f"stored as noise and flagged for review. Waiting up to {REQUEUE_WAIT_S}s to re-classify them...")
+        left = requeue_and_wait(classified, api_key, update_chunk_verdicts, REQUEUE_WAIT_S)
+        print(f"  → {degraded - left} re-classified"
+              + (f"; {left} still degraded, re-run to classify them with the LLM.\n" if left else ".\n"))
     print(f"To run the BRD generation, switch to the 'brd_module' folder and run:\n  python main.py {session_id}\n")
     # --- End Integration Point ---
 
@@ -212,4 +261,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with span("pipeline.main", argv=" ".join(sys.argv[1:])):
+        main()
@@ -6,6 +6,7 @@ Loads AMI transcripts → classifies → stores in AKS for BRD generation.
 Usage:
     python main_ami.py <path_to_meetings.json> [n_meetings]
     python main_ami.py --huggingface 10  # Load from HuggingFace
+    python main_ami.py --resume <run_id> # Continue an interrupted run
 """
 
 from __future__ import annotations
@@ -23,14 +24,17 @@ _HERE = Path(__file__).parent
 load_dotenv(_HERE / ".env")
 
 from ami_parser import parse_to_chunks
-from classifier import classify_chunks
+from classifier import classify_chunks, is_degraded, requeue_and_wait, resume_run
+from run_journal import new_run_id
 from schema import SignalLabel
+from tracing import span
 
 # ---------------------------------------------------------------------------
 # Config
 # ---------------------------------------------------------------------------
 
 N_MEETINGS = 5  # Default number of meetings to process (can be overridden by CLI arg)
+REQUEUE_WAIT_S = 120  # how long to wait for Groq to recover before exiting with degraded chunks
 
 
 def print_confidence_distribution(classified):
@@ -119,6 +123,42 @@ def inspect_flagged_items(classified):
             print(f"    Reason: {c.reasoning}")
 
 
+def _load_chunks(data_source, source_type, n_meetings):
+    """Steps 1-2: parse the transcripts and drop exact-duplicate chunks."""
+    # -----------------------------------------------------------------------
+    # Step 1: Load and parse transcripts
+    # -----------------------------------------------------------------------
+    
+    print(f"\nLoading and parsing {n_meetings} AMI meetings...")
+    print(f"Source: {data_source if data_source else 'HuggingFace'} ({source_type})")
+    
+    try:
+        chunks = parse_to_chunks(data_source, source_type=source_type, n=n_meetings)
+    except Exception as e:
+        print(f"ERROR: Failed to parse AMI data: {e}")
+        sys.exit(1)
+    
+    if not chunks:
+        print("ERROR: No chunks parsed. Check your data source.")
+        sys.exit(1)
+    
+    # -----------------------------------------------------------------------
+    # Step 2: Content-level deduplication
+    # -----------------------------------------------------------------------
+    
+    seen_hashes = set()
+    unique_chunks = []
+    for c in chunks:
+        content_hash = hashlib.md5(c["cleaned_text"].encode("utf-8")).hexdigest()
+        if content_hash not in seen_hashes:
+            seen_hashes.add(content_hash)
+            unique_chunks.append(c)
+    
+    print(f"  → {len(chunks)} raw chunks parsed")
+    print(f"  → {len(unique_chunks)} unique chunks after content deduplication\n")
+    return unique_chunks
+
+
 def main():
     """
     Main AMI workflow:
@@ -139,9 +179,15 @@ def main():
     data_source = sys.argv[1] if len(sys.argv) > 1 else None
     source_type = "json"  # default
     n_meetings = N_MEETINGS
-    
-    # Check if using HuggingFace
-    if data_source == "--huggingface" or data_source == "-hf":
+    resume_id = None
+    
+    # Check if resuming a journaled run or using HuggingFace
+    if data_source == "--resume":
+        if len(sys.argv) < 3:
+            print("Usage: python main_ami.py --resume <run_id>   (see: python run_journal.py list)")
+            sys.exit(1)
+        resume_id = sys.argv[2]
+    elif data_source == "--huggingface" or data_source == "-hf":
         source_type = "huggingface"
         n_meetings = int(sys.argv[2]) if len(sys.argv) > 2 else N_MEETINGS
         data_source = None  # Will be loaded from HuggingFace
@@ -151,47 +197,18 @@ def main():
         print("Usage:")
         print("  python main_ami.py <path_to_meetings.json> [n_meetings]")
         print("  python main_ami.py --huggingface [n_meetings]")
+        print("  python main_ami.py --resume <run_id>")
         print(f"\nExample: python main_ami.py meetings.json {N_MEETINGS}")
         sys.exit(1)
     
-    # -----------------------------------------------------------------------
-    # Step 1: Load and parse transcripts
-    # -----------------------------------------------------------------------
-    
-    print(f"\nLoading and parsing {n_meetings} AMI meetings...")
-    print(f"Source: {data_source if data_source else 'HuggingFace'} ({source_type})")
-    
-    try:
-        chunks = parse_to_chunks(data_source, source_type=source_type, n=n_meetings)
-    except Exception as e:
-        print(f"ERROR: Failed to parse AMI data: {e}")
-        sys.exit(1)
-    
-    if not chunks:
-        print("ERROR: No chunks parsed. Check your data source.")
-        sys.exit(1)
-    
-    # -----------------------------------------------------------------------
-    # Step 2: Content-level deduplication
-    # -----------------------------------------------------------------------
-    
-    seen_hashes = set()
-    unique_chunks = []
-    for c in chunks:
-        content_hash = hashlib.md5(c["cleaned_text"].encode("utf-8")).hexdigest()
-        if content_hash not in seen_hashes:
-            seen_hashes.add(content_hash)
-            unique_chunks.append(c)
-    
-    print(f"  → {len(chunks)} raw chunks parsed")
-    print(f"  → {len(unique_chunks)} unique chunks after content deduplication\n")
-    chunks = unique_chunks
+    if resume_id is None:
+        chunks = _load_chunks(data_source, source_type, n_meetings)
     
     # -----------------------------------------------------------------------
     # Step 3: Initialize AKS database
     # -----------------------------------------------------------------------
     
-    from storage import init_db, store_chunks
+    from storage import init_db, store_chunks, update_chunk_verdicts
     
     init_db()
     print("AKS Database initialized.")
@@ -200,8 +217,20 @@ def main():
     # Step 4: Classify chunks (heuristics + LLM)
     # -----------------------------------------------------------------------
     
-    print("Classifying chunks with heuristics + LLM...")
-    classified = classify_chunks(chunks, api_key=api_key)
+    if resume_id:
+        run_id = resume_id
+        print(f"Resuming run {run_id} (heuristics + LLM for the batches not yet journaled)...")
+        classify = lambda: resume_run(run_id, api_key=api_key)
+    else:
+        run_id = new_run_id()
+        print(f"Classifying chunks with heuristics + LLM (run {run_id})...")
+        classify = lambda: classify_chunks(chunks, api_key=api_key, run_id=run_id)
+    try:
+        classified = classify()
+    except KeyboardInterrupt:
+        print(f"\nInterrupted. Completed LLM batches are journaled; continue with:\n"
+              f"  python main_ami.py --resume {run_id}")
+        sys.exit(130)
     print(f"  → Done. {len(classified)} chunks classified.\n")
     
     # -----------------------------------------------------------------------
@@ -217,6 +246,13 @@ def main():
     
     store_chunks(classified)
     print(f"  → Done. Stored {len(classified)} chunks to DB for session {session_id}\n")
+    degraded = sum(is_degraded(c) for c in classified)
+    if degraded:
+        print(f"  → {degraded} chunks were classified while Groq was unavailable (circuit breaker open): "
+              f"stored as noise and flagged for review. Waiting up to {REQUEUE_WAIT_S}s to re-classify them...")
+        left = requeue_and_wait(classified, api_key, update_chunk_verdicts, REQUEUE_WAIT_S)
+        print(f"  → {degraded - left} re-classified"
+              + (f"; {left} still degraded, re-run to classify them with the LLM.\n" if left else ".\n"))
     
     # -----------------------------------------------------------------------
     # Step 6: Generate reports and summaries
@@ -278,4 +314,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with span("pipeline.main_ami", argv=" ".join(sys.argv[1:])):
+        main()
@@ -0,0 +1,130 @@
+"""
+near_dedup.py
+Near-duplicate collapsing for the LLM queue.
+Quoted replies with one line changed and reposted announcements hash
+differently, so the exact MD5 dedup in main.py / ami_parser misses them.
+Chunks are sketched with one-permutation MinHash over word shingles and
+bucketed with LSH banding; a candidate joins a cluster only if its exact
+shingle Jaccard similarity to the cluster's representative reaches the
+threshold. Only representatives are sent to the LLM.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Optional
+
+NEAR_DUP_THRESHOLD = 0.85   # min Jaccard similarity (word shingles) to reuse a verdict
+SHINGLE_SIZE = 3            # words per shingle
+MINHASH_BINS = 64           # signature length
+LSH_BANDS = 16              # MINHASH_BINS / LSH_BANDS rows per band
+
+_WORD = re.compile(r"\w+")
+_HASH_MASK = (1 << 64) - 1
+
+
+def shingle_hashes(text: str, size: int = SHINGLE_SIZE) -> frozenset[int]:
+    """Hashes of the lower-cased word `size`-grams of text (the whole text if shorter)."""
+    words = _WORD.findall(text.lower())
+    if len(words) <= size:
+        return frozenset((hash(tuple(words)) & _HASH_MASK,)) if words else frozenset()
+    return frozenset(
+        hash(tuple(words[i:i + size])) & _HASH_MASK for i in range(len(words) - size + 1)
+    )
+
+
+def minhash_signature(shingles: frozenset[int], bins: int = MINHASH_BINS) -> tuple[int, ...]:
+    """
+    One-permutation MinHash: each shingle hash lands in one bin and each bin
+    keeps its minimum. Empty bins borrow from the next non-empty bin
+    (rotation densification), so short texts still get comparable signatures.
+    """
+    sig: list[Optional[int]] = [None] * bins
+    for h in shingles:
+        b, v = h % bins, h // bins
+        if sig[b] is None or v < sig[b]:
+            sig[b] = v
+    if not shingles:
+        return tuple([0] * bins)
+    out = []
+    for b in range(bins):
+        offset = 0
+        while sig[(b + offset) % bins] is None:
+            offset += 1
+        out.append(sig[(b + offset) % bins] * bins + offset)
+    return tuple(out)
+
+
+def jaccard(a: frozenset[int], b: frozenset[int]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class NearDuplicateIndex:
+    """
+    Incremental clustering: add() returns (representative_key, similarity)
+    when text is a near-duplicate of an earlier representative, or None when
+    it becomes a new representative itself. Members are compared with their
+    representative directly, so clusters never drift by chaining.
+    """
+
+    def __init__(
+        self,
+        threshold: float = NEAR_DUP_THRESHOLD,
+        shingle_size: int = SHINGLE_SIZE,
+        bins: int = MINHASH_BINS,
+        bands: int = LSH_BANDS,
+    ):
+        if bins % bands:
+            raise ValueError(f"bins ({bins}) must be a multiple of bands ({bands})")
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.bins = bins
+        self.rows = bins // bands
+        self._buckets: dict[tuple, list] = {}
+        self._shingles: dict = {}
+
+    def add(self, key, text: str) -> Optional[tuple[object, float]]:
+        shingles = shingle_hashes(text, self.shingle_size)
+        sig = minhash_signature(shingles, self.bins)
+        band_keys = [(start, sig[start:start + self.rows]) for start in range(0, self.bins, self.rows)]
+
+        best, best_sim = None, 0.0
+        checked = set()
+        for band_key in band_keys:
+            for rep in self._buckets.get(band_key, ()):
+                if rep in checked:
+                    continue
+                checked.add(rep)
+                sim = jaccard(shingles, self._shingles[rep])
+                if sim > best_sim:
+                    best, best_sim = rep, sim
+        if best is not None and best_sim >= self.threshold:
+            return best, best_sim
+
+        self._shingles[key] = shingles
+        for band_key in band_keys:
+            self._buckets.setdefault(band_key, []).append(key)
+        return None
+
+
+def collapse_near_duplicates(
+    pending: list[tuple[int, dict]],
+    threshold: Optional[float] = None,
+) -> tuple[list[tuple[int, dict]], dict[int, list[tuple[int, float]]]]:
+    """
+    Split (index, chunk) pairs into representatives, in input order, and
+    {representative_index → [(member_index, similarity), ...]}.
+    """
+    index = NearDuplicateIndex(NEAR_DUP_THRESHOLD if threshold is None else threshold)
+    representatives: list[tuple[int, dict]] = []
+    members: dict[int, list[tuple[int, float]]] = {}
+    for idx, chunk in pending:
+        match = index.add(idx, chunk.get("cleaned_text", ""))
+        if match is None:
+            representatives.append((idx, chunk))
+        else:
+            rep, sim = match
+            members.setdefault(rep, []).append((idx, sim))
+    return representatives, members
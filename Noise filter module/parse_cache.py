@@ -0,0 +1,214 @@
+"""
+parse_cache.py
+Columnar cache of parsed corpora. The chunk table a parser builds from a
+source file (emails.csv, an AMI JSON export) is written once as an Arrow
+IPC file; later runs memory-map it instead of parsing again.
+
+A cache entry is keyed by parser name and version, the source's resolved
+path, size and mtime, and the parse options (e.g. n). Touching or replacing
+the source, or bumping the parser's PARSER_VERSION, makes the old entry
+unreachable, and it is deleted when its replacement is written.
+
+Entries live in PARSE_CACHE_DIR, or in a .parse_cache directory next to the
+source file. Needs pyarrow; without it parsing simply runs every time.
+
+Config (env overrides the defaults below):
+    PARSE_CACHE         0 to switch the cache off
+    PARSE_CACHE_DIR     directory for every cache file (default: next to each source)
+
+Usage:
+    python parse_cache.py build enron <emails.csv> [n_rows] [workers]
+    python parse_cache.py build ami <meetings.json> [n_meetings]
+    python parse_cache.py list [cache_dir]
+    python parse_cache.py clear [cache_dir]
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+PARSE_CACHE = os.getenv("PARSE_CACHE", "1") != "0"
+PARSE_CACHE_DIR = os.getenv("PARSE_CACHE_DIR")
+CACHE_DIR_NAME = ".parse_cache"
+CACHE_SUFFIX = ".arrow"
+
+logger = logging.getLogger(__name__)
+_warned_missing = False
+
+
+def _cache_dir(source: Path) -> Path:
+    return Path(PARSE_CACHE_DIR) if PARSE_CACHE_DIR else source.parent / CACHE_DIR_NAME
+
+
+def _digest(value) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+def cache_path(parser: str, version: str, source, options: Optional[dict] = None) -> Path:
+    """Where the entry for this parser / source state / options lives (whether or not it exists)."""
+    source = Path(source).resolve()
+    stat = source.stat()
+    state = {"parser": parser, "version": version, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+             "options": options or {}}
+    return _cache_dir(source) / f"{parser}-{source.stem}-{_digest(str(source))}-{_digest(state)}{CACHE_SUFFIX}"
+
+
+def read_chunks(path: Path) -> list[dict]:
+    """Memory-map a cache file and rebuild its chunk dicts."""
+    with pa.memory_map(str(path), "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+        columns = [table.column(name).to_pylist() for name in table.column_names]
+    return [dict(zip(table.column_names, row)) for row in zip(*columns)]
+
+
+def write_chunks(path: Path, chunks: list[dict], metadata: dict):
+    """Write chunk dicts as an (uncompressed, so mappable) Arrow IPC file, atomically."""
+    table = pa.Table.from_pylist(chunks)
+    table = table.replace_schema_metadata({key: str(value) for key, value in metadata.items()})
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+    with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def cached_chunks(
+    parser: str,
+    version: str,
+    source,
+    build: Callable[[], list[dict]],
+    options: Optional[dict] = None,
+    use_cache: Optional[bool] = None,
+) -> tuple[list[dict], str]:
+    """
+    The chunks build() would return for `source`, from the cache when a valid
+    entry exists; otherwise build() runs and its result is cached.
+    Returns (chunks, "hit" | "miss" | "off"). Cache I/O errors are logged and
+    never fail the parse.
+    """
+    global _warned_missing
+    use_cache = PARSE_CACHE if use_cache is None else use_cache
+    if not use_cache:
+        return build(), "off"
+    if not PYARROW_AVAILABLE:
+        if not _warned_missing:
+            logger.warning("pyarrow is not installed; parsed corpora are not cached (pip install pyarrow)")
+            _warned_missing = True
+        return build(), "off"
+
+    source = Path(source)
+    path = cache_path(parser, version, source, options)
+    if path.exists():
+        try:
+            return read_chunks(path), "hit"
+        except (OSError, pa.ArrowException) as e:
+            logger.warning(f"Unreadable parse cache {path.name} ({e}); parsing again")
+
+    chunks = build()
+    try:
+        stat = source.stat()
+        write_chunks(path, chunks, {
+            "parser": parser, "parser_version": version, "source": str(source.resolve()),
+            "source_size": stat.st_size, "source_mtime_ns": stat.st_mtime_ns,
+            "options": json.dumps(options or {}, sort_keys=True), "rows": len(chunks),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        })
+        # Entries for older states of the same source are unreachable now
+        prefix = path.name.rsplit("-", 1)[0] + "-"
+        for stale in path.parent.glob(f"{prefix}*{CACHE_SUFFIX}"):
+            if stale != path and _read_metadata(stale).get("options") == json.dumps(options or {}, sort_keys=True):
+                stale.unlink(missing_ok=True)
+    except (OSError, pa.ArrowException, TypeError, ValueError) as e:
+        logger.warning(f"Could not write parse cache {path.name}: {e}")
+    return chunks, "miss"
+
+
+# ---------------------------------------------------------------------------
+# Inspection
+# ---------------------------------------------------------------------------
+
+def _read_metadata(path: Path) -> dict:
+    try:
+        with pa.memory_map(str(path), "r") as source:
+            schema = pa.ipc.open_file(source).schema
+    except (OSError, pa.ArrowException):
+        return {}
+    return {key.decode(): value.decode() for key, value in (schema.metadata or {}).items()}
+
+
+def describe(path: Path) -> dict:
+    """Metadata of one cache file, plus whether its source still matches it."""
+    meta = _read_metadata(path)
+    source = Path(meta.get("source", ""))
+    try:
+        stat = source.stat()
+        fresh = (str(stat.st_size) == meta.get("source_size")
+                 and str(stat.st_mtime_ns) == meta.get("source_mtime_ns"))
+    except OSError:
+        fresh = False
+    return {**meta, "file": path.name, "file_mb": round(path.stat().st_size / 1e6, 2), "fresh": fresh}
+
+
+def _cache_files(directory: Path) -> list[Path]:
+    return sorted(directory.glob(f"*{CACHE_SUFFIX}")) if directory.is_dir() else []
+
+
+def main():
+    args = sys.argv[1:]
+    if not args or args[0] not in ("build", "list", "clear") or (args[0] == "build" and len(args) < 3):
+        print(__doc__)
+        sys.exit(1)
+    if not PYARROW_AVAILABLE:
+        print("ERROR: pyarrow is not installed (pip install pyarrow)")
+        sys.exit(1)
+
+    if args[0] == "build":
+        kind, source = args[1], args[2]
+        n = int(args[3]) if len(args) > 3 else None
+        t0 = time.perf_counter()
+        if kind == "enron":
+            from enron_parser import parse_to_chunks
+            chunks = parse_to_chunks(source, n=n, workers=int(args[4]) if len(args) > 4 else None)
+        elif kind == "ami":
+            from ami_parser import parse_to_chunks
+            chunks = parse_to_chunks(source, n=n)
+        else:
+            print(__doc__)
+            sys.exit(1)
+        print(f"{len(chunks)} chunks from {source} in {time.perf_counter() - t0:.1f}s "
+              f"(cache: {_cache_dir(Path(source).resolve())})")
+        return
+
+    directory = Path(args[1]) if len(args) > 1 else Path(PARSE_CACHE_DIR or CACHE_DIR_NAME)
+    files = _cache_files(directory)
+    if args[0] == "clear":
+        for path in files:
+            path.unlink()
+        print(f"Removed {len(files)} cache files from {directory}")
+        return
+    if not files:
+        print(f"No parse caches in {directory}")
+        return
+    for path in files:
+        info = describe(path)
+        print(f"{info['file']}\n  {info.get('parser')} v{info.get('parser_version')}  |  {info.get('rows')} chunks  "
+              f"|  {info['file_mb']} MB  |  {'fresh' if info['fresh'] else 'STALE'}  |  built {info.get('created_at')}\n"
+              f"  source {info.get('source')}  options {info.get('options')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+"""
+process_pool.py
+Worker-process pools for CPU-bound sharding (classifier Phase 1 heuristics,
+enron_parser byte-range shards).
+
+Pools always use the spawn start method, not fork: callers such as the API
+run these stages from a worker thread, and forking a threaded process can
+deadlock on locks the child inherits mid-acquire.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+
+def spawn_pool(max_workers: int) -> ProcessPoolExecutor:
+    """ProcessPoolExecutor with at least one worker, started with spawn."""
+    return ProcessPoolExecutor(max_workers=max(1, max_workers), mp_context=multiprocessing.get_context("spawn"))
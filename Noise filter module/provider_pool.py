@@ -0,0 +1,285 @@
+"""
+provider_pool.py
+Load balancing across several LLM API keys and OpenAI-compatible endpoints.
+A ProviderPool (blocking) or AsyncProviderPool (asyncio) looks like a Groq /
+AsyncGroq client — chat.completions.create(...) — but routes every request
+to the least-loaded healthy member. Each member has its own quota (a
+RateLimitScheduler per model) and its own health breaker: after
+POOL_EJECT_AFTER consecutive failures it is ejected from rotation, and after
+POOL_REINSTATE_AFTER_S one probe request decides whether it comes back.
+A failed or rate-limited request fails over to the next member, so callers
+only see an error once every member has refused it.
+
+Configuration (first match wins):
+    LLM_PROVIDERS    JSON list, one object per member:
+                     [{"api_key": "gsk_...", "base_url": "https://...", "rpm": 30, "tpm": 60000,
+                       "name": "groq-2"}, ...]   (all keys but api_key optional)
+    GROQ_CLOUD_API   one key, or several separated by commas (default quota each)
+
+Scaling ingestion is a matter of adding keys: make_async_client() /
+make_client() return a plain Groq client for a single key and a pool otherwise.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Optional
+
+import httpx
+from groq import AsyncGroq, Groq, APIConnectionError, APIStatusError, RateLimitError
+
+from circuit_breaker import OPEN, CircuitBreaker
+from rate_limiter import LLM_RPM_LIMIT, LLM_TPM_LIMIT, RateLimitScheduler, approx_tokens, get_scheduler
+
+POOL_EJECT_AFTER = 3            # consecutive failures before a member leaves rotation
+POOL_REINSTATE_AFTER_S = 30.0   # ejected members get one probe request after this long
+
+
+@dataclass(frozen=True)
+class ProviderConfig:
+    """One pool member: an API key, optionally on another OpenAI-compatible endpoint."""
+    api_key: str
+    base_url: Optional[str] = None
+    rpm: float = LLM_RPM_LIMIT
+    tpm: Optional[float] = LLM_TPM_LIMIT
+    name: Optional[str] = None
+
+    @property
+    def label(self) -> str:
+        if self.name:
+            return self.name
+        # Never put the key itself in logs or scheduler keys
+        digest = hashlib.sha256(f"{self.base_url}|{self.api_key}".encode("utf-8")).hexdigest()[:8]
+        return f"{self.base_url or 'groq'}#{digest}"
+
+
+def load_provider_configs(api_key: Optional[str] = None) -> list[ProviderConfig]:
+    """
+    Pool members from LLM_PROVIDERS, else from the comma-separated api_key
+    (GROQ_CLOUD_API when not given).
+    """
+    raw = os.getenv("LLM_PROVIDERS", "").strip()
+    if raw:
+        entries = json.loads(raw)
+        if not isinstance(entries, list) or not entries:
+            raise ValueError("LLM_PROVIDERS must be a non-empty JSON list of provider objects")
+        return [
+            ProviderConfig(
+                api_key=entry["api_key"],
+                base_url=entry.get("base_url"),
+                rpm=float(entry.get("rpm", LLM_RPM_LIMIT)),
+                tpm=entry.get("tpm", LLM_TPM_LIMIT),
+                name=entry.get("name"),
+            )
+            for entry in entries
+        ]
+    if api_key is None:
+        api_key = os.getenv("GROQ_CLOUD_API", "")
+    keys = [k.strip() for k in api_key.split(",") if k.strip()]
+    return [ProviderConfig(api_key=k) for k in keys] or [ProviderConfig(api_key=api_key)]
+
+
+# ---------------------------------------------------------------------------
+# Pool
+# ---------------------------------------------------------------------------
+
+class PoolMember:
+    """A member's client, its per-model quota and its health."""
+
+    def __init__(self, config: ProviderConfig, client):
+        self.config = config
+        self.name = config.label
+        self.client = client
+        self.health = CircuitBreaker(f"provider {self.name}", failure_threshold=POOL_EJECT_AFTER,
+                                     reset_timeout_s=POOL_REINSTATE_AFTER_S)
+        self.requests = 0
+        self.failures = 0
+        self.rate_limited = 0
+
+    def scheduler(self, model: str) -> RateLimitScheduler:
+        # Provider quotas are per model, as in the classifier's run schedulers
+        return get_scheduler(f"{self.name}:{model}", rpm=self.config.rpm, tpm=self.config.tpm)
+
+    def load(self, model: str) -> tuple[float, float, float]:
+        """
+        Sort key: members in a 429 pause last, then fewest requests in flight
+        per unit of quota; ties go to the member with the fewest requests so far.
+        """
+        scheduler = self.scheduler(model)
+        return (scheduler.paused_for(), (scheduler.in_flight + 1) / self.config.rpm,
+                self.requests / self.config.rpm)
+
+
+class _PoolBase:
+    def __init__(self, configs: list[ProviderConfig], client_factory):
+        if not configs:
+            raise ValueError("A provider pool needs at least one provider")
+        self.members = [PoolMember(c, client_factory(c)) for c in configs]
+        self.key = "pool:" + ",".join(sorted(m.name for m in self.members))
+        self.rpm = sum(c.rpm for c in configs)
+        self.tpm = None if any(not c.tpm for c in configs) else sum(c.tpm for c in configs)
+
+    def __len__(self) -> int:
+        return len(self.members)
+
+    def _pick(self, model: str, tried: set) -> Optional[PoolMember]:
+        """Least-loaded member not tried yet whose health lets a request through."""
+        candidates = [m for m in self.members if m not in tried and m.health.state != OPEN]
+        for member in sorted(candidates, key=lambda m: m.load(model)):
+            if member.health.allow():
+                return member
+        return None
+
+    def _handle_error(self, member: PoolMember, scheduler: RateLimitScheduler, error: Exception) -> bool:
+        """
+        Record a failed request against its member. True means try another
+        member; False means the request itself was rejected (4xx), so every
+        member would answer the same.
+        """
+        if isinstance(error, RateLimitError):
+            member.health.record_success()      # healthy, just out of quota
+            member.rate_limited += 1
+            scheduler.penalize(error.response.headers if error.response is not None else None)
+            return True
+        if isinstance(error, APIStatusError) and error.status_code < 500:
+            member.health.record_success()
+            return False
+        member.failures += 1
+        member.health.record_failure()     # logs the ejection when it trips
+        return True
+
+    def _exhausted(self, last_error: Optional[Exception]) -> Exception:
+        if last_error is not None:
+            return last_error
+        return APIConnectionError(message="No healthy LLM provider in the pool",
+                                  request=httpx.Request("POST", "http://provider-pool.invalid"))
+
+    @staticmethod
+    def _estimate(kwargs: dict) -> int:
+        return sum(approx_tokens(m.get("content") or "") for m in kwargs.get("messages", ()))
+
+    @staticmethod
+    def _used_tokens(response) -> Optional[int]:
+        usage = getattr(response, "usage", None)
+        return getattr(usage, "total_tokens", None)
+
+    def summary(self) -> list[dict]:
+        return [
+            {
+                "provider": m.name,
+                "health": m.health.state,
+                "requests": m.requests,
+                "failures": m.failures,
+                "rate_limited": m.rate_limited,
+                "ejections": m.health.trips,
+            }
+            for m in self.members
+        ]
+
+
+class AsyncProviderPool(_PoolBase):
+    """AsyncGroq stand-in that spreads requests over several providers."""
+
+    def __init__(self, configs: list[ProviderConfig], client_factory=None):
+        super().__init__(configs, client_factory or (
+            lambda c: AsyncGroq(api_key=c.api_key, base_url=c.base_url, max_retries=0)))
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, **kwargs):
+        model = kwargs.get("model", "")
+        est_tokens = self._estimate(kwargs)
+        tried: set = set()
+        last_error = None
+        while (member := self._pick(model, tried)) is not None:
+            tried.add(member)
+            scheduler = member.scheduler(model)
+            member.requests += 1
+            settled = False
+            used_tokens = None
+            await scheduler.acquire_async(est_tokens)
+            try:
+                response = await member.client.chat.completions.create(**kwargs)
+                settled = True
+                member.health.record_success()
+                used_tokens = self._used_tokens(response)
+                return response
+            except (APIConnectionError, APIStatusError) as e:
+                settled = True
+                if not self._handle_error(member, scheduler, e):
+                    raise
+                last_error = e
+            finally:
+                if not settled:
+                    member.health.record_abandoned()
+                scheduler.record(est_tokens, used_tokens)
+        raise self._exhausted(last_error)
+
+    async def close(self):
+        for member in self.members:
+            await member.client.close()
+
+
+class ProviderPool(_PoolBase):
+    """Groq stand-in that spreads requests over several providers."""
+
+    def __init__(self, configs: list[ProviderConfig], client_factory=None):
+        super().__init__(configs, client_factory or (
+            lambda c: Groq(api_key=c.api_key, base_url=c.base_url, max_retries=0)))
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        model = kwargs.get("model", "")
+        est_tokens = self._estimate(kwargs)
+        tried: set = set()
+        last_error = None
+        while (member := self._pick(model, tried)) is not None:
+            tried.add(member)
+            scheduler = member.scheduler(model)
+            member.requests += 1
+            settled = False
+            used_tokens = None
+            scheduler.acquire(est_tokens)
+            try:
+                response = member.client.chat.completions.create(**kwargs)
+                settled = True
+                member.health.record_success()
+                used_tokens = self._used_tokens(response)
+                return response
+            except (APIConnectionError, APIStatusError) as e:
+                settled = True
+                if not self._handle_error(member, scheduler, e):
+                    raise
+                last_error = e
+            finally:
+                if not settled:
+                    member.health.record_abandoned()
+                scheduler.record(est_tokens, used_tokens)
+        raise self._exhausted(last_error)
+
+    def close(self):
+        for member in self.members:
+            member.client.close()
+
+
+def _single_plain_key(configs: list[ProviderConfig]) -> bool:
+    return len(configs) == 1 and configs[0].base_url is None and not os.getenv("LLM_PROVIDERS")
+
+
+def make_async_client(api_key: Optional[str] = None):
+    """AsyncGroq for a single key, otherwise an AsyncProviderPool over every configured provider."""
+    configs = load_provider_configs(api_key)
+    if _single_plain_key(configs):
+        return AsyncGroq(api_key=configs[0].api_key)
+    return AsyncProviderPool(configs)
+
+
+def make_client(api_key: Optional[str] = None):
+    """Groq for a single key, otherwise a ProviderPool over every configured provider."""
+    configs = load_provider_configs(api_key)
+    if _single_plain_key(configs):
+        return Groq(api_key=configs[0].api_key)
+    return ProviderPool(configs)
@@ -0,0 +1,228 @@
+"""
+rate_limiter.py
+Shared request/token budget for LLM calls.
+Keeps requests flowing continuously while staying under the provider's
+requests-per-minute and tokens-per-minute quotas, and backs off exactly as
+long as a 429 response says to.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import re
+import threading
+import time
+from collections import deque
+from typing import Mapping, Optional
+
+# Defaults — set these to the quota of the account behind GROQ_CLOUD_API.
+LLM_RPM_LIMIT = 30
+LLM_TPM_LIMIT = 60_000
+
+THROUGHPUT_WINDOW_S = 60.0
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+
+def approx_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English text)."""
+    return len(text) // 4 + 1
+
+
+def parse_reset_duration(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a rate-limit reset value into seconds.
+    Accepts plain seconds ("7", "0.5") and Groq/OpenAI durations ("2m59.56s", "120ms").
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts or "".join(n + u for n, u in parts) != value:
+        return None
+    return sum(float(n) * _DURATION_UNITS[u] for n, u in parts)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at `per_minute / 60` per second.
+    reserve() debits immediately and returns how long the caller must wait,
+    so concurrent callers queue fairly instead of polling.
+    """
+
+    def __init__(self, per_minute: float, clock=time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.per_minute = float(per_minute)
+        self.level = self.per_minute
+        self._updated = clock()
+
+    def _refill(self, now: float):
+        rate = self.per_minute / 60.0
+        self.level = min(self.per_minute, self.level + (now - self._updated) * rate)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self.level -= amount
+            if self.level >= 0:
+                return 0.0
+            return -self.level / (self.per_minute / 60.0)
+
+    def adjust(self, amount: float):
+        """Credit (positive) or debit (negative) the bucket, e.g. to reconcile an estimate."""
+        with self._lock:
+            self._refill(self._clock())
+            self.level = min(self.per_minute, self.level + amount)
+
+    def set_limit(self, per_minute: float):
+        with self._lock:
+            self._refill(self._clock())
+            self.per_minute = float(per_minute)
+            self.level = min(self.level, self.per_minute)
+
+
+class RateLimitScheduler:
+    """
+    Gate for every LLM request in a run.
+      acquire(est_tokens)  — block until both budgets allow the request
+                             (acquire_async() from coroutines)
+      record(est, actual)  — reconcile the token estimate after a response
+      penalize(headers)    — honour Retry-After / x-ratelimit-* from a 429
+      throughput()         — rolling requests/tokens per minute
+    """
+
+    def __init__(
+        self,
+        rpm: float = LLM_RPM_LIMIT,
+        tpm: Optional[float] = LLM_TPM_LIMIT,
+        clock=time.monotonic,
+        sleep=time.sleep,
+    ):
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self.requests = TokenBucket(rpm, clock=clock)
+        self.tokens = TokenBucket(tpm, clock=clock) if tpm else None
+        self._paused_until = 0.0
+        self._window: deque[tuple[float, int]] = deque()
+        self.in_flight = 0
+        self.completed = 0
+        self.rate_limited = 0
+        self.throttled_s = 0.0
+
+    def _reserve(self, est_tokens: int) -> float:
+        wait = self.requests.reserve(1)
+        if self.tokens is not None and est_tokens:
+            wait = max(wait, self.tokens.reserve(est_tokens))
+        with self._lock:
+            wait = max(wait, self._paused_until - self._clock())
+            self.in_flight += 1
+            if wait > 0:
+                self.throttled_s += wait
+        return wait
+
+    def acquire(self, est_tokens: int = 0):
+        wait = self._reserve(est_tokens)
+        if wait > 0:
+            self._sleep(wait)
+
+    async def acquire_async(self, est_tokens: int = 0):
+        """acquire() for coroutines: waits without blocking the event loop."""
+        wait = self._reserve(est_tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def record(self, est_tokens: int, actual_tokens: Optional[int] = None):
+        """Call once per acquire(), after the request finishes (success or not)."""
+        used = est_tokens if actual_tokens is None else actual_tokens
+        if self.tokens is not None and actual_tokens is not None:
+            self.tokens.adjust(est_tokens - actual_tokens)
+        with self._lock:
+            self.in_flight -= 1
+            self.completed += 1
+            self._window.append((self._clock(), used))
+
+    def penalize(self, headers: Optional[Mapping[str, str]]) -> float:
+        """
+        Pause every caller until the provider's reset time and adopt any
+        advertised limits. Returns the pause length in seconds.
+        """
+        headers = headers or {}
+        # Retry-After is authoritative; otherwise wait for whichever budget is
+        # exhausted to reset.
+        wait = parse_reset_duration(headers.get("retry-after"))
+        if wait is None:
+            resets = [
+                parse_reset_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+                for kind in ("requests", "tokens")
+                if headers.get(f"x-ratelimit-remaining-{kind}") == "0"
+            ]
+            resets = [r for r in resets if r is not None]
+            # No guidance from the server: wait long enough for one request slot.
+            wait = max(resets) if resets else 60.0 / self.requests.per_minute
+
+        limit_tokens = headers.get("x-ratelimit-limit-tokens")
+        if self.tokens is not None and limit_tokens and limit_tokens.isdigit():
+            self.tokens.set_limit(min(self.tokens.per_minute, float(limit_tokens)))
+        if self.tokens is not None and headers.get("x-ratelimit-remaining-tokens") == "0":
+            self.tokens.adjust(-self.tokens.per_minute)
+
+        with self._lock:
+            self.rate_limited += 1
+            self._paused_until = max(self._paused_until, self._clock() + wait)
+        return wait
+
+    def paused_for(self) -> float:
+        """Seconds left of the current 429 pause (0 when not paused)."""
+        with self._lock:
+            return max(0.0, self._paused_until - self._clock())
+
+    def throughput(self) -> dict:
+        """Rolling estimate over the last THROUGHPUT_WINDOW_S seconds."""
+        with self._lock:
+            now = self._clock()
+            while self._window and now - self._window[0][0] > THROUGHPUT_WINDOW_S:
+                self._window.popleft()
+            n = len(self._window)
+            tokens = sum(t for _, t in self._window)
+            span = min(THROUGHPUT_WINDOW_S, max(now - self._window[0][0], 1.0)) if n else THROUGHPUT_WINDOW_S
+            return {
+                "requests_per_min": n * 60.0 / span,
+                "tokens_per_min": tokens * 60.0 / span,
+                "in_flight": self.in_flight,
+                "completed": self.completed,
+                "rate_limited": self.rate_limited,
+                "throttled_s": round(self.throttled_s, 2),
+            }
+
+
+_SCHEDULERS: dict[str, RateLimitScheduler] = {}
+_SCHEDULERS_LOCK = threading.Lock()
+
+
+def get_scheduler(
+    account_key: str,
+    rpm: Optional[float] = None,
+    tpm: Optional[float] = None,
+) -> RateLimitScheduler:
+    """
+    Process-wide scheduler per API account, so concurrent runs (e.g. several
+    API sessions) share one quota instead of each assuming the full budget.
+    rpm / tpm (LLM_RPM_LIMIT / LLM_TPM_LIMIT by default) apply when the
+    account's scheduler is first created.
+    """
+    with _SCHEDULERS_LOCK:
+        if account_key not in _SCHEDULERS:
+            _SCHEDULERS[account_key] = RateLimitScheduler(
+                rpm=LLM_RPM_LIMIT if rpm is None else rpm,
+                tpm=LLM_TPM_LIMIT if tpm is None else tpm,
+            )
+        return _SCHEDULERS[account_key]
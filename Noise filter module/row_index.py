@@ -0,0 +1,165 @@
+"""
+row_index.py
+Byte-offset index of the records in a CSV file (emails.csv), so any row or
+range of rows can be read with one seek instead of scanning from the top.
+
+The index is built in one streaming pass (numpy over fixed-size blocks: a
+newline ends a record only where the number of '"' bytes before it is
+even, since escaped quotes come in pairs) and saved next to the CSV as
+<name>.rowidx.npy. It stores the CSV's size and mtime and is rebuilt when
+they no longer match; np.load memory-maps it, so opening is O(1) too.
+enron_parser.shard_ranges cuts its worker shards from the same offsets.
+
+Usage:
+    index = RowIndex.open("emails.csv")
+    len(index)                      # data rows (header excluded)
+    index.rows(offset=1000, limit=50)
+    index.sample(20, seed=7)
+    index.shard_ranges(4)           # byte ranges with equal row counts, for workers
+
+    python row_index.py build <file.csv>
+    python row_index.py show <file.csv> <offset> [limit]
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import logging
+import os
+import random
+import sys
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from tracing import current_span, traced
+
+INDEX_VERSION = 1
+INDEX_SUFFIX = ".rowidx.npy"
+_SCAN_BLOCK_BYTES = 4 * 1024 * 1024
+_META_FIELDS = 3            # INDEX_VERSION, source size, source mtime_ns — then the offsets
+
+logger = logging.getLogger(__name__)
+
+
+def index_path(csv_path: str | Path) -> Path:
+    csv_path = Path(csv_path)
+    return csv_path.with_name(csv_path.name + INDEX_SUFFIX)
+
+
+@traced("parse.row_index.build")
+def build_offsets(csv_path: str | Path) -> np.ndarray:
+    """
+    Start offset of every data row, plus the file size as a final sentinel
+    (row i spans offsets[i]:offsets[i + 1]). One pass, one block in memory.
+    """
+    size = Path(csv_path).stat().st_size
+    parts: list[np.ndarray] = []
+    base = 0
+    odd = 0                 # parity of '"' bytes before the current block
+    with open(csv_path, "rb") as f:
+        while block := f.read(_SCAN_BLOCK_BYTES):
+            data = np.frombuffer(block, dtype=np.uint8)
+            quotes = np.cumsum(data == ord('"'), dtype=np.uint8)    # wraps at 256; parity survives
+            newlines = np.flatnonzero(data == ord("\n"))
+            even = ((quotes[newlines] + odd) & 1) == 0
+            parts.append(newlines[even].astype(np.int64) + base + 1)
+            odd = (odd + int(quotes[-1])) & 1
+            base += len(block)
+    starts = np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+    starts = starts[starts < size]      # a trailing newline starts no row
+    # starts[0] is the end of the header line
+    offsets = np.append(starts, size).astype(np.int64)
+    current_span().set(rows=len(offsets) - 1, bytes=size)
+    return offsets
+
+
+class RowIndex:
+    """Random access to the rows of one CSV file through its byte-offset index."""
+
+    def __init__(self, csv_path: str | Path, offsets: np.ndarray):
+        self.path = Path(csv_path)
+        self.offsets = offsets
+        with self.path.open("rb") as f:
+            header = f.read(int(offsets[0]))
+        self.columns = next(csv.reader(io.StringIO(header.decode("utf-8", errors="replace"))), [])
+
+    @classmethod
+    def open(cls, csv_path: str | Path, rebuild: bool = False) -> "RowIndex":
+        """Load the saved index if it matches the CSV; otherwise build it and save it."""
+        csv_path = Path(csv_path)
+        stat = csv_path.stat()
+        path = index_path(csv_path)
+        if not rebuild and path.exists():
+            try:
+                saved = np.load(path, mmap_mode="r")
+                if tuple(int(v) for v in saved[:_META_FIELDS]) == (INDEX_VERSION, stat.st_size, stat.st_mtime_ns):
+                    return cls(csv_path, saved[_META_FIELDS:])
+            except (OSError, ValueError) as e:
+                logger.warning(f"Unreadable row index {path.name} ({e}); rebuilding")
+        offsets = build_offsets(csv_path)
+        try:
+            tmp = path.with_name(path.name + f".{os.getpid()}.tmp.npy")
+            np.save(tmp, np.concatenate([[INDEX_VERSION, stat.st_size, stat.st_mtime_ns], offsets]))
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Could not save row index {path.name}: {e}")
+        return cls(csv_path, offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def byte_range(self, start: int, stop: int) -> tuple[int, int]:
+        """File offsets covering rows [start, stop) (clamped to the file)."""
+        start, stop = max(0, min(start, len(self))), max(0, min(stop, len(self)))
+        return int(self.offsets[start]), int(self.offsets[max(start, stop)])
+
+    def read_bytes(self, start: int, stop: int) -> bytes:
+        begin, end = self.byte_range(start, stop)
+        with self.path.open("rb") as f:
+            f.seek(begin)
+            return f.read(end - begin)
+
+    def rows(self, offset: int = 0, limit: Optional[int] = None) -> list[dict]:
+        """Rows offset .. offset + limit - 1 as dicts keyed by the header's column names."""
+        stop = len(self) if limit is None else offset + limit
+        text = self.read_bytes(offset, stop).decode("utf-8", errors="replace")
+        return list(csv.DictReader(io.StringIO(text, newline=""), fieldnames=self.columns))
+
+    def row(self, i: int) -> dict:
+        if not 0 <= i < len(self):
+            raise IndexError(f"row {i} out of range (0..{len(self) - 1})")
+        return self.rows(i, 1)[0]
+
+    def sample(self, k: int, seed: Optional[int] = None) -> list[dict]:
+        """k distinct random rows, in file order."""
+        picks = sorted(random.Random(seed).sample(range(len(self)), min(k, len(self))))
+        return [self.row(i) for i in picks]
+
+    def shard_ranges(self, n_shards: int) -> list[tuple[int, int]]:
+        """(start, end) byte ranges holding about len(self) / n_shards rows each."""
+        bounds = np.linspace(0, len(self), max(1, n_shards) + 1).astype(np.int64)
+        return [self.byte_range(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+
+def main():
+    args = sys.argv[1:]
+    if len(args) < 2 or args[0] not in ("build", "show") or (args[0] == "show" and len(args) < 3):
+        print(__doc__)
+        sys.exit(1)
+    if args[0] == "build":
+        index = RowIndex.open(args[1], rebuild=True)
+        print(f"Indexed {len(index)} rows of {args[1]} → {index_path(args[1])}")
+        return
+    index = RowIndex.open(args[1])
+    offset, limit = int(args[2]), int(args[3]) if len(args) > 3 else 1
+    for i, row in enumerate(index.rows(offset, limit), start=offset):
+        print(f"--- row {i}")
+        for column, value in row.items():
+            print(f"{column}: {(value or '')[:300]}")
+
+
+if __name__ == "__main__":
+    main()
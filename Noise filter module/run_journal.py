@@ -0,0 +1,187 @@
+"""
+run_journal.py
+Write-ahead journal for classification runs: one SQLite file per run under
+runs/, holding the run's input chunks, its settings and the verdict of every
+LLM batch as soon as the batch completes. A run that crashes or is
+interrupted can be resumed (classifier.resume_run) without repeating a
+single journaled batch.
+
+Usage:
+    python run_journal.py list              # runs on disk, with progress
+    python run_journal.py show <run_id>
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+_HERE = Path(__file__).parent
+
+RUN_JOURNAL_DIR = _HERE / "runs"
+JOURNAL_FORMAT = 1
+
+
+def new_run_id() -> str:
+    """Sortable, unique id: 20260115-093012-3fa9c1."""
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+def journal_path(run_id: str, directory: Optional[Path] = None) -> Path:
+    return Path(directory or RUN_JOURNAL_DIR) / f"{run_id}.sqlite"
+
+
+class RunJournal:
+    """
+    Per-run SQLite journal (WAL mode). Safe to share between the event loop's
+    worker threads; every record_results() call is one committed transaction,
+    so a crash loses at most the batch that was being written.
+    """
+
+    def __init__(self, run_id: str, directory: Optional[Path] = None):
+        self.run_id = run_id
+        self.path = journal_path(run_id, directory)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS chunks (idx INTEGER PRIMARY KEY, data TEXT)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS results (idx INTEGER PRIMARY KEY, result TEXT, "
+                               "recorded_at REAL)")
+
+    # -- lifecycle ----------------------------------------------------------
+
+    @classmethod
+    def create(cls, run_id: str, chunks: list[dict], settings: dict,
+               directory: Optional[Path] = None) -> "RunJournal":
+        """Start a run's journal, or reopen it if the same run was journaled before."""
+        journal = cls(run_id, directory)
+        stored = journal._meta("n_chunks")
+        if stored is None:
+            with journal._lock, journal._conn:
+                journal._conn.executemany(
+                    "INSERT INTO chunks (idx, data) VALUES (?, ?)",
+                    ((i, json.dumps(c, ensure_ascii=False, default=str)) for i, c in enumerate(chunks)),
+                )
+                journal._conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", [
+                    ("format", json.dumps(JOURNAL_FORMAT)),
+                    ("n_chunks", json.dumps(len(chunks))),
+                    ("settings", json.dumps(settings, default=str)),
+                    ("status", json.dumps("running")),
+                    ("created_at", json.dumps(time.time())),
+                ])
+        elif stored != len(chunks):
+            journal.close()
+            raise ValueError(f"Run {run_id} journaled {stored} chunks, not {len(chunks)}; "
+                             f"use resume_run() to continue it")
+        return journal
+
+    @classmethod
+    def open(cls, run_id: str, directory: Optional[Path] = None) -> "RunJournal":
+        if not journal_path(run_id, directory).exists():
+            raise FileNotFoundError(f"No journal for run {run_id} in {directory or RUN_JOURNAL_DIR}")
+        journal = cls(run_id, directory)
+        if journal._meta("n_chunks") is None:
+            journal.close()
+            raise ValueError(f"Journal for run {run_id} is incomplete (no chunks recorded)")
+        return journal
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # -- contents -----------------------------------------------------------
+
+    def _meta(self, key: str):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def chunks(self) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute("SELECT data FROM chunks ORDER BY idx").fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def settings(self) -> dict:
+        return self._meta("settings") or {}
+
+    def status(self) -> str:
+        return self._meta("status") or "running"
+
+    def completed(self) -> dict[int, dict]:
+        """{index → raw result} of every journaled verdict."""
+        with self._lock:
+            rows = self._conn.execute("SELECT idx, result FROM results").fetchall()
+        return {idx: json.loads(result) for idx, result in rows}
+
+    def progress(self) -> tuple[int, int]:
+        """(journaled verdicts, chunks in the run)."""
+        with self._lock:
+            (done,) = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()
+        return done, self._meta("n_chunks") or 0
+
+    # -- writes -------------------------------------------------------------
+
+    def record_results(self, results: dict[int, dict]):
+        """Journal one completed batch's verdicts in a single transaction."""
+        if not results:
+            return
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO results (idx, result, recorded_at) VALUES (?, ?, ?)",
+                ((idx, json.dumps(r, ensure_ascii=False), now) for idx, r in results.items()),
+            )
+
+    def mark_complete(self):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('status', ?)",
+                               (json.dumps("complete"),))
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def _describe(run_id: str) -> str:
+    journal = RunJournal.open(run_id)
+    try:
+        done, total = journal.progress()
+        return f"{run_id}  {journal.status():<9}  {done} LLM verdicts journaled  |  {total} chunks in run"
+    finally:
+        journal.close()
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ("list", "show"):
+        print(__doc__)
+        sys.exit(1)
+    if sys.argv[1] == "list":
+        runs = sorted(RUN_JOURNAL_DIR.glob("*.sqlite")) if RUN_JOURNAL_DIR.exists() else []
+        if not runs:
+            print(f"No run journals in {RUN_JOURNAL_DIR}")
+        for path in runs:
+            print(_describe(path.stem))
+        return
+    if len(sys.argv) < 3:
+        print("Usage: python run_journal.py show <run_id>")
+        sys.exit(1)
+    print(_describe(sys.argv[2]))
+    journal = RunJournal.open(sys.argv[2])
+    try:
+        print(f"  settings: {json.dumps(journal.settings())}")
+    finally:
+        journal.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -35,6 +35,7 @@ class ClassifiedChunk(BaseModel):
     suppressed: bool = False       # True when label == noise
     manually_restored: bool = False
     flagged_for_review: bool = False
+    duplicate_of: Optional[str] = None  # source_ref whose LLM verdict was reused (near-duplicate)
     created_at: str = Field(
         default_factory=lambda: datetime.now(timezone.utc).isoformat()
     )
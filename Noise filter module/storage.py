@@ -7,6 +7,7 @@ from __future__ import annotations
 
 import json
 import os
+import time
 from typing import List, Tuple
 
 import psycopg2
@@ -22,6 +23,8 @@ from datetime import datetime, timezone
 import sqlite3
 import logging
 
+from tracing import current_span, traced
+
 logger = logging.getLogger(__name__)
 
 # Load .env from the same directory as this script
@@ -39,6 +42,7 @@ DB_TYPE = None  # Will be set to "sqlite" or "postgresql" based on availability
 # SQLite database path
 SQLITE_DB_PATH = _HERE / "aks_storage.db"
 
+@traced("db.connect")
 def get_connection() -> Tuple:
     """Returns a new connection to the database (PostgreSQL or SQLite fallback).
     
@@ -58,6 +62,7 @@ def get_connection() -> Tuple:
                 password=DB_PASS
             )
             DB_TYPE = "postgresql"
+            current_span().set(db_system="postgresql")
             return conn, "postgresql"
         except (psycopg2.OperationalError, psycopg2.Error):
             DB_TYPE = "sqlite"
@@ -66,10 +71,12 @@ def get_connection() -> Tuple:
     if DB_TYPE == "sqlite":
         conn = sqlite3.connect(str(SQLITE_DB_PATH))
         conn.row_factory = sqlite3.Row  # Access columns by name
+        current_span().set(db_system="sqlite")
         return conn, "sqlite"
     
     raise RuntimeError("Could not establish database connection")
 
+@traced("aks.init_db")
 def init_db():
     """Creates the classified_chunks table if it does not exist."""
     conn, db_type = get_connection()
@@ -207,7 +214,9 @@ def init_db():
             conn.commit()
     finally:
         conn.close()
+    init_classification_cache()
 
+@traced("aks.store_chunks")
 def store_chunks(chunks: List[ClassifiedChunk]):
     """Batch inserts a list of ClassifiedChunk objects into the database."""
     if not chunks:
@@ -273,6 +282,7 @@ def store_chunks(chunks: List[ClassifiedChunk]):
     finally:
         conn.close()
 
+@traced("aks.get_active_signals")
 def get_active_signals(session_id: str = None) -> List[ClassifiedChunk]:
     """Retrieves active signals, optionally filtered by session_id at DB level."""
     conn, db_type = get_connection()
@@ -317,6 +327,7 @@ def get_active_signals(session_id: str = None) -> List[ClassifiedChunk]:
         conn.close()
     return results
 
+@traced("aks.get_noise_items")
 def get_noise_items(session_id: str = None) -> List[ClassifiedChunk]:
     """Retrieves noise chunks, optionally filtered by session_id at DB level."""
     conn, db_type = get_connection()
@@ -361,6 +372,7 @@ def get_noise_items(session_id: str = None) -> List[ClassifiedChunk]:
         conn.close()
     return results
 
+@traced("aks.restore_noise_item")
 def restore_noise_item(chunk_id: str):
     """
     Manually restores a misclassified noise chunk back to an active signal.
@@ -399,6 +411,42 @@ def restore_noise_item(chunk_id: str):
     finally:
         conn.close()
 
+@traced("aks.update_chunk_verdicts")
+def update_chunk_verdicts(chunks: List[ClassifiedChunk]):
+    """
+    Overwrite the label, confidence and review flags of chunks already stored
+    (matched on chunk_id), e.g. after a deferred re-classification.
+    Chunks a reviewer has manually restored are left alone.
+    """
+    if not chunks:
+        return
+
+    conn, db_type = get_connection()
+    try:
+        values = [
+            (c.label.value, c.suppressed, c.flagged_for_review, json.dumps(c.model_dump(mode="json")), str(c.chunk_id))
+            for c in chunks
+        ]
+        if db_type == "sqlite":
+            cur = conn.cursor()
+            cur.executemany("""
+                UPDATE classified_chunks
+                SET label = ?, suppressed = ?, flagged_for_review = ?, data = ?
+                WHERE chunk_id = ? AND manually_restored = 0
+            """, [(label, int(sup), int(flag), data, cid) for label, sup, flag, data, cid in values])
+            conn.commit()
+        else:  # PostgreSQL
+            with conn.cursor() as cur:
+                cur.executemany("""
+                    UPDATE classified_chunks
+                    SET label = %s, suppressed = %s, flagged_for_review = %s, data = %s::jsonb
+                    WHERE chunk_id = %s AND manually_restored = FALSE
+                """, values)
+            conn.commit()
+    finally:
+        conn.close()
+
+@traced("aks.create_snapshot")
 def create_snapshot(session_id: str) -> str:
     """
     Creates a frozen snapshot of all active signals from AKS via get_active_signals().
@@ -429,6 +477,7 @@ def create_snapshot(session_id: str) -> str:
         
     return snapshot_id
 
+@traced("aks.get_signals_for_snapshot")
 def get_signals_for_snapshot(snapshot_id: str, label_filter: str = None) -> List[ClassifiedChunk]:
     """
     Queries AKS for chunks whose IDs are in the snapshot's chunk_ids array,
@@ -487,6 +536,7 @@ def get_signals_for_snapshot(snapshot_id: str, label_filter: str = None) -> List
         conn.close()
     return results
 
+@traced("aks.store_brd_section")
 def store_brd_section(session_id: str, snapshot_id: str, section_name: str, content: str, source_chunk_ids: List[str]):
     """Stores a generated BRD section with automatic version incrementing."""
     conn, db_type = get_connection()
@@ -532,6 +582,7 @@ def store_brd_section(session_id: str, snapshot_id: str, section_name: str, cont
     finally:
         conn.close()
 
+@traced("aks.get_latest_brd_sections")
 def get_latest_brd_sections(session_id: str) -> Dict[str, str]:
     """Returns the latest generated content for each section name in a session."""
     conn, db_type = get_connection()
@@ -568,6 +619,7 @@ def get_latest_brd_sections(session_id: str) -> Dict[str, str]:
     return sections
 
 
+@traced("aks.copy_session_chunks")
 def copy_session_chunks(src_session_id: str, dst_session_id: str) -> int:
     """
     Copy all classified chunks from src_session_id into dst_session_id.
@@ -658,3 +710,227 @@ def copy_session_chunks(src_session_id: str, dst_session_id: str) -> int:
     return copied
 
 
+
+
+# ---------------------------------------------------------------------------
+# LLM classification cache
+# ---------------------------------------------------------------------------
+# Content-addressed: one row per (content hash, model, prompt version) holding
+# the raw LLM verdict. last_used (epoch seconds) drives LRU eviction.
+
+_CACHE_QUERY_CHUNK = 500  # keeps SQLite under its bound-parameter limit
+
+
+@traced("aks.init_classification_cache")
+def init_classification_cache():
+    """Creates the llm_classification_cache table if it does not exist."""
+    conn, db_type = get_connection()
+    try:
+        if db_type == "sqlite":
+            cur = conn.cursor()
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS llm_classification_cache (
+                    content_hash TEXT NOT NULL,
+                    model_name TEXT NOT NULL,
+                    prompt_version TEXT NOT NULL,
+                    label TEXT,
+                    confidence REAL,
+                    reasoning TEXT,
+                    created_at TEXT,
+                    last_used REAL,
+                    PRIMARY KEY (content_hash, model_name, prompt_version)
+                );
+            """)
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_classification_cache(last_used);")
+            conn.commit()
+        else:  # PostgreSQL
+            with conn.cursor() as cur:
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS llm_classification_cache (
+                        content_hash VARCHAR(64) NOT NULL,
+                        model_name VARCHAR(255) NOT NULL,
+                        prompt_version VARCHAR(50) NOT NULL,
+                        label VARCHAR(50),
+                        confidence DOUBLE PRECISION,
+                        reasoning TEXT,
+                        created_at TIMESTAMP WITH TIME ZONE,
+                        last_used DOUBLE PRECISION,
+                        PRIMARY KEY (content_hash, model_name, prompt_version)
+                    );
+                """)
+                cur.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_classification_cache(last_used);")
+            conn.commit()
+    finally:
+        conn.close()
+
+
+@traced("aks.get_cached_classifications")
+def get_cached_classifications(content_hashes: List[str], model_name: str, prompt_version: str) -> dict:
+    """
+    Looks up cached LLM verdicts and marks the hits as recently used.
+    Returns {content_hash → {"label", "confidence", "reasoning"}} for hits only.
+    """
+    hits = {}
+    if not content_hashes:
+        return hits
+    hashes = list(dict.fromkeys(content_hashes))
+    now = time.time()
+
+    conn, db_type = get_connection()
+    try:
+        if db_type == "sqlite":
+            cur = conn.cursor()
+            for i in range(0, len(hashes), _CACHE_QUERY_CHUNK):
+                part = hashes[i:i + _CACHE_QUERY_CHUNK]
+                placeholders = ",".join("?" for _ in part)
+                cur.execute(f"""
+                    SELECT content_hash, label, confidence, reasoning
+                    FROM llm_classification_cache
+                    WHERE model_name = ? AND prompt_version = ? AND content_hash IN ({placeholders})
+                """, [model_name, prompt_version, *part])
+                for row in cur.fetchall():
+                    hits[row[0]] = {"label": row[1], "confidence": row[2], "reasoning": row[3]}
+            cur.executemany("""
+                UPDATE llm_classification_cache SET last_used = ?
+                WHERE content_hash = ? AND model_name = ? AND prompt_version = ?
+            """, [(now, h, model_name, prompt_version) for h in hits])
+            conn.commit()
+        else:  # PostgreSQL
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute("""
+                    UPDATE llm_classification_cache SET last_used = %s
+                    WHERE model_name = %s AND prompt_version = %s AND content_hash = ANY(%s)
+                    RETURNING content_hash, label, confidence, reasoning
+                """, (now, model_name, prompt_version, hashes))
+                for row in cur.fetchall():
+                    hits[row['content_hash']] = {
+                        "label": row['label'],
+                        "confidence": row['confidence'],
+                        "reasoning": row['reasoning'],
+                    }
+            conn.commit()
+    finally:
+        conn.close()
+    return hits
+
+
+@traced("aks.store_cached_classifications")
+def store_cached_classifications(entries: dict, model_name: str, prompt_version: str):
+    """Upserts {content_hash → {"label", "confidence", "reasoning"}} into the cache."""
+    if not entries:
+        return
+    now = time.time()
+    created_at = datetime.now(timezone.utc)
+
+    conn, db_type = get_connection()
+    try:
+        if db_type == "sqlite":
+            cur = conn.cursor()
+            cur.executemany("""
+                INSERT OR REPLACE INTO llm_classification_cache (
+                    content_hash, model_name, prompt_version, label,
+                    confidence, reasoning, created_at, last_used
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, [
+                (h, model_name, prompt_version, r["label"], r["confidence"], r["reasoning"],
+                 created_at.isoformat(), now)
+                for h, r in entries.items()
+            ])
+            conn.commit()
+        else:  # PostgreSQL
+            with conn.cursor() as cur:
+                execute_values(cur, """
+                    INSERT INTO llm_classification_cache (
+                        content_hash, model_name, prompt_version, label,
+                        confidence, reasoning, created_at, last_used
+                    ) VALUES %s
+                    ON CONFLICT (content_hash, model_name, prompt_version) DO UPDATE SET
+                        label = EXCLUDED.label,
+                        confidence = EXCLUDED.confidence,
+                        reasoning = EXCLUDED.reasoning,
+                        last_used = EXCLUDED.last_used
+                """, [
+                    (h, model_name, prompt_version, r["label"], r["confidence"], r["reasoning"],
+                     created_at, now)
+                    for h, r in entries.items()
+                ])
+            conn.commit()
+    finally:
+        conn.close()
+
+
+@traced("aks.evict_classification_cache")
+def evict_classification_cache(max_entries: int) -> int:
+    """
+    Deletes the least recently used cache rows beyond max_entries.
+    Returns the number of rows evicted.
+    """
+    conn, db_type = get_connection()
+    evicted = 0
+    try:
+        if db_type == "sqlite":
+            cur = conn.cursor()
+            cur.execute("SELECT COUNT(*) FROM llm_classification_cache")
+            excess = cur.fetchone()[0] - max_entries
+            if excess > 0:
+                cur.execute("""
+                    DELETE FROM llm_classification_cache WHERE rowid IN (
+                        SELECT rowid FROM llm_classification_cache
+                        ORDER BY last_used ASC LIMIT ?
+                    )
+                """, (excess,))
+                evicted = cur.rowcount
+            conn.commit()
+        else:  # PostgreSQL
+            with conn.cursor() as cur:
+                cur.execute("SELECT COUNT(*) FROM llm_classification_cache")
+                excess = cur.fetchone()[0] - max_entries
+                if excess > 0:
+                    cur.execute("""
+                        DELETE FROM llm_classification_cache WHERE ctid IN (
+                            SELECT ctid FROM llm_classification_cache
+                            ORDER BY last_used ASC LIMIT %s
+                        )
+                    """, (excess,))
+                    evicted = cur.rowcount
+            conn.commit()
+    finally:
+        conn.close()
+    return evicted
+
+
+# ---------------------------------------------------------------------------
+# Local model training data
+# ---------------------------------------------------------------------------
+
+@traced("aks.get_labelled_chunks")
+def get_labelled_chunks(limit: int = None) -> List[ClassifiedChunk]:
+    """
+    Every stored chunk across sessions, newest first — the labelled dataset
+    local_model.py trains on. Callers filter by how each label was produced.
+    """
+    conn, db_type = get_connection()
+    results = []
+    try:
+        if db_type == "sqlite":
+            cur = conn.cursor()
+            cur.execute(
+                "SELECT data FROM classified_chunks ORDER BY created_at DESC"
+                + (" LIMIT ?" if limit else ""),
+                (limit,) if limit else (),
+            )
+            for row in cur.fetchall():
+                data = json.loads(row[0]) if isinstance(row[0], str) else row[0]
+                results.append(ClassifiedChunk.model_validate(data))
+        else:  # PostgreSQL
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute(
+                    "SELECT data FROM classified_chunks ORDER BY created_at DESC"
+                    + (" LIMIT %s" if limit else ""),
+                    (limit,) if limit else (),
+                )
+                for row in cur.fetchall():
+                    results.append(ClassifiedChunk.model_validate(row['data']))
+    finally:
+        conn.close()
+    return results
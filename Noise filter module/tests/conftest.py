@@ -0,0 +1,135 @@
+import asyncio
+import json
+import re
+from collections import Counter
+from types import SimpleNamespace
+
+import pytest
+
+import circuit_breaker
+import decision_log
+import hedging
+import local_model
+import storage
+
+
+@pytest.fixture(autouse=True, scope="session")
+def decision_log_in_tmp(tmp_path_factory):
+    """Classification logs every decision; keep pipeline_decisions.jsonl out of the working directory."""
+    decision_log.flush_decision_log()
+    decision_log.DECISION_LOG_PATH = str(tmp_path_factory.mktemp("decisions") / "pipeline_decisions.jsonl")
+    decision_log._config = {}
+    yield
+    decision_log.flush_decision_log()
+
+
+@pytest.fixture(autouse=True, scope="session")
+def no_local_model(tmp_path_factory):
+    """use_local_model defaults to on; a retrained artifact in a developer's models/ must not change verdicts."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(local_model, "MODEL_DIR", tmp_path_factory.mktemp("models"))
+        yield
+
+
+@pytest.fixture(autouse=True)
+def fresh_latency_trackers():
+    """Hedge delays come from process-wide latency history; start each test without any."""
+    hedging._TRACKERS.clear()
+    yield
+    hedging._TRACKERS.clear()
+
+
+@pytest.fixture(autouse=True)
+def fresh_circuit_breakers():
+    """Breakers are process-wide too: failures in one test must not open them for the next."""
+    circuit_breaker._BREAKERS.clear()
+    yield
+    circuit_breaker._BREAKERS.clear()
+
+
+@pytest.fixture(autouse=True, scope="session")
+def sqlite_in_tmp(tmp_path_factory):
+    """Storage (chunks, LLM cache) goes to a throwaway SQLite file, never the in-tree aks_storage.db."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(storage, "DB_TYPE", "sqlite")
+        mp.setattr(storage, "SQLITE_DB_PATH", tmp_path_factory.mktemp("storage") / "aks_storage.db")
+        yield
+
+
+# ---------------------------------------------------------------------------
+# Shared test doubles (import with `from .conftest import ...`)
+# ---------------------------------------------------------------------------
+
+def make_pending(texts, start=0):
+    """
+    LLM-queue items: (index, chunk) pairs numbered from `start`. An int gives
+    that many distinct requirement sentences.
+    """
+    if isinstance(texts, int):
+        texts = [f"The portal must export report {i} nightly." for i in range(texts)]
+    return [(start + i, {"cleaned_text": t, "speaker": "Alice", "source_ref": f"<{i}>"})
+            for i, t in enumerate(texts)]
+
+
+def prompt_chunks(prompt):
+    """(index, body) for each --- CHUNK n --- section of a batch prompt."""
+    parts = re.split(r"--- CHUNK (\d+) ---", prompt)[1:]
+    return [(int(i), body) for i, body in zip(parts[::2], parts[1::2])]
+
+
+class FakeGroq:
+    """
+    Groq-style client: chat.completions.create() counts the call (in total and
+    per model) and returns answer(messages, model) as the message content. The default answer is a
+    confident 'requirement' for every chunk; subclasses script their own.
+    """
+
+    usage = None
+
+    def __init__(self):
+        self.calls = 0
+        self.model_calls = Counter()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def answer(self, messages, model):
+        n = messages[-1]["content"].count("--- CHUNK ")
+        verdict = {"label": "requirement", "confidence": 0.95, "reasoning": "fake"}
+        # No CHUNK markers: the single-chunk prompt, answered with one object
+        return {"results": [verdict] * n} if n else verdict
+
+    def _completion(self, messages, model):
+        content = self.answer(messages, model)
+        if not isinstance(content, str):
+            content = json.dumps(content)
+        message = SimpleNamespace(content=content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=self.usage)
+
+    def _create(self, messages, model=None, **kwargs):
+        self.calls += 1
+        self.model_calls[model] += 1
+        return self._completion(messages, model)
+
+
+class FakeAsyncGroq(FakeGroq):
+    """AsyncGroq-style FakeGroq: each call takes `delay` seconds and concurrency is tracked."""
+
+    def __init__(self, delay=0.01):
+        super().__init__()
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.closed = False
+
+    async def _create(self, messages, model=None, **kwargs):
+        self.calls += 1
+        self.model_calls[model] += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        return self._completion(messages, model)
+
+    async def close(self):
+        self.closed = True
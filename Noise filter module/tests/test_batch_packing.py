@@ -0,0 +1,39 @@
+"""
+test_batch_packing.py
+Token-budget batch packing for Phase 2.
+"""
+
+from classifier import pack_batches, _BATCH_TEMPLATE_TOKENS
+from prompts import build_batch_classification_prompt
+from rate_limiter import approx_tokens
+
+
+def _items(texts):
+    return [(i, {"cleaned_text": t, "speaker": "Alice", "source_ref": f"<{i}>"})
+            for i, t in enumerate(texts)]
+
+
+def test_every_chunk_packed_once_within_limits():
+    texts = [("word " * (n * 37 % 400)) + "end" for n in range(200)]
+    batches = pack_batches(_items(texts), max_input_tokens=3000, max_items=20)
+
+    assert sorted(i for b in batches for i, _ in b) == list(range(200))
+    for batch in batches:
+        assert len(batch) <= 20
+        prompt = build_batch_classification_prompt([c for _, c in batch])
+        assert len(batch) == 1 or approx_tokens(prompt) <= 3000 + len(batch)
+
+
+def test_short_messages_share_requests():
+    chat = _items(["ok ship it friday?"] * 100)
+    assert len(pack_batches(chat, max_input_tokens=4000, max_items=25)) == 4
+
+
+def test_similar_sizes_grouped_and_oversized_alone():
+    short, long_ = "see you soon", "requirement text " * 80
+    items = _items([short, long_] * 6 + ["x" * 6000])
+    batches = pack_batches(items, max_input_tokens=_BATCH_TEMPLATE_TOKENS + 1200, max_items=6)
+
+    for batch in batches:
+        assert len({c["cleaned_text"] for _, c in batch}) == 1
+    assert batches[-1] == [(12, items[12][1])]
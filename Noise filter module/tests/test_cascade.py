@@ -0,0 +1,79 @@
+"""
+test_cascade.py
+Two-model cascade: small model first, large model only for unconfident chunks.
+"""
+
+from collections import Counter
+from types import SimpleNamespace
+
+from classifier import CascadeConfig, CascadeStats, run_parallel_batches
+from llm_cache import ClassificationCache
+from rate_limiter import RateLimitScheduler
+
+from .conftest import FakeGroq, make_pending, prompt_chunks
+
+SMALL, LARGE = "small-model", "large-model"
+
+
+class TwoModelGroq(FakeGroq):
+    """Small model: unsure (0.6) about chunks mentioning 'maybe'. Large model: always a confident decision."""
+
+    usage = SimpleNamespace(total_tokens=100)
+
+    def answer(self, messages, model):
+        results = []
+        for i, body in prompt_chunks(messages[-1]["content"]):
+            if model == LARGE:
+                results.append({"index": i, "label": "decision", "confidence": 0.97, "reasoning": "large"})
+            else:
+                confidence = 0.6 if "maybe" in body else 0.95
+                results.append({"index": i, "label": "requirement", "confidence": confidence,
+                                "reasoning": "small"})
+        return {"results": results}
+
+
+def _pending(n, unsure=()):
+    return make_pending([f"The portal {'maybe ' if i in unsure else ''}must export report {i}." for i in range(n)])
+
+
+def _run(pending, cascade, **kwargs):
+    client, stats = TwoModelGroq(), CascadeStats()
+    out = run_parallel_batches(pending, client, lambda n: None, scheduler=RateLimitScheduler(rpm=10_000, tpm=None),
+                               cascade=cascade, cascade_stats=stats, **kwargs)
+    return out, client, stats
+
+
+def test_only_unconfident_chunks_reach_the_large_model():
+    out, client, stats = _run(_pending(10, unsure={2, 7}), CascadeConfig(small_model=SMALL, large_model=LARGE))
+
+    assert client.model_calls == Counter({SMALL: 1, LARGE: 1})
+    assert {i for i, r in out.items() if r["reasoning"] == "large"} == {2, 7}
+    assert out[2]["label"] == "decision" and out[0]["label"] == "requirement"
+    assert stats.tiers["small"]["chunks"] == 10 and stats.tiers["large"]["chunks"] == 2
+    assert stats.tiers["small"]["tokens"] == 100
+    assert (stats.escalated, stats.compared, stats.agreed) == (2, 2, 0)
+
+
+def test_escalation_band_is_configurable():
+    cascade = CascadeConfig(small_model=SMALL, large_model=LARGE, escalate_below=0.5)
+    out, client, stats = _run(_pending(10, unsure={2, 7}), cascade)
+
+    assert client.model_calls == Counter({SMALL: 1, LARGE: 0})
+    assert stats.escalated == 0 and stats.agreement_rate() is None
+
+
+def test_disabled_cascade_uses_only_the_large_model():
+    out, client, stats = _run(_pending(5), CascadeConfig(enabled=False, small_model=SMALL, large_model=LARGE))
+    assert client.model_calls == Counter({SMALL: 0, LARGE: 1})
+    assert {r["reasoning"] for r in out.values()} == {"large"}
+
+
+def test_cascade_verdicts_are_cached_separately():
+    cascade = CascadeConfig(small_model=SMALL, large_model=LARGE)
+    assert cascade.cache_key() != CascadeConfig(enabled=False, large_model=LARGE).cache_key()
+
+    pending = _pending(4)
+    _, first, _ = _run(pending, cascade, cache=ClassificationCache(cascade.cache_key(), "v1"))
+    _, client, _ = _run(pending, cascade, cache=ClassificationCache(cascade.cache_key(), "v1"))
+    assert first.model_calls == Counter({SMALL: 1, LARGE: 0})
+    assert client.model_calls == Counter({SMALL: 0, LARGE: 0})
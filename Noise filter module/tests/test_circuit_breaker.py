@@ -0,0 +1,168 @@
+"""
+test_circuit_breaker.py
+Shared Groq circuit breaker, degraded heuristic-only classification and the
+automatic re-queue once the breaker closes.
+"""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+from groq import APIConnectionError, AuthenticationError
+
+import circuit_breaker
+import classifier
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from classifier import (classify_chunks_async, is_degraded, pending_requeue, requeue_when_closed,
+                        requeue_and_wait, run_parallel_batches_async, wait_for_requeue)
+from fake_llm_server import FakeLLMServer
+from llm_cache import DEGRADED_REASONING, LLM_FAILURE_REASONING
+from rate_limiter import RateLimitScheduler
+
+from .conftest import FakeAsyncGroq, make_pending
+
+
+class DownAsyncGroq(FakeAsyncGroq):
+    """create() always fails: as if Groq were unreachable, or with `error`."""
+
+    def __init__(self, error=None):
+        super().__init__()
+        self.error = error
+
+    def answer(self, messages, model):
+        raise self.error or APIConnectionError(request=httpx.Request("POST", "https://api.groq.com"))
+
+
+def _install_breaker(**kwargs) -> CircuitBreaker:
+    breaker = CircuitBreaker(circuit_breaker.GROQ_BREAKER, **kwargs)
+    circuit_breaker._BREAKERS[circuit_breaker.GROQ_BREAKER] = breaker
+    return breaker
+
+
+def test_breaker_trips_probes_and_closes():
+    now = [0.0]
+    breaker = CircuitBreaker("t", failure_threshold=3, reset_timeout_s=10, clock=lambda: now[0])
+    closed = []
+    breaker.on_close(lambda: closed.append(True))
+
+    for _ in range(2):
+        breaker.record_failure()
+    breaker.record_success()            # not consecutive any more
+    for _ in range(3):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+    now[0] += 10
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow() and not breaker.allow()     # a single probe
+    breaker.record_failure()
+    assert breaker.state == OPEN and breaker.trips == 2
+
+    now[0] += 10
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED and closed == [True]
+    assert breaker.summary()["short_circuited"] == 3
+
+
+def test_open_breaker_degrades_batches_in_milliseconds(monkeypatch):
+    monkeypatch.setattr(classifier, "BATCH_MAX_ITEMS", 5)
+    _install_breaker(failure_threshold=4)
+    client = DownAsyncGroq()
+    lines = []
+
+    def run():
+        t0 = time.perf_counter()
+        results = asyncio.run(run_parallel_batches_async(
+            make_pending(100), client, lambda n: None, scheduler=RateLimitScheduler(rpm=10_000, tpm=None),
+            max_in_flight=4, log_fn=lines.append,
+        ))
+        return results, time.perf_counter() - t0
+
+    results, elapsed = run()
+    assert elapsed < 2                  # one back-off at most, not MAX_RETRIES per batch
+    assert client.calls == 4            # only the first in-flight attempts reached the API
+    assert sorted(results) == list(range(100))
+    assert {r["reasoning"] for r in results.values()} == {DEGRADED_REASONING}
+    assert all(r["label"] == "noise" and r["flagged_for_review"] for r in results.values())
+    assert any("Circuit breaker open" in line for line in lines)
+
+    results, elapsed = run()            # breaker already open: nothing is sent
+    assert elapsed < 0.2
+    assert client.calls == 4
+    assert {r["reasoning"] for r in results.values()} == {DEGRADED_REASONING}
+
+
+def test_client_errors_fail_fast_without_tripping_the_breaker():
+    breaker = _install_breaker(failure_threshold=2)
+    response = httpx.Response(401, request=httpx.Request("POST", "https://api.groq.com"))
+    client = DownAsyncGroq(AuthenticationError("Invalid API Key", response=response, body=None))
+
+    t0 = time.perf_counter()
+    results = asyncio.run(classifier.classify_batch_with_llm_async(make_pending(3), client))
+    assert time.perf_counter() - t0 < 0.5     # no back-off between retries
+    assert client.calls == 1 and breaker.state == CLOSED
+    assert {r["reasoning"] for r in results.values()} == {LLM_FAILURE_REASONING}
+
+
+def test_degraded_chunks_are_requeued_when_breaker_closes(monkeypatch):
+    now = [0.0]
+    breaker = _install_breaker(failure_threshold=1, reset_timeout_s=30, clock=lambda: now[0])
+    breaker.record_failure()
+    client = FakeAsyncGroq()
+    chunks = [{"cleaned_text": f"The new system feature must export report {i} to the portal.",
+               "speaker": "Alice", "source_ref": f"<{i}>"} for i in range(3)]
+    out = asyncio.run(classify_chunks_async(
+        chunks, api_key="test", log_fn=lambda line: None, use_cache=False, use_local_model=False,
+        client=client, scheduler=RateLimitScheduler(rpm=10_000, tpm=None),
+    ))
+    assert client.calls == 0
+    assert all(is_degraded(c) and c.flagged_for_review for c in out)
+
+    reclassified = []
+    with FakeLLMServer() as server:
+        monkeypatch.setenv("GROQ_BASE_URL", server.base_url)
+        requeue_when_closed(out, "test", reclassified.extend, use_cache=False, use_local_model=False)
+        assert pending_requeue() == 3 and not reclassified
+
+        now[0] += 30                    # half-open: the next call is the probe
+        assert breaker.allow()
+        breaker.record_success()
+        for _ in range(100):
+            if len(reclassified) == 3:
+                break
+            time.sleep(0.05)
+
+    assert pending_requeue() == 0
+    assert [c.chunk_id for c in reclassified] == [c.chunk_id for c in out]
+    assert all(c.label.value == "requirement" and not is_degraded(c) for c in reclassified)
+
+
+def test_cli_wait_probes_a_half_open_breaker(monkeypatch):
+    now = [0.0]
+    breaker = _install_breaker(failure_threshold=1, reset_timeout_s=30, clock=lambda: now[0])
+    breaker.record_failure()
+    out = asyncio.run(classify_chunks_async(
+        [{"cleaned_text": "The new system feature must export reports to the portal.", "speaker": "Alice",
+          "source_ref": "<0>"}],
+        api_key="test", log_fn=lambda line: None, use_cache=False, use_local_model=False,
+        client=FakeAsyncGroq(), scheduler=RateLimitScheduler(rpm=10_000, tpm=None),
+    ))
+    degraded_id = out[0].chunk_id
+
+    stored = []
+    with FakeLLMServer() as server:
+        monkeypatch.setenv("GROQ_BASE_URL", server.base_url)
+        left = requeue_and_wait(out, "test", stored.extend, 0.2, use_cache=False, use_local_model=False)
+        assert left == 1 and pending_requeue() == 1 and not stored      # still open: gives up
+
+        now[0] += 30                    # half-open, and no other traffic to close it
+        assert wait_for_requeue(10) == 0
+
+    assert breaker.state == CLOSED
+    assert [c.chunk_id for c in stored] == [degraded_id]
+    assert out[0] is stored[0] and not is_degraded(out[0])             # replaced in place
@@ -0,0 +1,129 @@
+"""
+test_classifier_async.py
+Asyncio Phase 2 engine against a fake AsyncGroq-style client (no network).
+"""
+
+import asyncio
+
+import classifier
+from classifier import classify_chunks_async, run_parallel_batches_async
+from llm_cache import LLM_FAILURE_REASONING
+from rate_limiter import RateLimitScheduler
+
+from .conftest import FakeAsyncGroq, make_pending
+
+
+def _scheduler():
+    return RateLimitScheduler(rpm=10_000, tpm=None)
+
+
+def test_in_flight_batches_are_bounded(monkeypatch):
+    monkeypatch.setattr(classifier, "BATCH_MAX_ITEMS", 10)
+    client = FakeAsyncGroq()
+    results = asyncio.run(run_parallel_batches_async(
+        make_pending(100), client, lambda n: None, scheduler=_scheduler(), max_in_flight=3,
+    ))
+    assert client.calls == 10
+    assert client.max_in_flight == 3
+    assert sorted(results) == list(range(100))
+    assert all(r["label"] == "requirement" for r in results.values())
+
+
+def test_timeout_falls_back_to_noise(monkeypatch):
+    monkeypatch.setattr(classifier, "MAX_RETRIES", 1)
+    client = FakeAsyncGroq(delay=5)
+    scheduler = _scheduler()
+    results = asyncio.run(run_parallel_batches_async(
+        make_pending(3), client, lambda n: None, scheduler=scheduler, timeout=0.05,
+    ))
+    assert {r["reasoning"] for r in results.values()} == {LLM_FAILURE_REASONING}
+    assert scheduler.in_flight == 0
+
+
+def test_cancellation_stops_outstanding_batches():
+    client = FakeAsyncGroq(delay=5)
+    scheduler = _scheduler()
+
+    async def main():
+        run = asyncio.create_task(run_parallel_batches_async(
+            make_pending(50), client, lambda n: None, scheduler=scheduler,
+        ))
+        await asyncio.sleep(0.05)
+        run.cancel()
+        try:
+            await run
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(main())
+    assert client.in_flight == 0
+    assert scheduler.in_flight == 0
+
+
+def test_classify_chunks_async_end_to_end():
+    client = FakeAsyncGroq()
+    chunks = [
+        {"cleaned_text": "The new system feature must allow a user to reset their password via email.",
+         "speaker": "Alice", "source_ref": "<1>"},
+        {"cleaned_text": "lol", "speaker": "Bob", "source_ref": "<2>"},
+    ]
+    lines = []
+    out = asyncio.run(classify_chunks_async(
+        chunks, api_key="test", log_fn=lines.append, use_cache=False,
+        client=client, scheduler=_scheduler(),
+    ))
+    assert [c.source_ref for c in out] == ["<1>", "<2>"]
+    assert out[1].label.value == "noise"
+    assert any("Classified 2/2" in line for line in lines)
+    assert not client.closed  # caller-supplied clients are left open
+
+
+def _mixed_chunks(n):
+    """Alternating LLM-bound requirements and heuristic small talk."""
+    return [
+        {"cleaned_text": f"The portal must export report {i} to the finance system nightly."
+         if i % 2 == 0 else "lol", "speaker": "Alice", "source_ref": f"<{i}>"}
+        for i in range(n)
+    ]
+
+
+def test_unordered_stream_yields_heuristics_before_llm():
+    client = FakeAsyncGroq(delay=0.2)
+
+    async def first_item():
+        stream = classifier.iter_classified_async(
+            _mixed_chunks(20), api_key="test", log_fn=lambda line: None, use_cache=False,
+            client=client, scheduler=_scheduler(),
+        )
+        try:
+            return await stream.__anext__(), client.in_flight
+        finally:
+            await stream.aclose()
+
+    item, llm_in_flight = asyncio.run(first_item())
+    assert item.reasoning != "fake" and llm_in_flight == 0
+    assert client.in_flight == 0  # closing the stream cancelled the batches
+
+
+def test_ordered_stream_matches_input_order():
+    async def collect():
+        return [c async for c in classifier.iter_classified_async(
+            _mixed_chunks(30), api_key="test", ordered=True, log_fn=lambda line: None,
+            use_cache=False, client=FakeAsyncGroq(), scheduler=_scheduler(),
+        )]
+
+    out = asyncio.run(collect())
+    assert [c.source_ref for c in out] == [f"<{i}>" for i in range(30)]
+    assert {c.reasoning for c in out[::2]} == {"fake"}
+
+
+def test_sync_iter_classified_streams_and_closes_early(monkeypatch):
+    monkeypatch.setattr(classifier, "make_async_client", lambda api_key: FakeAsyncGroq())
+    chunks = _mixed_chunks(40)
+
+    out = list(classifier.iter_classified(chunks, "test", log_fn=lambda line: None, use_cache=False))
+    assert sorted(c.source_ref for c in out) == sorted(c["source_ref"] for c in chunks)
+
+    stream = classifier.iter_classified(chunks, "test", log_fn=lambda line: None, use_cache=False)
+    next(stream)
+    stream.close()  # cancels the background run and joins its thread
@@ -0,0 +1,83 @@
+"""
+test_decision_log.py
+Queue-backed JSONL decision logging: records, sampling, rotation, disabling.
+"""
+
+import json
+
+import pytest
+
+import decision_log
+from decision_log import configure_decision_log, flush_decision_log, log_chunk_decision
+
+CHUNK = {"cleaned_text": "The system must support SSO.", "speaker": "Alice", "source_ref": "<1>"}
+
+
+@pytest.fixture(autouse=True)
+def restore_defaults():
+    yield
+    flush_decision_log()
+    decision_log._config = {}
+
+
+def _records(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_records_are_jsonl_with_extras(tmp_path):
+    path = tmp_path / "decisions.jsonl"
+    configure_decision_log(path=str(path), sampling={})
+    log_chunk_decision(CHUNK, "LLM_BATCH", "requirement", 0.95, "needs SSO")
+    log_chunk_decision(CHUNK, "LLM_NEAR_DUP", "requirement", 0.95, "needs SSO", duplicate_of="<0>")
+    flush_decision_log()
+
+    first, second = _records(path)
+    assert first["path"] == "LLM_BATCH" and first["label"] == "requirement"
+    assert first["source_ref"] == "<1>" and first["sample_rate"] == 1.0
+    assert second["duplicate_of"] == "<0>"
+
+
+def test_sampling_per_path_group(tmp_path):
+    path = tmp_path / "decisions.jsonl"
+    configure_decision_log(path=str(path), sampling={"HEURISTIC": 0.0, "LLM": 1.0})
+    for _ in range(50):
+        log_chunk_decision(CHUNK, "HEURISTIC", "noise", 1.0, "rule")
+    log_chunk_decision(CHUNK, "LLM_CACHE", "requirement", 0.9, "cached")
+    flush_decision_log()
+
+    assert [r["path"] for r in _records(path)] == ["LLM_CACHE"]
+
+
+def test_rotates_by_size(tmp_path):
+    path = tmp_path / "decisions.jsonl"
+    configure_decision_log(path=str(path), sampling={}, max_bytes=2000, backup_count=2)
+    for _ in range(40):
+        log_chunk_decision(CHUNK, "LLM_BATCH", "requirement", 0.95, "x" * 100)
+    flush_decision_log()
+
+    assert (tmp_path / "decisions.jsonl.1").exists()
+    assert not (tmp_path / "decisions.jsonl.3").exists()
+    assert path.stat().st_size <= 2000
+
+
+def test_rotates_by_age(tmp_path, monkeypatch):
+    path = tmp_path / "decisions.jsonl"
+    configure_decision_log(path=str(path), sampling={}, max_age_s=60)
+    log_chunk_decision(CHUNK, "LLM_BATCH", "requirement", 0.95, "old")
+    flush_decision_log()
+
+    clock = decision_log.time.time() + 120
+    monkeypatch.setattr(decision_log.time, "time", lambda: clock)
+    log_chunk_decision(CHUNK, "LLM_BATCH", "requirement", 0.95, "new")  # restarts the writer
+    flush_decision_log()
+
+    assert [r["reasoning"] for r in _records(tmp_path / "decisions.jsonl.1")] == ["old"]
+    assert [r["reasoning"] for r in _records(path)] == ["new"]
+
+
+def test_disabled_level_does_no_work(tmp_path):
+    path = tmp_path / "decisions.jsonl"
+    configure_decision_log(path=str(path), level="INFO")
+    log_chunk_decision({"cleaned_text": None}, "LLM_BATCH", "noise", 0.0, "")  # would fail if formatted
+    flush_decision_log()
+    assert not path.exists()
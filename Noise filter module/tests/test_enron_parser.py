@@ -3,7 +3,7 @@ test_enron_parser.py
 """
 
 import pandas as pd
-from enron_parser import strip_boilerplate, flatten_thread, deduplicate
+from enron_parser import strip_boilerplate, flatten_thread, deduplicate, iter_chunks, parse_to_chunks
 
 def test_strip_boilerplate_removes_forwarded_header():
     text = """
@@ -67,3 +67,82 @@ def test_deduplicate_removes_duplicates():
     deduped = deduplicate(df)
     assert len(deduped) == 2
     assert list(deduped["Message-ID"]) == ["<123>", "<456>"]
+
+def _raw_email(message_id, body, subject="Status"):
+    header = f"Message-ID: {message_id}\n" if message_id else ""
+    return (f"{header}From: kay.mann@enron.com\nX-From: Kay Mann\nSubject: {subject}\n"
+            f"Content-Type: text/plain; charset=us-ascii\n\n{body}")
+
+def _write_emails_csv(path):
+    rows = [(f"inbox/{i}.", _raw_email(f"<{i % 7}.JavaMail>", f"The system must export \"report\" {i}.\n\n"
+                                        f"-----Original Message-----\nFrom: Bob\n\nEarlier note number {i} here."))
+            for i in range(20)]
+    rows.append(("inbox/x.", _raw_email("", "A message without any Message-ID header.")))
+    rows.append(("inbox/y.", _raw_email("", "Another message, also without a Message-ID.")))
+    pd.DataFrame(rows, columns=["file", "message"]).to_csv(path, index=False)
+    return path
+
+def test_iter_chunks_streams_same_chunks_as_parse_to_chunks(tmp_path):
+    path = _write_emails_csv(tmp_path / "emails.csv")
+
+    chunks = parse_to_chunks(path)
+    assert [c["source_ref"] for c in chunks[::2]] == [f"<{i}.JavaMail>" for i in range(7)] + ["row_7"]
+    assert len(chunks) == 15    # repeated Message-IDs dropped; a missing one repeats too
+    assert chunks[0]["cleaned_text"] == 'Subject: Status\n\nThe system must export "report" 0.'
+    assert chunks[1]["cleaned_text"] == "From: Bob\n\nEarlier note number 0 here."
+    for batch_rows in (1, 3, 50):
+        assert list(iter_chunks(path, batch_rows=batch_rows)) == chunks
+    assert list(iter_chunks(path, n=3, batch_rows=2)) == chunks[:6]
+
+def test_sharded_parsing_matches_serial(tmp_path, monkeypatch):
+    import enron_parser
+
+    path = _write_emails_csv(tmp_path / "emails.csv")
+    data = path.read_bytes()
+    ranges = enron_parser.shard_ranges(path, 300)
+    assert len(ranges) > 3 and ranges[-1][1] == len(data)
+    assert data[:ranges[0][0]] == b"file,message\n"
+    assert all(data[start:start + 6] == b"inbox/" for start, _ in ranges)     # record boundaries only
+
+    monkeypatch.setattr(enron_parser, "MIN_BYTES_FOR_PROCESS_POOL", 0)
+    serial = list(iter_chunks(path, workers=1))
+    assert list(iter_chunks(path, workers=2, shard_bytes=300)) == serial
+    assert parse_to_chunks(path, workers=2, use_cache=False) == serial
+
+
+def test_line_scan_matches_regex_stripper():
+    from enron_parser import _Cleaned, _strip_boilerplate_regex
+
+    samples = [
+        "Please review the attached.\n\n-----Original Message-----\nFrom: Bob\nSent: Monday",
+        "Status update.\n\n   \n\t---------------------- Forwarded by Kay Mann/Corp/Enron on 04/25/2001",
+        "Notes below\n10:30 AM ----------\nsecond line\n> quoted reply\n>> older reply\nthird line",
+        "Deal is done.\n10:30\n\nAM\n  -----Original Message-----\nFrom: Bob",
+        "Thanks!\n\n--\nKay Mann\nEnron North America",
+        "Thanks!\n--   ",
+        "Numbers attached. This e-mail is intended only for the named recipient.\nMore text",
+        "> This message is CONFIDENTIAL\nignored",
+        "  > leading space quote\nThe system must export reports.",
+        "Line one\n\n\n\n\nLine two\r\n\r\nLine three",
+        "12:45 PM - divider only",
+        "---\n> hidden\n\nForwarded Message and the rest",
+        "",
+    ]
+    for text in samples:
+        cleaned = strip_boilerplate(text)
+        assert cleaned == _strip_boilerplate_regex(text), text
+        if isinstance(cleaned, _Cleaned):
+            assert _strip_boilerplate_regex(cleaned) == cleaned
+            assert strip_boilerplate(cleaned) is cleaned      # second call is free
+        else:
+            assert strip_boilerplate(cleaned) == _strip_boilerplate_regex(cleaned)
+    assert strip_boilerplate(None) == ""
+
+def test_line_scan_is_linear_on_pathological_input():
+    import time
+
+    for text in ("Status\n" + "\n" * 200_000 + "end of note", "Status\n" + "-" * 200_000 + " end of note\n"):
+        t0 = time.perf_counter()
+        segments = [strip_boilerplate(s) for s in flatten_thread(text)]
+        assert time.perf_counter() - t0 < 1.0       # the regex version takes minutes here
+        assert segments[0].startswith("Status")
@@ -0,0 +1,83 @@
+"""
+test_fake_llm_server.py
+Deterministic labels, fault injection and record/replay cassettes of the
+local fake LLM server, driven through the real classifier.
+"""
+
+import asyncio
+
+from groq import AsyncGroq
+
+import classifier
+from classifier import classify_chunks_async
+from fake_llm_server import FakeLLMServer, hashed_verdict
+from llm_cassette import Cassette, request_key
+from llm_cache import LLM_FAILURE_REASONING
+from rate_limiter import RateLimitScheduler
+
+TOPICS = ["export the quarterly report", "approve the vendor contract", "move the launch to March",
+          "add SSO to the portal", "the dashboard feels slow"]
+
+
+def _chunks(n):
+    return [{"cleaned_text": f"The new system feature must {TOPICS[i % 5]} for region {i}.",
+             "speaker": "Alice", "source_ref": f"<{i}>"} for i in range(n)]
+
+
+def _classify(server, chunks, prompt_mode="full"):
+    async def run():
+        client = AsyncGroq(api_key="test", base_url=server.base_url, max_retries=0)
+        try:
+            return await classify_chunks_async(
+                chunks, api_key="test", log_fn=lambda line: None, use_cache=False, use_local_model=False,
+                near_dedup=False, client=client, scheduler=RateLimitScheduler(rpm=100_000, tpm=None),
+                prompt_mode=prompt_mode,
+            )
+        finally:
+            await client.close()
+    return asyncio.run(run())
+
+
+def test_hashed_labels_are_deterministic_across_prompt_modes(monkeypatch):
+    monkeypatch.setattr(classifier, "BATCH_MAX_ITEMS", 5)
+    chunks = _chunks(40)
+    with FakeLLMServer(hashed_labels=True) as server:
+        full = _classify(server, chunks, "full")
+        compact = _classify(server, chunks, "compact")
+
+    assert [c.label for c in compact] == [c.label for c in full]
+    by_llm = [(c, hashed_verdict(chunk["cleaned_text"])) for c, chunk in zip(full, chunks)
+              if c.reasoning == "fake server"]           # the rest never left the heuristics
+    assert len(by_llm) > 20
+    assert all(c.label.value == v["label"] and c.confidence == v["confidence"] for c, v in by_llm
+               if v["confidence"] >= classifier.MIN_ACCEPT_CONFIDENCE)
+    assert len({c.label for c, _ in by_llm}) > 2
+
+
+def test_injected_429s_and_malformed_json_are_recovered(monkeypatch):
+    monkeypatch.setattr(classifier, "BATCH_MAX_ITEMS", 5)
+    chunks = _chunks(60)
+    with FakeLLMServer(rate_limit_fraction=0.15, retry_after_s=0.01, malformed_fraction=0.15, seed=3) as server:
+        out = _classify(server, chunks)
+
+    assert server.rate_limited > 0 and server.malformed > 0
+    assert [c.source_ref for c in out] == [c["source_ref"] for c in chunks]
+    assert sum(c.reasoning == LLM_FAILURE_REASONING for c in out) < 5
+
+
+def test_cassette_replays_recorded_run_without_upstream(monkeypatch, tmp_path):
+    monkeypatch.setattr(classifier, "BATCH_MAX_ITEMS", 5)
+    chunks = _chunks(30)
+    path = tmp_path / "run.jsonl"
+    with FakeLLMServer(hashed_labels=True, delay_s=0.01) as provider:
+        with FakeLLMServer(cassette=Cassette(path), upstream=provider.base_url) as recorder:
+            recorded = _classify(recorder, chunks)
+        assert recorder.recorded == provider.requests > 0
+
+    with FakeLLMServer(cassette=Cassette(path)) as replayer:
+        replayed = _classify(replayer, chunks)
+    assert replayer.replayed == replayer.requests == recorder.recorded
+    assert [(c.label, c.confidence) for c in replayed] == [(c.label, c.confidence) for c in recorded]
+
+    body = {"model": "m", "messages": [{"role": "user", "content": "x"}]}
+    assert request_key(body) == request_key({**body, "stream": False}) != request_key({**body, "model": "n"})
@@ -0,0 +1,99 @@
+"""
+test_hedging.py
+Run deadlines and hedged requests, against fake_llm_server with injected delays.
+"""
+
+import asyncio
+import time
+
+from groq import AsyncGroq
+
+import classifier
+from classifier import run_parallel_batches
+from fake_llm_server import FakeLLMServer
+from hedging import Deadline, LatencyTracker, hedged_call
+from llm_cache import LLM_FAILURE_REASONING
+from rate_limiter import RateLimitScheduler
+
+from .conftest import make_pending
+
+
+def _scheduler():
+    return RateLimitScheduler(rpm=10_000, tpm=None)
+
+
+def test_deadline_caps_call_timeouts():
+    now = [100.0]
+    deadline = Deadline(10, clock=lambda: now[0])
+    assert deadline.timeout(60) == 10
+    now[0] += 8
+    assert deadline.timeout(60) == 2 and not deadline.expired()
+    now[0] += 5
+    assert deadline.timeout(60) == 0 and deadline.expired()
+    assert Deadline(None).timeout(60) == 60
+
+
+def test_hedge_fires_after_percentile_and_first_answer_wins():
+    tracker = LatencyTracker(percentile=95, min_samples=5)
+    for _ in range(5):
+        tracker.record(0.05)
+
+    async def make_call(hedge):
+        await asyncio.sleep(0.01 if hedge else 5)
+        return "hedge" if hedge else "primary"
+
+    t0 = time.monotonic()
+    assert asyncio.run(hedged_call(make_call, tracker)) == "hedge"
+    assert time.monotonic() - t0 < 1
+    assert (tracker.hedged, tracker.hedge_wins) == (1, 1)
+
+
+def test_no_hedge_without_latency_history():
+    tracker = LatencyTracker(min_samples=5)
+
+    async def make_call(hedge):
+        await asyncio.sleep(0.05)
+        return hedge
+
+    assert asyncio.run(hedged_call(make_call, tracker)) is False
+    assert tracker.hedged == 0 and tracker.calls == 1
+
+
+def _classify_over_http(server, **kwargs):
+    async def run():
+        client = AsyncGroq(api_key="test", base_url=server.base_url, max_retries=0)
+        try:
+            return await classifier.run_parallel_batches_async(
+                make_pending(40), client, lambda n: None, scheduler=_scheduler(),
+                cascade=classifier.CascadeConfig(enabled=False), **kwargs,
+            )
+        finally:
+            await client.close()
+    return asyncio.run(run())
+
+
+def test_hedging_cuts_tail_latency_over_http(monkeypatch):
+    monkeypatch.setattr(classifier, "BATCH_MAX_ITEMS", 1)   # 40 requests
+    monkeypatch.setattr(classifier, "MAX_CONCURRENT_BATCHES", 1)
+    monkeypatch.setattr("hedging.HEDGE_MIN_SAMPLES", 5)
+    # Requests 10 and 25 hang for 3s; every other request (hedges included) is fast
+    with FakeLLMServer(delay_fn=lambda n: 3.0 if n in (10, 25) else 0.01) as server:
+        t0 = time.monotonic()
+        results = _classify_over_http(server)
+        elapsed = time.monotonic() - t0
+
+    tracker = classifier.get_latency_tracker(classifier.MODEL_NAME)
+    assert sorted(results) == list(range(40))
+    assert {r["reasoning"] for r in results.values()} == {"fake server"}
+    assert tracker.hedge_wins == 2
+    assert elapsed < 3
+
+
+def test_run_budget_bounds_a_hung_provider():
+    with FakeLLMServer(delay_s=5) as server:
+        t0 = time.monotonic()
+        results = _classify_over_http(server, deadline=Deadline(0.5))
+        elapsed = time.monotonic() - t0
+
+    assert {r["reasoning"] for r in results.values()} == {LLM_FAILURE_REASONING}
+    assert elapsed < 2
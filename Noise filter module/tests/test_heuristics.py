@@ -27,3 +27,52 @@ def test_normal_text_returns_none():
     chunk = {"cleaned_text": "We need to finalize the API spec soon.", "speaker": "Alice"}
     # This is long enough and not pure noise, so it should pass through to LLM (return None)
     assert apply_heuristics(chunk) is None
+
+def test_scan_matches_individual_rules():
+    from classifier import _HEURISTIC_RULES, scan_heuristics
+
+    texts = [
+        "Can we move the deadline for phase 2 to Friday at 3pm?",
+        "[laughter] okay then, shall we take a coffee break",
+        "Dial-in details for the webex are in the calendar invite.",
+        "The deliverable list for go-live is attached.",
+        "DEADLINE moved; PHASE 3 starts after the code freeze",
+        "Webinar on Phase 10 next Thursday deadline",
+        "The deaıdline slipped; deadlıne is now next week",  # dotless i
+        "The deadl\u0130ne for the vendor contract is Friday afternoon at noon.",  # dotted capital I
+        "The new reporting dashboard must export to Excel.",
+        "",
+    ]
+    for text in texts:
+        hits, _ = scan_heuristics(text)
+        for name, pattern, _ in _HEURISTIC_RULES:
+            assert (name in hits) == bool(pattern.search(text)), (name, text)
+    chunk = {"cleaned_text": "The deadl\u0130ne for the vendor contract is Friday afternoon at noon.", "speaker": "Alice"}
+    assert apply_heuristics(chunk) == "timeline_reference"
+
+def test_system_mail_speaker_is_noise():
+    chunk = {"cleaned_text": "Your message could not be delivered to the API team.", "speaker": "MAILER-DAEMON"}
+    assert apply_heuristics(chunk) == "noise"
+
+def test_sharded_heuristics_match_serial(monkeypatch):
+    import classifier
+    from classifier import run_parallel_heuristics
+
+    texts = [
+        "We need to finalize the API spec soon.",
+        "Sounds good thanks",
+        "The deadline for phase 1 is October 15th.",
+        "Let's grab lunch at 12.",
+        "Users need a dashboard showing pipeline performance by region.",
+        "I will be out of the office on Friday afternoon for personal reasons.",
+    ]
+    chunks = [{"cleaned_text": t, "speaker": "Alice", "source_ref": f"<{i}>"}
+              for i, t in enumerate(texts * 5)]
+
+    serial_fast, serial_pending = run_parallel_heuristics(chunks, workers=1)
+    monkeypatch.setattr(classifier, "MIN_CHUNKS_FOR_PROCESS_POOL", 0)
+    sharded_fast, sharded_pending = run_parallel_heuristics(chunks, workers=2, shard_size=4)
+
+    assert sharded_fast == serial_fast
+    assert [i for i, _ in sharded_pending] == [i for i, _ in serial_pending]
+    assert all(c is chunks[i] for i, c in sharded_pending)
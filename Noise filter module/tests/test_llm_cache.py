@@ -0,0 +1,69 @@
+"""
+test_llm_cache.py
+"""
+
+import pytest
+
+import storage
+from llm_cache import ClassificationCache, LLM_FAILURE_REASONING
+
+from .conftest import FakeGroq, make_pending
+
+
+@pytest.fixture(autouse=True)
+def isolated_sqlite(tmp_path, monkeypatch):
+    """Point the storage layer at a throwaway SQLite file."""
+    monkeypatch.setattr(storage, "DB_TYPE", "sqlite")
+    monkeypatch.setattr(storage, "SQLITE_DB_PATH", tmp_path / "cache.db")
+
+
+def test_lookup_store_roundtrip():
+    cache = ClassificationCache("model-a", "v1")
+    pending = make_pending(["The system must support SSO.", "We will use AWS."])
+
+    cached, remaining = cache.lookup(pending)
+    assert cached == {} and remaining == pending
+
+    cache.store(pending, {
+        0: {"label": "requirement", "confidence": 0.9, "reasoning": "need"},
+        1: {"label": "noise", "confidence": 0.0, "reasoning": LLM_FAILURE_REASONING},
+    })
+    cached, remaining = cache.lookup(pending)
+    assert cached == {0: {"label": "requirement", "confidence": 0.9, "reasoning": "need"}}
+    assert [i for i, _ in remaining] == [1]  # failure fallbacks are never cached
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 3
+
+    # A different model or prompt version is a different key
+    assert ClassificationCache("model-b", "v1").lookup(pending)[0] == {}
+    assert ClassificationCache("model-a", "v2").lookup(pending)[0] == {}
+
+
+def test_eviction_drops_least_recently_used():
+    cache = ClassificationCache("model-a", "v1", max_entries=2)
+    pending = make_pending(["first chunk text", "second chunk text", "third chunk text"])
+    verdict = {"label": "decision", "confidence": 0.95, "reasoning": "r"}
+    for item in pending:
+        cache.store([item], {item[0]: verdict})
+    cache.lookup(pending[:1])  # touch the oldest entry
+
+    cache.evict()
+    cached, _ = cache.lookup(pending)
+    assert cache.evictions == 1
+    assert sorted(cached) == [0, 2]
+
+
+def test_rerun_makes_no_api_calls():
+    from classifier import run_parallel_batches
+
+    pending = make_pending([f"Users need report number {n} exported nightly." for n in range(12)])
+    client = FakeGroq()
+
+    first = run_parallel_batches(pending, client, lambda n: None,
+                                 cache=ClassificationCache("model-a", "v1"))
+    calls_after_first = client.calls
+    second = run_parallel_batches(pending, client, lambda n: None,
+                                  cache=ClassificationCache("model-a", "v1"))
+
+    assert calls_after_first == 1  # 12 short chunks fit one token-budgeted request
+    assert client.calls == calls_after_first
+    assert second == first
@@ -0,0 +1,93 @@
+"""
+test_local_model.py
+Training, versioning and pipeline use of the local fallback classifier.
+"""
+
+import asyncio
+import random
+
+import pytest
+
+import local_model
+from local_model import LOCAL_MODEL_REASONING_PREFIX, load_latest_model, retrain, training_examples
+from rate_limiter import RateLimitScheduler
+from schema import ClassifiedChunk, SignalLabel
+from .conftest import FakeAsyncGroq
+
+_TEMPLATES = {
+    "requirement": "The {thing} must support {feature} for the trading desks.",
+    "decision": "We decided to build the {thing} on {vendor} after the review.",
+    "stakeholder_feedback": "Users complained that the {thing} is too slow and confusing.",
+    "noise": "Thanks {name}, see you at lunch on {day}.",
+}
+_WORDS = {
+    "thing": ["dashboard", "settlement report", "credit workflow", "position screen", "deal module"],
+    "feature": ["single sign-on", "excel export", "audit history", "bulk upload", "price alerts"],
+    "vendor": ["Oracle", "AWS", "SAP", "Postgres"],
+    "name": ["Sara", "Vince", "Kay", "Jeff", "Louise"],
+    "day": ["Monday", "Tuesday", "Friday"],
+}
+
+
+def _rows(n, seed=0):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        label = rng.choice(sorted(_TEMPLATES))
+        text = _TEMPLATES[label].format(**{k: rng.choice(v) for k, v in _WORDS.items()}) + f" Ref {i}."
+        rows.append(ClassifiedChunk(source_ref=f"<{i}>", raw_text="", cleaned_text=text,
+                                    label=SignalLabel(label), confidence=0.95, reasoning="llm"))
+    return rows
+
+
+@pytest.fixture(autouse=True)
+def model_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(local_model, "MODEL_DIR", tmp_path / "models")
+    return tmp_path / "models"
+
+
+def test_training_examples_keep_only_llm_verdicts():
+    rows = _rows(5)
+    rows[0].reasoning = "Classified by heuristic rule."
+    rows[1].reasoning = f"{LOCAL_MODEL_REASONING_PREFIX} v1 (p=0.97)."
+    rows[2].duplicate_of = "<9>"
+    rows[3].confidence = 0.5
+    assert [text for text, _ in training_examples(rows)] == [rows[4].cleaned_text]
+
+
+def test_retrain_writes_versioned_artifact_and_report(model_dir):
+    path, report = retrain(chunks=_rows(600))
+    assert path.name == "local_classifier_v1.json"
+    assert report["accuracy"] > 0.95
+    assert report["accepted_accuracy"] > 0.95 and report["llm_calls_saved"] > 0.5
+
+    path, _ = retrain(chunks=_rows(600, seed=1))
+    assert path.name == "local_classifier_v2.json"
+    assert load_latest_model().version == 2
+
+
+def test_too_few_rows_refuses_to_train():
+    with pytest.raises(ValueError):
+        retrain(chunks=_rows(20))
+
+
+def test_confident_predictions_skip_the_llm():
+    from classifier import classify_chunks_async
+
+    retrain(chunks=_rows(600))
+    chunks = [
+        {"cleaned_text": "The dashboard must support excel export for the trading desks.", "speaker": "A",
+         "source_ref": "<local>"},
+        {"cleaned_text": "Finance wants the integration layer to reconcile data against the legacy "
+                         "platform nightly so that the settlement totals match the general ledger before "
+                         "the trading desks open each morning and auditors can trace every adjustment.",
+         "speaker": "A", "source_ref": "<llm>"},
+    ]
+    client = FakeAsyncGroq()
+    out = asyncio.run(classify_chunks_async(
+        chunks, api_key="test", log_fn=lambda line: None, use_cache=False,
+        client=client, scheduler=RateLimitScheduler(rpm=10_000, tpm=None),
+    ))
+    assert out[0].label.value == "requirement"
+    assert out[0].reasoning.startswith(LOCAL_MODEL_REASONING_PREFIX)
+    assert out[1].reasoning == "fake" and client.calls == 1
@@ -0,0 +1,55 @@
+"""
+test_near_dedup.py
+Near-duplicate clustering and verdict reuse in the LLM queue.
+"""
+
+import asyncio
+
+from near_dedup import NearDuplicateIndex, collapse_near_duplicates, jaccard, shingle_hashes
+from rate_limiter import RateLimitScheduler
+
+from .conftest import FakeAsyncGroq, make_pending
+
+THREAD = (
+    "Team, the reporting dashboard must show daily gas volumes per trading desk, "
+    "with drill-down to individual counterparties and an export to Excel. "
+    "Finance has asked that the numbers reconcile with the settlement system by 9am. "
+    "The data pipeline should retry failed loads twice before alerting the desk."
+)
+REPLY = THREAD.replace("twice", "three times")
+OTHER = "The login page needs single sign-on so every user gets access through the corporate directory."
+
+
+def test_one_line_edit_joins_cluster():
+    reps, members = collapse_near_duplicates(make_pending([THREAD, OTHER, REPLY, THREAD.lower()]))
+
+    assert [i for i, _ in reps] == [0, 1]
+    assert [m for m, _ in members[0]] == [2, 3]
+    assert all(sim >= 0.85 for _, sim in members[0])
+
+
+def test_threshold_is_configurable():
+    sim = jaccard(shingle_hashes(THREAD), shingle_hashes(REPLY))
+    strict = NearDuplicateIndex(threshold=min(1.0, sim + 0.01))
+    strict.add("a", THREAD)
+    assert strict.add("b", REPLY) is None
+
+    loose = NearDuplicateIndex(threshold=sim)
+    loose.add("a", THREAD)
+    assert loose.add("b", REPLY) == ("a", sim)
+
+
+def test_members_reuse_representative_verdict():
+    from classifier import classify_chunks_async
+
+    chunks = [{"cleaned_text": t, "speaker": "Alice", "source_ref": f"<{i}>"}
+              for i, t in enumerate([THREAD, REPLY, OTHER])]
+    client = FakeAsyncGroq()
+    out = asyncio.run(classify_chunks_async(
+        chunks, api_key="test", log_fn=lambda line: None, use_cache=False,
+        client=client, scheduler=RateLimitScheduler(rpm=10_000, tpm=None),
+    ))
+
+    assert client.calls == 1
+    assert out[1].duplicate_of == "<0>" and out[1].label == out[0].label
+    assert out[0].duplicate_of is None and out[2].duplicate_of is None
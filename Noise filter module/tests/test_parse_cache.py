@@ -0,0 +1,84 @@
+"""
+test_parse_cache.py
+Parsed corpora cached as Arrow IPC: identical chunks on a warm start, and a
+rebuild whenever the source file or the parser version changes.
+"""
+
+import json
+import os
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+import ami_parser
+import enron_parser
+import parse_cache
+
+from .test_enron_parser import _write_emails_csv
+
+
+def _cache_files(directory):
+    return sorted(directory.glob(f"*{parse_cache.CACHE_SUFFIX}"))
+
+
+def test_warm_start_reads_identical_chunks(tmp_path, monkeypatch):
+    path = _write_emails_csv(tmp_path / "emails.csv")
+    cold = enron_parser.parse_to_chunks(path)
+    (entry,) = _cache_files(tmp_path / parse_cache.CACHE_DIR_NAME)
+
+    monkeypatch.setattr(enron_parser, "iter_chunks", lambda *a, **kw: pytest.fail("parsed again"))
+    assert enron_parser.parse_to_chunks(path) == cold
+    assert enron_parser.parse_to_chunks(path, workers=2) == cold   # workers do not change the output
+    info = parse_cache.describe(entry)
+    assert info["fresh"] and info["rows"] == str(len(cold)) and info["parser"] == "enron"
+
+
+def test_changed_source_or_version_rebuilds(tmp_path, monkeypatch):
+    path = _write_emails_csv(tmp_path / "emails.csv")
+    cache_dir = tmp_path / parse_cache.CACHE_DIR_NAME
+    first = enron_parser.parse_to_chunks(path)
+    assert len(enron_parser.parse_to_chunks(path, n=3)) < len(first)
+    assert len(_cache_files(cache_dir)) == 2     # one entry per set of options
+
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    (old_entry,) = [p for p in _cache_files(cache_dir) if parse_cache.describe(p)["options"] == '{"n": null}']
+    assert not parse_cache.describe(old_entry)["fresh"]
+    calls = []
+    real_iter_chunks = enron_parser.iter_chunks
+    monkeypatch.setattr(enron_parser, "iter_chunks", lambda *a, **kw: calls.append(1) or real_iter_chunks(*a, **kw))
+    assert enron_parser.parse_to_chunks(path) == first and calls == [1]
+    assert not old_entry.exists() and len(_cache_files(cache_dir)) == 2     # replaced, not piled up
+
+    monkeypatch.setattr(enron_parser, "PARSER_VERSION", "test")
+    enron_parser.parse_to_chunks(path)
+    assert calls == [1, 1]
+
+
+def test_ami_json_cache_and_cli(tmp_path, monkeypatch, capsys):
+    meetings = [{"meeting_id": f"ES200{i}a", "transcript": [
+        {"speaker": "PM", "text": f"We decided to ship the remote control in phase {i}.",
+         "start_time": "00:01:00", "end_time": "00:01:20"},
+        {"speaker": "UI", "text": "The remote must have a large power button.",
+         "start_time": "00:01:20", "end_time": "00:01:40"},
+    ]} for i in range(3)]
+    path = tmp_path / "ami.json"
+    path.write_text(json.dumps(meetings))
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr(parse_cache, "PARSE_CACHE_DIR", str(cache_dir))
+
+    chunks = ami_parser.parse_to_chunks(path)
+    assert ami_parser.parse_to_chunks(str(path)) == chunks
+    assert ami_parser.parse_to_chunks(meetings) == chunks      # in-memory sources are never cached
+    assert ami_parser.parse_to_chunks(path, use_cache=False) == chunks
+    assert len(_cache_files(cache_dir)) == 1
+
+    monkeypatch.setattr("sys.argv", ["parse_cache.py", "list", str(cache_dir)])
+    parse_cache.main()
+    out = capsys.readouterr().out
+    assert f"ami v1  |  {len(chunks)} chunks" in out and "fresh" in out
+
+    monkeypatch.setattr("sys.argv", ["parse_cache.py", "clear", str(cache_dir)])
+    parse_cache.main()
+    assert "Removed 1 cache files" in capsys.readouterr().out and not _cache_files(cache_dir)
@@ -0,0 +1,91 @@
+"""
+test_prompt_modes.py
+Compact prompt mode: system-prompt definitions, letter codes, second-pass reasoning.
+"""
+
+import json
+import re
+
+import pytest
+
+import classifier
+from classifier import BatchRecoveryStats, COMPACT_NO_REASONING, classify_batch_with_llm
+from prompts import COMPACT_SYSTEM_PROMPT, build_batch_classification_prompt, build_compact_batch_prompt
+
+from .conftest import FakeGroq, make_pending
+
+
+class CompactGroq(FakeGroq):
+    """Answers CLASSIFY with letter codes (0.75 for ids in `unsure`) and EXPLAIN with reasons."""
+
+    def __init__(self, unsure=(), truncate_first=False):
+        super().__init__()
+        self.unsure = set(unsure)
+        self.truncate_first = truncate_first
+        self.requests = []
+
+    def answer(self, messages, model):
+        system, user = messages[0]["content"], messages[-1]["content"]
+        self.requests.append((system, user))
+        ids = [int(i) for i in re.findall(r"^\[(\d+)\]", user, re.MULTILINE)]
+        if user.startswith("EXPLAIN"):
+            payload = {"r": [[i, f"reason {i}"] for i in ids]}
+        else:
+            payload = {"r": [[i, "R", 0.75 if i in self.unsure else 0.95] for i in ids]}
+        content = json.dumps(payload)
+        if self.truncate_first and len(self.requests) == 1:
+            content = content[: content.rindex("[")]  # cut off inside the last entry
+        return content
+
+
+def test_compact_mode_explains_only_low_confidence():
+    client = CompactGroq(unsure={1})
+    stats = BatchRecoveryStats()
+    out = classify_batch_with_llm(make_pending(3, start=10), client, stats=stats, prompt_mode="compact")
+
+    assert [s for s, _ in client.requests] == [COMPACT_SYSTEM_PROMPT] * 2
+    classify, explain = (u for _, u in client.requests)
+    assert classify.startswith("CLASSIFY") and "Definitions" not in classify
+    assert explain.startswith("EXPLAIN") and explain.count("\n[") == 1 and "(requirement 0.75)" in explain
+
+    assert {r["label"] for r in out.values()} == {"requirement"}
+    assert out[11]["reasoning"] == "reason 0"
+    assert out[10]["reasoning"] == out[12]["reasoning"] == COMPACT_NO_REASONING
+    assert stats.reasoning_calls == 1
+
+
+def test_compact_mode_leaves_escalated_verdicts_to_the_large_model():
+    import asyncio
+
+    client = CompactGroq(unsure={1})
+    stats = BatchRecoveryStats()
+    out = asyncio.run(classifier.classify_batch_with_llm_async(
+        make_pending(3, start=10), client, stats=stats, prompt_mode="compact", escalate_below=0.9))
+
+    assert len(client.requests) == 1 and stats.reasoning_calls == 0     # no EXPLAIN request
+    assert out[11]["confidence"] == 0.75 and out[11]["reasoning"] == COMPACT_NO_REASONING
+
+
+def test_compact_mode_salvages_truncated_response():
+    client = CompactGroq(truncate_first=True)
+    stats = BatchRecoveryStats()
+    out = classify_batch_with_llm(make_pending(4, start=10), client, stats=stats, prompt_mode="compact")
+
+    assert sorted(out) == [10, 11, 12, 13]
+    assert stats.salvaged == 3 and stats.requeued == 1 and stats.reasoning_calls == 0
+
+
+def test_compact_prompt_is_smaller_and_packs_more():
+    chunks = [c for _, c in make_pending(20)]
+    full = classifier.approx_tokens(build_batch_classification_prompt(chunks))
+    compact = classifier.approx_tokens(build_compact_batch_prompt(chunks))
+    assert compact < full / 3
+
+    pending = make_pending(200)
+    assert (len(classifier.pack_batches(pending, max_input_tokens=2000, max_items=100, prompt_mode="compact"))
+            < len(classifier.pack_batches(pending, max_input_tokens=2000, max_items=100, prompt_mode="full")))
+
+
+def test_unknown_prompt_mode_is_rejected():
+    with pytest.raises(ValueError):
+        classifier.pack_batches(make_pending(2), prompt_mode="terse")
@@ -0,0 +1,101 @@
+"""
+test_provider_pool.py
+Least-loaded routing, failover, ejection and reinstatement across several
+fake OpenAI-compatible endpoints.
+"""
+
+import asyncio
+import json
+import time
+
+from groq import AsyncGroq
+
+import classifier
+import provider_pool
+from circuit_breaker import CLOSED, OPEN
+from classifier import classify_chunks_async
+from fake_llm_server import FakeLLMServer
+from provider_pool import AsyncProviderPool, ProviderConfig, ProviderPool, load_provider_configs, make_async_client
+
+DEAD_ENDPOINT = "http://127.0.0.1:9"     # nothing listens on the discard port
+
+
+def _config(base_url, **kwargs):
+    return ProviderConfig(api_key="test", base_url=base_url, rpm=10_000, tpm=None, **kwargs)
+
+
+def _ask(pool):
+    return pool.chat.completions.create(
+        model="m", messages=[{"role": "user", "content": "Write the scope section."}], timeout=5,
+    )
+
+
+def test_load_provider_configs(monkeypatch):
+    monkeypatch.delenv("LLM_PROVIDERS", raising=False)
+    assert [c.api_key for c in load_provider_configs("k1, k2,k3")] == ["k1", "k2", "k3"]
+    assert isinstance(make_async_client("k1"), AsyncGroq)
+    assert isinstance(make_async_client("k1,k2"), AsyncProviderPool)
+
+    monkeypatch.setenv("LLM_PROVIDERS", json.dumps([
+        {"api_key": "a", "base_url": "http://127.0.0.1:1", "rpm": 60, "name": "local"},
+        {"api_key": "gsk_secret", "tpm": None},
+    ]))
+    local, groq = load_provider_configs("ignored")
+    assert (local.label, local.rpm, groq.base_url, groq.tpm) == ("local", 60, None, None)
+    assert "secret" not in groq.label            # keys never appear in names
+    pool = make_async_client()
+    assert isinstance(pool, AsyncProviderPool) and pool.rpm == 60 + 30 and pool.tpm is None
+
+
+def test_pool_spreads_batches_and_ejects_dead_endpoint(monkeypatch):
+    monkeypatch.setattr(classifier, "BATCH_MAX_ITEMS", 5)
+    chunks = [{"cleaned_text": f"The new system feature must export report {i} to the portal.",
+               "speaker": "Alice", "source_ref": f"<{i}>"} for i in range(60)]
+    with FakeLLMServer(delay_s=0.02) as a, FakeLLMServer(delay_s=0.02) as b:
+        pool = AsyncProviderPool([_config(a.base_url), _config(b.base_url), _config(DEAD_ENDPOINT)])
+        lines = []
+        out = asyncio.run(classify_chunks_async(
+            chunks, api_key="test", log_fn=lines.append, use_cache=False, use_local_model=False,
+            client=pool,
+        ))
+
+    assert [c.label.value for c in out] == ["requirement"] * 60
+    assert a.requests > 0 and b.requests > 0
+    live, dead = pool.members[:2], pool.members[2]
+    assert dead.health.state == OPEN and dead.failures >= provider_pool.POOL_EJECT_AFTER   # + any already in flight
+    assert all(m.health.state == CLOSED for m in live)
+    assert any(line.startswith("  → Provider pool: 3 providers") for line in lines)
+
+
+def test_ejected_provider_is_reinstated_by_probe(monkeypatch):
+    monkeypatch.setattr(provider_pool, "POOL_REINSTATE_AFTER_S", 0.2)
+    with FakeLLMServer() as a, FakeLLMServer(fail_status=503) as b:
+        pool = ProviderPool([_config(a.base_url), _config(b.base_url)])
+        flaky = pool.members[1]
+        for _ in range(6):
+            assert _ask(pool).choices[0].message.content      # every call fails over to a
+        assert flaky.health.state == OPEN and b.requests == provider_pool.POOL_EJECT_AFTER
+
+        _ask(pool)
+        assert b.requests == provider_pool.POOL_EJECT_AFTER   # ejected: no traffic
+
+        b.fail_status = None
+        time.sleep(0.25)
+        _ask(pool)                                             # the probe goes to b
+        assert flaky.health.state == CLOSED and flaky.health.trips == 1
+        for _ in range(4):
+            _ask(pool)
+        assert b.requests >= provider_pool.POOL_EJECT_AFTER + 3
+        pool.close()
+
+
+def test_rate_limited_provider_is_skipped_not_ejected():
+    with FakeLLMServer() as a, FakeLLMServer(fail_status=429) as b:
+        pool = ProviderPool([_config(a.base_url), _config(b.base_url)])
+        for _ in range(4):
+            _ask(pool)
+        limited = pool.members[1]
+        assert limited.health.state == CLOSED and limited.rate_limited == 1
+        assert limited.scheduler("m").paused_for() > 0     # Retry-After honoured
+        assert b.requests == 1 and a.requests == 4
+        pool.close()
@@ -0,0 +1,77 @@
+"""
+test_rate_limiter.py
+"""
+
+from rate_limiter import RateLimitScheduler, TokenBucket, parse_reset_duration
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_parse_reset_duration():
+    assert parse_reset_duration("7") == 7.0
+    assert parse_reset_duration("7.66s") == 7.66
+    assert parse_reset_duration("120ms") == 0.12
+    assert abs(parse_reset_duration("2m59.56s") - 179.56) < 1e-9
+    assert parse_reset_duration("") is None
+    assert parse_reset_duration("soon") is None
+
+
+def test_bucket_paces_to_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(60, clock=clock)  # 1 per second, burst of 60
+    assert all(bucket.reserve(1) == 0.0 for _ in range(60))
+    assert bucket.reserve(1) == 1.0
+    assert bucket.reserve(1) == 2.0
+    clock.now += 2.0
+    assert bucket.reserve(1) == 1.0
+
+
+def test_scheduler_respects_token_budget():
+    clock = FakeClock()
+    sched = RateLimitScheduler(rpm=1000, tpm=6000, clock=clock, sleep=clock.sleep)
+    for _ in range(3):
+        sched.acquire(2000)
+        sched.record(2000, 2000)
+    assert clock.now == 0.0
+    sched.acquire(2000)  # bucket empty → wait for 2000 tokens at 100/s
+    assert clock.now == 20.0
+
+
+def test_scheduler_honours_retry_after_for_all_callers():
+    clock = FakeClock()
+    sched = RateLimitScheduler(rpm=1000, tpm=None, clock=clock, sleep=clock.sleep)
+    assert sched.penalize({"retry-after": "12"}) == 12.0
+    sched.acquire()
+    assert clock.now == 12.0
+
+    # Without Retry-After, wait for whichever budget the headers say is exhausted
+    wait = sched.penalize({
+        "x-ratelimit-remaining-requests": "5",
+        "x-ratelimit-reset-requests": "10m",
+        "x-ratelimit-remaining-tokens": "0",
+        "x-ratelimit-reset-tokens": "7.5s",
+    })
+    assert wait == 7.5
+
+
+def test_throughput_estimate():
+    clock = FakeClock()
+    sched = RateLimitScheduler(rpm=1000, tpm=None, clock=clock, sleep=clock.sleep)
+    for _ in range(10):
+        sched.acquire()
+        clock.now += 1.0
+        sched.record(500, 400)
+    tp = sched.throughput()
+    assert tp["completed"] == 10
+    assert tp["in_flight"] == 0
+    assert round(tp["requests_per_min"]) == 67  # 10 requests over a 9s span
+    assert round(tp["tokens_per_min"]) == 26667
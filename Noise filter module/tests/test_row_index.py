@@ -0,0 +1,53 @@
+"""
+test_row_index.py
+Byte-offset row index: the same rows as a full csv scan, for any offset,
+across scan-block boundaries, and rebuilt when the CSV changes.
+"""
+
+import csv
+
+import row_index
+from row_index import RowIndex, index_path
+
+from .test_enron_parser import _write_emails_csv
+
+
+def _all_rows(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def test_index_reads_same_rows_as_csv_scan(tmp_path, monkeypatch):
+    monkeypatch.setattr(row_index, "_SCAN_BLOCK_BYTES", 64)     # records and quotes span blocks
+    path = _write_emails_csv(tmp_path / "emails.csv")
+    rows = _all_rows(path)
+
+    index = RowIndex.open(path)
+    assert len(index) == len(rows) == 22 and index.columns == ["file", "message"]
+    assert index.rows() == rows
+    assert index.rows(5, 4) == rows[5:9]
+    assert index.rows(20, 10) == rows[20:] and index.rows(40, 5) == []
+    assert index.row(21) == rows[21]
+    picks = [rows.index(r) for r in index.sample(5, seed=1)]
+    assert len(set(picks)) == 5 and picks == sorted(picks)
+    data = path.read_bytes()
+    shards = index.shard_ranges(3)
+    assert len(shards) == 3 and shards[-1][1] == len(data)
+    assert all(data[start:start + 6] == b"inbox/" for start, _ in shards)
+
+
+def test_saved_index_is_reused_until_the_csv_changes(tmp_path, monkeypatch):
+    path = _write_emails_csv(tmp_path / "emails.csv")
+    RowIndex.open(path)
+    assert index_path(path).exists()
+
+    built = []
+    real_build = row_index.build_offsets
+    monkeypatch.setattr(row_index, "build_offsets", lambda p: built.append(p) or real_build(p))
+    assert len(RowIndex.open(path)) == 22 and built == []
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('inbox/z.,"Message-ID: <z>\n\nOne more, ""quoted"" row."\n')
+    index = RowIndex.open(path)
+    assert built == [path] and len(index) == 23
+    assert index.row(22)["message"] == 'Message-ID: <z>\n\nOne more, "quoted" row.'
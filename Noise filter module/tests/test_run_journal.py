@@ -0,0 +1,86 @@
+"""
+test_run_journal.py
+Per-run batch journal: interrupted runs resume without repeating journaled batches.
+"""
+
+import asyncio
+
+import pytest
+
+import classifier
+import run_journal
+from classifier import classify_chunks_async, iter_classified_async, resume_run
+from fake_llm_server import FakeLLMServer
+from run_journal import RunJournal
+from rate_limiter import RateLimitScheduler
+
+from .conftest import FakeAsyncGroq
+
+RUN_OPTS = dict(use_cache=False, near_dedup=False, use_local_model=False)
+
+
+@pytest.fixture(autouse=True)
+def journal_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(run_journal, "RUN_JOURNAL_DIR", tmp_path / "runs")
+    monkeypatch.setattr(classifier, "BATCH_MAX_ITEMS", 5)
+
+
+def _chunks(n):
+    return [{"cleaned_text": f"The new system feature must export report {i} to the portal.",
+             "speaker": "Alice", "source_ref": f"<{i}>"} for i in range(n)]
+
+
+def test_interrupted_run_resumes_only_missing_batches():
+    chunks = _chunks(30)
+    first = FakeAsyncGroq()
+
+    async def interrupted():
+        stream = iter_classified_async(
+            chunks, "test", log_fn=lambda line: None, client=first, max_in_flight=1,
+            scheduler=RateLimitScheduler(rpm=10_000, tpm=None), run_id="r1", **RUN_OPTS,
+        )
+        seen = 0
+        async for _ in stream:
+            seen += 1
+            if seen == 12:
+                break               # simulated crash after a couple of batches
+        await stream.aclose()
+
+    asyncio.run(interrupted())
+    journal = RunJournal.open("r1")
+    done, total = journal.progress()
+    assert total == 30 and 10 <= done < 30 and journal.status() == "running"
+    journal.close()
+
+    second = FakeAsyncGroq()
+    lines = []
+    out = asyncio.run(classify_chunks_async(
+        chunks, "test", log_fn=lines.append, client=second,
+        scheduler=RateLimitScheduler(rpm=10_000, tpm=None), run_id="r1", **RUN_OPTS,
+    ))
+    assert second.calls == (30 - done) // 5
+    assert [c.source_ref for c in out] == [c["source_ref"] for c in chunks]
+    assert all(c.label.value == "requirement" for c in out)
+    assert any("already classified" in line for line in lines)
+    journal = RunJournal.open("r1")
+    assert journal.progress() == (30, 30) and journal.status() == "complete"
+    journal.close()
+
+
+def test_resume_run_uses_journaled_inputs_and_settings(monkeypatch):
+    chunks = _chunks(10)
+    journal = RunJournal.create("r2", chunks, {"prompt_mode": "full", **RUN_OPTS})
+    journal.record_results({i: {"label": "decision", "confidence": 0.97, "reasoning": "journaled"}
+                            for i in range(5)})
+    journal.close()
+
+    with FakeLLMServer() as server:
+        monkeypatch.setenv("GROQ_BASE_URL", server.base_url)
+        out = resume_run("r2", "test", log_fn=lambda line: None)
+
+    assert server.requests == 1                 # one batch of the 5 missing chunks
+    assert [c.label.value for c in out] == ["decision"] * 5 + ["requirement"] * 5
+    with pytest.raises(ValueError):
+        RunJournal.create("r2", chunks[:3], {})
+    with pytest.raises(FileNotFoundError):
+        resume_run("no-such-run", "test")
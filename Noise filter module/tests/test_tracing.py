@@ -0,0 +1,108 @@
+"""
+test_tracing.py
+Span nesting across asyncio tasks and threads, the JSONL exporter, and the
+classifier's per-phase / per-batch spans.
+"""
+
+import asyncio
+import contextvars
+import threading
+
+import pytest
+from groq import AsyncGroq
+
+import classifier
+import tracing
+from fake_llm_server import FakeLLMServer
+from rate_limiter import RateLimitScheduler
+from tracing import configure_tracing, load_spans, span, summarize, to_chrome_trace, traced
+
+from .test_fake_llm_server import _chunks
+
+
+@pytest.fixture
+def trace_file(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    configure_tracing(path)
+    yield path
+    configure_tracing(None)
+
+
+def _by_name(spans):
+    out = {}
+    for s in spans:
+        out.setdefault(s["name"], []).append(s)
+    return out
+
+
+def test_spans_nest_across_tasks_and_threads(trace_file):
+    @traced("work.async")
+    async def child(i):
+        await asyncio.sleep(0.01)
+
+    def in_thread():
+        with span("work.thread"):
+            pass
+
+    with span("root", job="demo") as root:
+        async def both():
+            await asyncio.gather(child(1), child(2))
+        asyncio.run(both())
+        worker = threading.Thread(target=contextvars.copy_context().run, args=(in_thread,))
+        worker.start()
+        worker.join()
+        with pytest.raises(ValueError):
+            with span("work.failing"):
+                raise ValueError("boom")
+        root.add("items", 2)
+        root.add("items", 3)
+
+    spans = _by_name(load_spans(trace_file))
+    (root,) = spans["root"]
+    assert root["parent_span_id"] is None and root["attributes"]["items"] == 5
+    children = spans["work.async"] + spans["work.thread"] + spans["work.failing"]
+    assert len(children) == 4
+    assert all(s["trace_id"] == root["trace_id"] and s["parent_span_id"] == root["span_id"] for s in children)
+    assert spans["work.failing"][0]["status"] == {"code": "ERROR", "message": "ValueError: boom"}
+
+    events = [e for e in to_chrome_trace(load_spans(trace_file))["traceEvents"] if e["ph"] == "X"]
+    assert len({e["tid"] for e in events if e["name"] == "work.async"}) == 2    # concurrent → own lanes
+    assert summarize(load_spans(trace_file))[0].startswith(f"trace {root['trace_id'][:8]}  root")
+
+
+def test_disabled_tracing_writes_nothing(tmp_path):
+    configure_tracing(None)
+    with span("root") as s:
+        s.set(x=1)
+    assert not tracing.tracing_enabled() and not list(tmp_path.iterdir())
+
+
+def test_classifier_run_is_traced(monkeypatch, trace_file):
+    monkeypatch.setattr(classifier, "BATCH_MAX_ITEMS", 5)
+    chunks = _chunks(20)
+
+    async def run(server):
+        client = AsyncGroq(api_key="test", base_url=server.base_url, max_retries=0)
+        try:
+            return await classifier.classify_chunks_async(
+                chunks, api_key="test", log_fn=lambda line: None, use_cache=False, use_local_model=False,
+                near_dedup=False, client=client, scheduler=RateLimitScheduler(rpm=100_000, tpm=None),
+            )
+        finally:
+            await client.close()
+
+    with FakeLLMServer() as server:
+        with span("pipeline"):
+            asyncio.run(run(server))
+
+    spans = load_spans(trace_file)
+    assert len({s["trace_id"] for s in spans}) == 1
+    named = _by_name(spans)
+    ids = {s["span_id"]: s for s in spans}
+    (run_span,) = named["classify.run"]
+    assert ids[named["classify.heuristics"][0]["parent_span_id"]] is run_span
+    assert len(named["llm.batch"]) == server.requests == len(named["llm.request"])
+    for request in named["llm.request"]:
+        batch = ids[request["parent_span_id"]]
+        assert batch["name"] == "llm.batch"
+        assert request["attributes"]["total_tokens"] == 120 == batch["attributes"]["llm.total_tokens"]
@@ -0,0 +1,317 @@
+"""
+tracing.py
+Lightweight in-process tracing: nested, timed spans written as JSONL.
+Each record follows the OpenTelemetry span model (trace / span / parent ids,
+start and end in Unix nanoseconds, attributes, status), so a trace can be
+converted to OTLP, and `python tracing.py chrome` turns a trace file into
+Chrome trace-event JSON for a flame / timeline view in Perfetto
+(ui.perfetto.dev), chrome://tracing or speedscope.
+
+The current span lives in a contextvar, so asyncio tasks and threads started
+with contextvars.copy_context() nest under the span that launched them.
+With tracing off (TRACE_PATH unset) span() hands out a shared no-op span.
+
+Config (env overrides the defaults below):
+    TRACE_PATH      JSONL file to append spans to (unset → tracing off)
+
+Usage:
+    with span("brd.agent", section="timeline") as s:
+        ...
+        s.set(tokens=120)
+
+    @traced("parse.enron")
+    def parse_to_chunks(...): ...
+
+    python tracing.py summary traces.jsonl [trace_id]
+    python tracing.py chrome traces.jsonl trace.json [trace_id]
+"""
+
+from __future__ import annotations
+
+import atexit
+import contextlib
+import contextvars
+import functools
+import inspect
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Optional
+
+TRACE_PATH = os.getenv("TRACE_PATH")
+SERVICE_NAME = "aks-pipeline"
+SUMMARY_TOP_SPANS = 15
+
+_current: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("trace_span", default=None)
+_lock = threading.Lock()
+_exporter: Optional["_JsonlExporter"] = None
+_configured = False
+
+
+class Span:
+    """One timed operation; ended (and exported) when its `with span(...)` block exits."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "attributes", "start_ns", "_t0", "status", "error")
+
+    def __init__(self, name: str, parent: Optional["Span"], attributes: dict):
+        self.name = name
+        self.trace_id = parent.trace_id if parent is not None else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent is not None else None
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self._t0 = time.perf_counter_ns()
+        self.status = "OK"
+        self.error: Optional[str] = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def add(self, key: str, amount):
+        """Accumulate a numeric attribute (e.g. tokens over several requests)."""
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def _record(self) -> dict:
+        duration_ns = time.perf_counter_ns() - self._t0
+        thread = threading.current_thread()
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "name": self.name,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.start_ns + duration_ns,
+            "duration_ms": round(duration_ns / 1e6, 3),
+            "attributes": {**self.attributes, "process.pid": os.getpid(), "thread.name": thread.name},
+            "status": {"code": self.status, **({"message": self.error} if self.error else {})},
+            "resource": {"service.name": SERVICE_NAME},
+        }
+
+
+class _NoopSpan:
+    """Stands in for Span while tracing is off."""
+
+    def set(self, **attributes):
+        pass
+
+    def add(self, key: str, amount):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class _JsonlExporter:
+    """Appends finished spans to a JSONL file; flushed whenever a trace's root span ends."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self.path.open("a", encoding="utf-8")
+
+    def export(self, record: dict):
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with _lock:
+            if self._file.closed:       # a span ending during interpreter shutdown
+                return
+            self._file.write(line + "\n")
+            if record["parent_span_id"] is None:
+                self._file.flush()
+
+    def close(self):
+        with _lock:
+            self._file.close()
+
+
+def configure_tracing(path=None):
+    """Send spans to `path` (TRACE_PATH by default); None with TRACE_PATH unset turns tracing off."""
+    global _exporter, _configured
+    path = path or TRACE_PATH
+    with _lock:
+        old, _exporter, _configured = _exporter, None, True
+    if old is not None:
+        old.close()
+    if path:
+        exporter = _JsonlExporter(path)
+        with _lock:
+            _exporter = exporter
+
+
+def _active_exporter() -> Optional[_JsonlExporter]:
+    if not _configured:
+        configure_tracing()
+    return _exporter
+
+
+def tracing_enabled() -> bool:
+    return _active_exporter() is not None
+
+
+def current_span():
+    """The innermost open span in this context (a no-op span when there is none)."""
+    return _current.get() or _NOOP
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes):
+    """Time the block as a child of the current span (or as the root of a new trace)."""
+    exporter = _active_exporter()
+    if exporter is None:
+        yield _NOOP
+        return
+    parent = _current.get()
+    s = Span(name, parent, attributes)
+    token = _current.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        if not (isinstance(e, SystemExit) and e.code in (0, None)):
+            s.status, s.error = "ERROR", f"{type(e).__name__}: {e}"[:300]
+        raise
+    finally:
+        try:
+            _current.reset(token)
+        except ValueError:      # ended in another context (e.g. an async generator resumed elsewhere)
+            _current.set(parent)
+        exporter.export(s._record())
+
+
+def traced(name: Optional[str] = None, **attributes):
+    """Decorator: run each call of the function (sync or async) inside span(name)."""
+
+    def decorate(fn):
+        span_name = name or f"{fn.__module__}.{fn.__qualname__}"
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name, **attributes):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name, **attributes):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    return decorate
+
+
+@atexit.register
+def _close_exporter():
+    if _exporter is not None:
+        _exporter.close()
+
+
+# ---------------------------------------------------------------------------
+# Reading traces back
+# ---------------------------------------------------------------------------
+
+def load_spans(path, trace_id: Optional[str] = None) -> list[dict]:
+    """Span records from a JSONL trace file, optionally only one trace (id or id prefix)."""
+    spans = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if trace_id is None or record["trace_id"].startswith(trace_id):
+                spans.append(record)
+    return spans
+
+
+def self_times_ms(spans: list[dict]) -> dict[str, float]:
+    """span_id → duration minus the time covered by its children (concurrent children count once)."""
+    children = defaultdict(list)
+    for s in spans:
+        if s["parent_span_id"]:
+            children[s["parent_span_id"]].append((s["start_time_unix_nano"], s["end_time_unix_nano"]))
+    out = {}
+    for s in spans:
+        covered, cursor = 0, s["start_time_unix_nano"]
+        for start, end in sorted(children.get(s["span_id"], ())):
+            start, end = max(start, cursor), min(end, s["end_time_unix_nano"])
+            if end > start:
+                covered += end - start
+                cursor = end
+        out[s["span_id"]] = max(0, s["end_time_unix_nano"] - s["start_time_unix_nano"] - covered) / 1e6
+    return out
+
+
+def to_chrome_trace(spans: list[dict]) -> dict:
+    """
+    Chrome trace-event JSON: one complete ("X") event per span. Spans that
+    overlap without nesting (concurrent batches, parallel agents) are spread
+    over separate lanes, so every lane is a proper flame stack.
+    """
+    events = []
+    traces = defaultdict(list)
+    for s in spans:
+        traces[s["trace_id"]].append(s)
+    for pid, (trace_id, members) in enumerate(traces.items(), start=1):
+        root = next((s for s in members if not s["parent_span_id"]), members[0])
+        events.append({"ph": "M", "name": "process_name", "pid": pid, "tid": 0,
+                       "args": {"name": f"{root['name']} {trace_id[:8]}"}})
+        lanes: list[list[int]] = []         # per lane: end times of the open stack
+        for s in sorted(members, key=lambda s: (s["start_time_unix_nano"], -s["end_time_unix_nano"])):
+            start, end = s["start_time_unix_nano"], s["end_time_unix_nano"]
+            for tid, stack in enumerate(lanes):
+                while stack and stack[-1] <= start:
+                    stack.pop()
+                if not stack or stack[-1] >= end:
+                    stack.append(end)
+                    break
+            else:
+                lanes.append([end])
+                tid = len(lanes) - 1
+            events.append({"ph": "X", "name": s["name"], "cat": s["name"].split(".")[0], "pid": pid, "tid": tid,
+                           "ts": start / 1000, "dur": (end - start) / 1000,
+                           "args": {**s["attributes"], "status": s["status"]["code"]}})
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def summarize(spans: list[dict], top: int = SUMMARY_TOP_SPANS) -> list[str]:
+    """Per trace: the root span, then span names by total self time."""
+    lines = []
+    self_ms = self_times_ms(spans)
+    traces = defaultdict(list)
+    for s in spans:
+        traces[s["trace_id"]].append(s)
+    for trace_id, members in traces.items():
+        root = next((s for s in members if not s["parent_span_id"]), None)
+        title = f"{root['name']} {root['duration_ms']:.1f} ms" if root else "(root span missing)"
+        lines.append(f"trace {trace_id[:8]}  {title}  |  {len(members)} spans")
+        by_name = defaultdict(lambda: [0, 0.0, 0.0, 0])     # count, total ms, self ms, errors
+        for s in members:
+            row = by_name[s["name"]]
+            row[0] += 1
+            row[1] += s["duration_ms"]
+            row[2] += self_ms[s["span_id"]]
+            row[3] += s["status"]["code"] == "ERROR"
+        lines.append(f"  {'span':32s} {'count':>6s} {'total ms':>11s} {'self ms':>11s} {'errors':>6s}")
+        for name, (count, total, own, errors) in sorted(by_name.items(), key=lambda kv: -kv[1][2])[:top]:
+            lines.append(f"  {name:32s} {count:>6d} {total:>11.1f} {own:>11.1f} {errors:>6d}")
+    return lines
+
+
+def main():
+    args = sys.argv[1:]
+    if len(args) < 2 or args[0] not in ("summary", "chrome") or (args[0] == "chrome" and len(args) < 3):
+        print(__doc__)
+        sys.exit(1)
+    if args[0] == "summary":
+        spans = load_spans(args[1], args[2] if len(args) > 2 else None)
+        print("\n".join(summarize(spans)) if spans else "No spans found.")
+        return
+    spans = load_spans(args[1], args[3] if len(args) > 3 else None)
+    Path(args[2]).write_text(json.dumps(to_chrome_trace(spans)))
+    print(f"Wrote {len(spans)} spans to {args[2]}; open it in https://ui.perfetto.dev or chrome://tracing")
+
+
+if __name__ == "__main__":
+    main()
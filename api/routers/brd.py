@@ -8,12 +8,14 @@ import markdown
 
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.append(PROJECT_ROOT)
+sys.path.append(os.path.join(PROJECT_ROOT, "Noise filter module"))
 
 from brd_module.brd_pipeline import run_brd_generation
 from brd_module.validator import validate_brd
 from brd_module.exporter import export_brd, export_brd_to_docx
 from brd_module.storage import get_latest_brd_sections, store_brd_section, get_connection
 from brd_module.hitl.orchestrator import submit_ad_hoc_prompt
+from tracing import span
 
 router = APIRouter(
     prefix="/sessions/{session_id}/brd",
@@ -171,9 +173,10 @@ def generate_brd(session_id: str):
     try:
         # run_brd_generation is synchronous — it uses ThreadPoolExecutor internally
         # and only returns once all sections are stored.
-        snapshot_id = run_brd_generation(session_id)
-        # Validate immediately after generation completes
-        validate_brd(session_id)
+        with span("api.brd.generate", session_id=session_id):
+            snapshot_id = run_brd_generation(session_id)
+            # Validate immediately after generation completes
+            validate_brd(session_id)
         return {"message": "BRD generation and validation completed.", "snapshot_id": snapshot_id}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -2,21 +2,34 @@ import os
 import sys
 import csv
 import io
+import asyncio
+import contextlib
+from dataclasses import asdict
 from fastapi import APIRouter, HTTPException, BackgroundTasks, UploadFile, File, Form
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.append(PROJECT_ROOT)
 sys.path.append(os.path.join(PROJECT_ROOT, "Noise filter module"))
 
-from brd_module.storage import store_chunks
+from brd_module.storage import store_chunks, update_chunk_verdicts
 from storage import copy_session_chunks
-from classifier import classify_chunks
+from classifier import iter_classified_async, CascadeConfig, DEFAULT_CASCADE, is_degraded, requeue_when_closed
+from row_index import RowIndex
 
 # Session ID of the pre-classified 300-email Enron demo cache
 DEMO_CACHE_SESSION_ID = os.environ.get("DEMO_CACHE_SESSION_ID", "default_session")
 
+# Classified chunks are written in groups of this size while classification continues
+STORE_FLUSH_SIZE = 100
+
+# Strong references to running /demo pipelines (the event loop only keeps weak ones)
+_DEMO_RUNS: set = set()
+
+# Per-session LLM cascade settings (PUT /cascade); sessions without one use DEFAULT_CASCADE
+_SESSION_CASCADE: dict = {}
+
 router = APIRouter(
     prefix="/sessions/{session_id}/ingest",
     tags=["Ingestion"]
@@ -31,18 +44,66 @@ class RawDataChunk(BaseModel):
 class IngestRequest(BaseModel):
     chunks: List[RawDataChunk]
 
+class CascadeSettings(BaseModel):
+    enabled: Optional[bool] = None
+    small_model: Optional[str] = None
+    large_model: Optional[str] = None
+    escalate_below: Optional[float] = None
+
 def _load_api_key():
     from dotenv import load_dotenv
     load_dotenv(os.path.join(PROJECT_ROOT, "Noise filter module", ".env"))
     return os.environ.get("GROQ_CLOUD_API")
 
-def _process_and_store(sess_id: str, chunk_dicts: list):
-    """Core classify + store logic shared by both ingest endpoints."""
+async def _classify_and_store(sess_id: str, chunk_dicts: list, store_fn, log_fn=None, update_fn=None) -> int:
+    """
+    Stream classification results and write them in groups of STORE_FLUSH_SIZE,
+    so storage overlaps with the LLM calls still in flight. Returns the count stored.
+    Chunks classified while the Groq circuit breaker was open are re-classified
+    once it closes and rewritten with update_fn.
+    """
     api_key = _load_api_key()
-    classified = classify_chunks(chunk_dicts, api_key=api_key)
-    for c in classified:
-        c.session_id = sess_id
-    store_chunks(classified)
+    cascade = _SESSION_CASCADE.get(sess_id)
+    group, stored, degraded = [], 0, []
+    stream = iter_classified_async(chunk_dicts, api_key=api_key, log_fn=log_fn, cascade=cascade)
+    async with contextlib.aclosing(stream):
+        async for c in stream:
+            c.session_id = sess_id
+            if is_degraded(c):
+                degraded.append(c)
+            group.append(c)
+            if len(group) >= STORE_FLUSH_SIZE:
+                await asyncio.to_thread(store_fn, group)
+                stored += len(group)
+                group = []
+    if group:
+        await asyncio.to_thread(store_fn, group)
+        stored += len(group)
+    if degraded and update_fn is not None:
+        requeue_when_closed(degraded, api_key, update_fn, cascade=cascade)
+    return stored
+
+async def _process_and_store(sess_id: str, chunk_dicts: list):
+    """Core classify + store logic for the /data endpoint."""
+    await _classify_and_store(sess_id, chunk_dicts, store_chunks, update_fn=update_chunk_verdicts)
+
+@router.get("/cascade")
+def get_cascade(session_id: str):
+    """Small/large model cascade used when classifying this session's chunks."""
+    return asdict(_SESSION_CASCADE.get(session_id, DEFAULT_CASCADE))
+
+@router.put("/cascade")
+def set_cascade(session_id: str, settings: CascadeSettings):
+    """
+    Override the LLM cascade for this session. Unset fields keep their current
+    value; enabled=false sends every batch straight to the large model.
+    """
+    if settings.escalate_below is not None and not 0.0 <= settings.escalate_below <= 1.0:
+        raise HTTPException(status_code=422, detail="escalate_below must be between 0 and 1")
+    current = asdict(_SESSION_CASCADE.get(session_id, DEFAULT_CASCADE))
+    updates = {k: v for k, v in settings.model_dump().items() if v is not None}
+    _SESSION_CASCADE[session_id] = CascadeConfig(**{**current, **updates})
+    return asdict(_SESSION_CASCADE[session_id])
 
 @router.post("/data")
 def ingest_data(session_id: str, request: IngestRequest, background_tasks: BackgroundTasks):
@@ -95,15 +156,14 @@ async def upload_file(
 
 
 @router.post("/demo")
-async def ingest_demo_dataset(session_id: str, limit: int = 80):
+async def ingest_demo_dataset(session_id: str, limit: int = 80, offset: int = 0):
     """
     Streaming: returns text/plain lines live via StreamingResponse.
     Watch with:  curl -N -X POST <url>
+    ?offset=&limit= pages through emails.csv: rows are read by seeking
+    through its byte-offset index (row_index.py), built on first use.
     """
-    import csv as _csv
     import re as _re
-    import queue as _queue
-    import threading as _threading
     from fastapi.responses import StreamingResponse
 
     emails_path = os.path.join(
@@ -111,6 +171,8 @@ async def ingest_demo_dataset(session_id: str, limit: int = 80):
     )
     if not os.path.exists(emails_path):
         raise HTTPException(status_code=404, detail=f"Demo dataset not found at: {emails_path}")
+    if offset < 0 or limit < 0:
+        raise HTTPException(status_code=422, detail="offset and limit must not be negative")
 
     def _parse_email(raw: str):
         sender, subject, body_lines, in_body = "Unknown", "", [], False
@@ -124,62 +186,71 @@ async def ingest_demo_dataset(session_id: str, limit: int = 80):
         body = _re.sub(r"\s+", " ", " ".join(body_lines).strip())
         return sender, subject, body
 
-    log_q: _queue.Queue = _queue.Queue()
+    loop = asyncio.get_running_loop()
+    log_q: asyncio.Queue = asyncio.Queue()
     DONE = object()
 
-    def run_pipeline():
-        def log(msg): log_q.put(msg + "\n")
+    def log(msg):
+        # Safe from worker threads (CSV parsing) as well as from the loop itself
+        loop.call_soon_threadsafe(log_q.put_nowait, msg + "\n")
 
-        log(f"[DEMO INGEST] ▶  Reading up to {limit} emails from Enron dataset...")
+    def parse_rows():
         chunk_dicts = []
+        index = RowIndex.open(emails_path)
+        rows = index.rows(offset, limit)
+        if not rows:
+            log(f"[DEMO INGEST]   No rows at offset {offset} ({len(index)} rows in the dataset)")
+            return None
+        log(f"[DEMO INGEST]   Rows {offset}–{offset + len(rows) - 1} of {len(index)}")
+        for j, row in enumerate(rows):
+            i = offset + j
+            sender, subject, body = _parse_email(row.get("message") or "")
+            text = f"{subject} {body}".strip() if subject else body
+            if len(text) < 20: continue
+            chunk_dicts.append({
+                "cleaned_text": text[:1500],
+                "source_ref": row.get("file") or f"enron:row{i}",
+                "speaker": sender,
+                "source_type": "email",
+            })
+            if (j + 1) % 50 == 0:
+                log(f"[DEMO INGEST]   Parsed {j+1}/{len(rows)} rows — {len(chunk_dicts)} valid chunks so far")
+        return chunk_dicts
+
+    async def run_pipeline():
+        log(f"[DEMO INGEST] ▶  Reading up to {limit} emails from Enron dataset (from row {offset})...")
         try:
-            with open(emails_path, "r", encoding="utf-8", errors="ignore") as f:
-                reader = _csv.DictReader(f)
-                for i, row in enumerate(reader):
-                    if i >= limit: break
-                    sender, subject, body = _parse_email(row.get("message", ""))
-                    text = f"{subject} {body}".strip() if subject else body
-                    if len(text) < 20: continue
-                    chunk_dicts.append({
-                        "cleaned_text": text[:1500],
-                        "source_ref": row.get("file", f"enron:row{i}"),
-                        "speaker": sender,
-                        "source_type": "email",
-                    })
-                    if (i + 1) % 50 == 0:
-                        log(f"[DEMO INGEST]   Parsed {i+1}/{limit} rows — {len(chunk_dicts)} valid chunks so far")
+            chunk_dicts = await asyncio.to_thread(parse_rows)
         except Exception as e:
             log(f"[DEMO INGEST] ❌ Parse error: {e}")
-            log_q.put(DONE); return
+            return
+        if chunk_dicts is None:
+            log("[DEMO INGEST] ✔  Nothing to ingest on this page."); return
 
         log(f"[DEMO INGEST] ✔  Parsed {len(chunk_dicts)} chunks — starting classification...")
         log(f"[DEMO INGEST]    Heuristic filter → Domain gate → Groq LLM (Llama 4 Maverick)")
         log(f"[DEMO INGEST] {'─'*60}")
 
         if not chunk_dicts:
-            log("[DEMO INGEST] ❌ No usable email bodies found."); log_q.put(DONE); return
+            log("[DEMO INGEST] ❌ No usable email bodies found."); return
 
         try:
-            api_key = _load_api_key()
-            classified = classify_chunks(chunk_dicts, api_key=api_key, log_fn=log)
-            for c in classified:
-                c.session_id = session_id
-            from storage import store_chunks as _store
-            _store(classified)
+            from storage import store_chunks as _store, update_chunk_verdicts as _update
+            stored = await _classify_and_store(session_id, chunk_dicts, _store, log_fn=log, update_fn=_update)
             log(f"[DEMO INGEST] {'─'*60}")
-            log(f"[DEMO INGEST] ✅ Complete! {len(classified)} chunks stored for session '{session_id}'.")
+            log(f"[DEMO INGEST] ✅ Complete! {stored} chunks stored for session '{session_id}'.")
         except Exception as e:
             log(f"[DEMO INGEST] ❌ Classification error: {e}")
 
-        log_q.put(DONE)
-
-    _threading.Thread(target=run_pipeline, daemon=True).start()
+    # Keeps running (and seeding the demo cache) even if the client disconnects
+    pipeline = asyncio.create_task(run_pipeline())
+    _DEMO_RUNS.add(pipeline)
+    pipeline.add_done_callback(_DEMO_RUNS.discard)
+    pipeline.add_done_callback(lambda _: log_q.put_nowait(DONE))
 
     async def stream():
-        import asyncio
-        loop = asyncio.get_event_loop()
         while True:
-            item = await loop.run_in_executor(None, log_q.get)
+            item = await log_q.get()
             if item is DONE:
                 break
             yield item
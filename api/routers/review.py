@@ -4,6 +4,7 @@ from fastapi import APIRouter, HTTPException
 
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.append(PROJECT_ROOT)
+sys.path.append(os.path.join(PROJECT_ROOT, "Noise filter module"))
 
 from brd_module.storage import get_noise_items, get_active_signals, restore_noise_item
 
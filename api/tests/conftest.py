@@ -0,0 +1,28 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                             "Noise filter module"))
+
+import decision_log
+import local_model
+
+
+@pytest.fixture(autouse=True, scope="session")
+def decision_log_in_tmp(tmp_path_factory):
+    """Ingestion logs every classification decision; keep pipeline_decisions.jsonl out of the repo."""
+    decision_log.flush_decision_log()
+    decision_log.DECISION_LOG_PATH = str(tmp_path_factory.mktemp("decisions") / "pipeline_decisions.jsonl")
+    decision_log._config = {}
+    yield
+    decision_log.flush_decision_log()
+
+
+@pytest.fixture(autouse=True, scope="session")
+def no_local_model(tmp_path_factory):
+    """Ingestion uses the local model by default; a retrained artifact in models/ must not change results."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(local_model, "MODEL_DIR", tmp_path_factory.mktemp("models"))
+        yield
@@ -60,3 +60,30 @@ def test_edit_brd_section():
     response = client.put("/sessions/test-session-123/brd/sections/executive_summary", json=payload)
     assert response.status_code == 200
     assert "updated successfully by human" in response.json()["message"]
+
+def test_session_cascade_settings():
+    default = client.get("/sessions/cascade-session/ingest/cascade").json()
+    assert default["enabled"] is True
+
+    response = client.put("/sessions/cascade-session/ingest/cascade", json={"escalate_below": 0.7})
+    assert response.status_code == 200
+    assert response.json()["escalate_below"] == 0.7
+    assert response.json()["small_model"] == default["small_model"]
+
+    off = client.put("/sessions/cascade-session/ingest/cascade", json={"enabled": False}).json()
+    assert off["enabled"] is False and off["escalate_below"] == 0.7
+    assert client.get("/sessions/other-session/ingest/cascade").json() == default
+    assert client.put("/sessions/cascade-session/ingest/cascade",
+                      json={"escalate_below": 1.5}).status_code == 422
+
+def test_demo_ingest_past_the_last_row(tmp_path, monkeypatch):
+    from api.routers import ingest
+    dataset = tmp_path / "Noise filter module" / "emails.csv"
+    dataset.parent.mkdir()
+    dataset.write_text('file,message\ninbox/1,"Subject: Hi\n\nThe portal must export reports."\n')
+    monkeypatch.setattr(ingest, "PROJECT_ROOT", str(tmp_path))
+
+    response = client.post("/sessions/demo-session/ingest/demo?offset=5")
+    assert response.status_code == 200
+    assert "No rows at offset 5 (1 rows in the dataset)" in response.text
+    assert "Rows 5–4" not in response.text and "Nothing to ingest" in response.text
@@ -0,0 +1,53 @@
+"""
+bench_enron_parse_workers.py
+Wall time of Enron CSV parsing (MIME parse, thread flattening, boilerplate
+stripping) serial vs. sharded by byte range across worker processes, on a
+seeded synthetic emails.csv (synthetic_corpus.py).
+
+Usage:
+    python benchmarks/bench_enron_parse_workers.py [n_rows] [workers ...]
+    python benchmarks/bench_enron_parse_workers.py 200000 1 2 4 8
+"""
+
+from __future__ import annotations
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(_ROOT / "Noise filter module"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import enron_parser  # noqa: E402
+from synthetic_corpus import write_enron_csv  # noqa: E402
+
+SHARD_BYTES = 8 * 1024 * 1024
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    worker_counts = [int(w) for w in sys.argv[2:]] or [1, 2, 4]
+    enron_parser.MIN_BYTES_FOR_PROCESS_POOL = 0
+
+    with tempfile.TemporaryDirectory(prefix="bench_enron_") as tmp:
+        csv_path = write_enron_csv(Path(tmp) / "emails.csv", n_rows)
+        size_mb = csv_path.stat().st_size / 1e6
+        shards = len(enron_parser.shard_ranges(csv_path, SHARD_BYTES))
+        print(f"Parsing {n_rows} emails ({size_mb:.0f} MB, {shards} shards of {SHARD_BYTES >> 20} MB)")
+
+        baseline = reference = None
+        for workers in worker_counts:
+            t0 = time.perf_counter()
+            chunks = list(enron_parser.iter_chunks(csv_path, workers=workers, shard_bytes=SHARD_BYTES))
+            elapsed = time.perf_counter() - t0
+            baseline = baseline or elapsed
+            reference = reference or chunks
+            print(f"  workers={workers:<3} {elapsed:7.2f}s  {size_mb / elapsed:7.1f} MB/s  "
+                  f"{n_rows / elapsed:9.0f} emails/s  ({baseline / elapsed:.2f}x)  "
+                  f"chunks={len(chunks)}{'' if chunks == reference else '  MISMATCH'}")
+
+
+if __name__ == "__main__":
+    main()
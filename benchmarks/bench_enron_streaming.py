@@ -0,0 +1,84 @@
+"""
+bench_enron_streaming.py
+Peak RSS and wall time of reading an Enron-style CSV, by row count:
+  dataframe — the previous parse_to_chunks: load_emails() + deduplicate()
+              (the whole CSV, then a second DataFrame of parsed messages),
+              then every chunk in one list
+  stream    — iter_chunks(): windows of ITER_BATCH_ROWS rows, chunks
+              consumed as they are yielded
+Each measurement runs in a fresh process, so peak RSS is the reader's own.
+Corpora come from synthetic_corpus.py (seeded).
+
+Usage:
+    python benchmarks/bench_enron_streaming.py [n_rows ...]
+    python benchmarks/bench_enron_streaming.py 10000 50000 200000
+"""
+
+from __future__ import annotations
+
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(_ROOT / "Noise filter module"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+MODES = ("dataframe", "stream")
+
+
+def _peak_rss_mb() -> float:
+    scale = 1 / 1024 if sys.platform != "darwin" else 1 / 1024 / 1024   # ru_maxrss: KB on Linux, bytes on macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def _child(mode: str, csv_path: str):
+    """Read the CSV one way and print {"chunks", "seconds", "peak_rss_mb"} as JSON."""
+    import enron_parser
+
+    baseline = _peak_rss_mb()
+    t0 = time.perf_counter()
+    if mode == "dataframe":
+        # The pre-streaming parse_to_chunks: every row and every chunk in memory at once
+        df = enron_parser.deduplicate(enron_parser.load_emails(csv_path))
+        fields = [df[f] for f in ("Message-ID", "From", "X-From", "Subject", "body")]
+        chunks = [c for i, row in enumerate(zip(*fields)) for c in enron_parser._row_chunks(*row, i)]
+        n_chunks = len(chunks)
+    else:
+        n_chunks = sum(1 for _ in enron_parser.iter_chunks(csv_path))
+    print(json.dumps({"chunks": n_chunks, "seconds": time.perf_counter() - t0,
+                      "peak_rss_mb": _peak_rss_mb(), "import_rss_mb": baseline}))
+
+
+def _measure(mode: str, csv_path: Path) -> dict:
+    out = subprocess.run([sys.executable, __file__, "--child", mode, str(csv_path)],
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    if sys.argv[1:2] == ["--child"]:
+        _child(sys.argv[2], sys.argv[3])
+        return
+    from synthetic_corpus import write_enron_csv
+
+    row_counts = [int(n) for n in sys.argv[1:]] or [5_000, 20_000, 80_000]
+    print(f"{'rows':>9s} {'CSV MB':>8s}   " + "   ".join(f"{m + ' RSS MB':>16s} {'s':>6s}" for m in MODES))
+    with tempfile.TemporaryDirectory(prefix="bench_enron_") as tmp:
+        for n in row_counts:
+            csv_path = write_enron_csv(Path(tmp) / f"emails_{n}.csv", n)
+            results = {mode: _measure(mode, csv_path) for mode in MODES}
+            assert results["dataframe"]["chunks"] == results["stream"]["chunks"]
+            print(f"{n:>9d} {csv_path.stat().st_size / 1e6:>8.1f}   "
+                  + "   ".join(f"{results[m]['peak_rss_mb']:>16.1f} {results[m]['seconds']:>6.2f}" for m in MODES))
+            csv_path.unlink()
+    print("(RSS includes the interpreter and imports: about "
+          f"{results['stream']['import_rss_mb']:.0f} MB before reading)")
+
+
+if __name__ == "__main__":
+    main()
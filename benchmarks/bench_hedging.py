@@ -0,0 +1,82 @@
+"""
+bench_hedging.py
+Tail latency of Phase 2 LLM requests with and without hedging, against the
+local fake LLM server (fake_llm_server.py) with injected delays: every
+request takes delay_s, except a seeded `slow_fraction` that hangs for
+slow_delay_s. Prints a latency histogram per mode as seen by the caller
+(one sample per batch), plus the requests the server actually received.
+
+Usage:
+    python benchmarks/bench_hedging.py [n_batches] [slow_fraction] [slow_delay_s]
+    python benchmarks/bench_hedging.py 300 0.05 2
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(_ROOT / "Noise filter module"))
+
+import classifier as C  # noqa: E402
+import hedging  # noqa: E402
+from fake_llm_server import FakeLLMServer  # noqa: E402
+from groq import AsyncGroq  # noqa: E402
+from hedging import LatencyTracker  # noqa: E402
+from rate_limiter import RateLimitScheduler  # noqa: E402
+
+DELAY_S = 0.05
+IN_FLIGHT = 4
+
+
+async def run_batches(base_url: str, n_batches: int) -> LatencyTracker:
+    client = AsyncGroq(api_key="bench", base_url=base_url, max_retries=0)
+    scheduler = RateLimitScheduler(rpm=100_000, tpm=None)
+    observed = LatencyTracker()
+    slots = asyncio.Semaphore(IN_FLIGHT)
+
+    async def one(i: int):
+        batch = [(i, {"cleaned_text": f"The portal must export report {i} nightly.", "speaker": "bench",
+                      "source_ref": f"<{i}>"})]
+        async with slots:
+            t0 = time.perf_counter()
+            await C.classify_batch_with_llm_async(batch, client, scheduler)
+            observed.record(time.perf_counter() - t0)
+
+    try:
+        await asyncio.gather(*(one(i) for i in range(n_batches)))
+    finally:
+        await client.close()
+    return observed
+
+
+def report(name: str, observed: LatencyTracker, server: FakeLLMServer, elapsed: float):
+    print(f"{name}: {observed.calls} batches in {elapsed:.1f}s, {server.requests} requests sent")
+    print(f"  {observed.summary().rsplit('  |  hedged', 1)[0]}")
+    print("  " + "  ".join(f"{bucket} {count}" for bucket, count in observed.histogram().items() if count))
+
+
+def main():
+    n_batches = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    slow_fraction = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+    slow_delay_s = float(sys.argv[3]) if len(sys.argv) > 3 else 2.0
+    print(f"fake server: {DELAY_S * 1000:.0f} ms per request, {slow_fraction:.0%} hang for {slow_delay_s}s; "
+          f"{IN_FLIGHT} batches in flight\n")
+
+    for name, hedge in (("before (no hedging)", False), ("after (hedged at p95)", True)):
+        C.HEDGE_REQUESTS = hedge
+        hedging._TRACKERS.clear()
+        with FakeLLMServer(delay_s=DELAY_S, slow_fraction=slow_fraction, slow_delay_s=slow_delay_s) as server:
+            t0 = time.perf_counter()
+            observed = asyncio.run(run_batches(server.base_url, n_batches))
+            report(name, observed, server, time.perf_counter() - t0)
+        if hedge:
+            print(f"  hedges fired: {C.get_latency_tracker(C.MODEL_NAME).hedged}, "
+                  f"won: {C.get_latency_tracker(C.MODEL_NAME).hedge_wins}")
+
+
+if __name__ == "__main__":
+    main()
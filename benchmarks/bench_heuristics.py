@@ -0,0 +1,118 @@
+"""
+bench_heuristics.py
+Label parity and throughput of the compiled heuristic engine against the
+original rule-by-rule implementation of apply_heuristics.
+
+Usage:
+    python benchmarks/bench_heuristics.py [repeat]
+"""
+
+from __future__ import annotations
+
+import csv
+import re
+import sys
+import time
+from pathlib import Path
+
+_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(_ROOT / "Noise filter module"))
+
+import classifier as C  # noqa: E402
+
+# Inputs from tests/test_heuristics.py
+TEST_CHUNKS = [
+    {"cleaned_text": "Hi Bob", "speaker": "Alice"},
+    {"cleaned_text": "Sounds good thanks", "speaker": "Alice"},
+    {"cleaned_text": "👍", "speaker": "Alice"},
+    {"cleaned_text": "Out of Office: I am away until Monday.", "speaker": "Alice"},
+    {"cleaned_text": "You have been invited to a meeting for the phase 1 go-live", "speaker": "Calendar"},
+    {"cleaned_text": "We need to finalize the API spec soon.", "speaker": "Alice"},
+    {"cleaned_text": "The deadl\u0130ne for the vendor contract is Friday afternoon at noon.", "speaker": "Alice"},
+]
+
+
+def reference_apply_heuristics(chunk: dict):
+    """The pre-engine implementation: one regex scan per rule, in decision order."""
+    text = chunk.get("cleaned_text", "")
+    speaker = chunk.get("speaker", "")
+    word_count = len(text.split())
+
+    if C._SYSTEM_MAIL_PATTERNS.search(text) or C._SYSTEM_MAIL_PATTERNS.search(speaker):
+        return "noise"
+    if C._CROSSTALK.search(text):
+        return "noise"
+    if word_count < 10 and C._SOCIAL_NOISE.match(text.strip()):
+        return "noise"
+    if C._MEETING_LOGISTICS.search(text):
+        if word_count < 30:
+            if not C._PROJECT_TIMELINE.search(text):
+                return "noise"
+    if C._STRICT_MEETING.search(text):
+        if not C._PROJECT_TIMELINE.search(text):
+            return "noise"
+    if C._WEAK_MEETING.search(text):
+        if word_count < 50:
+            if not C._PROJECT_TIMELINE.search(text):
+                return "noise"
+    if word_count < C._MIN_WORD_COUNT:
+        return "noise"
+    if C._PROJECT_TIMELINE.search(text):
+        return "timeline_reference"
+    return None
+
+
+def load_ami_turns() -> list[dict]:
+    """Split the bundled AMI dialogues into speaker turns (chunk-sized texts)."""
+    chunks = []
+    for name in ("test.csv", "validation.csv"):
+        path = _ROOT / "amimeeting" / name
+        if not path.exists():
+            continue
+        with open(path, encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                for turn in re.split(r"Speaker ([A-Z]):", row.get("dialogue", ""))[2::2]:
+                    for sentence_group in re.split(r"(?<=[.?!])\s+(?=[A-Z])", turn.strip()):
+                        if sentence_group:
+                            chunks.append({"cleaned_text": sentence_group, "speaker": "Speaker"})
+    return chunks
+
+
+def _time(fn, chunks: list[dict], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for c in chunks:
+            fn(c)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    turns = load_ami_turns()
+    corpora = {
+        "test_heuristics inputs": TEST_CHUNKS * 2000,
+        "AMI turns": turns,
+        # Eight consecutive turns ≈ the length of a typical Enron email body
+        "AMI turns, email-length": [
+            {"cleaned_text": " ".join(c["cleaned_text"] for c in turns[i:i + 8]), "speaker": "Speaker"}
+            for i in range(0, len(turns), 8)
+        ],
+    }
+
+    for name, chunks in corpora.items():
+        mismatches = [
+            c for c in chunks
+            if C.apply_heuristics(c) != reference_apply_heuristics(c)
+        ]
+        ref = _time(reference_apply_heuristics, chunks, repeat)
+        new = _time(C.apply_heuristics, chunks, repeat)
+        print(f"{name}: {len(chunks)} chunks")
+        print(f"  label mismatches:  {len(mismatches)}")
+        print(f"  reference:         {ref * 1e6 / len(chunks):8.2f} µs/chunk")
+        print(f"  compiled engine:   {new * 1e6 / len(chunks):8.2f} µs/chunk  ({ref / new:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+bench_parse_cache.py
+Cold parse vs warm start of enron_parser.parse_to_chunks, by row count:
+  cold — parse the CSV and write the Arrow cache (parse_cache.py)
+  warm — memory-map the cache written by the cold run
+Each run is a fresh process, so the warm number includes opening the cache
+but nothing left over from parsing. Corpora come from synthetic_corpus.py.
+
+Usage:
+    python benchmarks/bench_parse_cache.py [n_rows ...]
+"""
+
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(_ROOT / "Noise filter module"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+
+def _child(csv_path: str):
+    """Parse (or load) the CSV once and print {"chunks", "seconds"} as JSON."""
+    import enron_parser
+
+    t0 = time.perf_counter()
+    chunks = enron_parser.parse_to_chunks(csv_path)
+    print(json.dumps({"chunks": len(chunks), "seconds": time.perf_counter() - t0}))
+
+
+def _run(csv_path: Path) -> dict:
+    out = subprocess.run([sys.executable, __file__, "--child", str(csv_path)],
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    if sys.argv[1:2] == ["--child"]:
+        _child(sys.argv[2])
+        return
+    import parse_cache
+    from synthetic_corpus import write_enron_csv
+
+    if not parse_cache.PYARROW_AVAILABLE:
+        print("ERROR: pyarrow is not installed (pip install pyarrow)")
+        sys.exit(1)
+    row_counts = [int(n) for n in sys.argv[1:]] or [5_000, 20_000, 80_000]
+    print(f"{'rows':>9s} {'CSV MB':>8s} {'cache MB':>9s} {'chunks':>8s} {'cold s':>8s} {'warm s':>8s} {'speedup':>8s}")
+    with tempfile.TemporaryDirectory(prefix="bench_cache_") as tmp:
+        for n in row_counts:
+            csv_path = write_enron_csv(Path(tmp) / f"emails_{n}.csv", n)
+            cold, warm = _run(csv_path), _run(csv_path)
+            assert cold["chunks"] == warm["chunks"]
+            cache_mb = sum(p.stat().st_size for p in (Path(tmp) / parse_cache.CACHE_DIR_NAME).glob(f"enron-{csv_path.stem}-*")) / 1e6
+            print(f"{n:>9d} {csv_path.stat().st_size / 1e6:>8.1f} {cache_mb:>9.1f} {cold['chunks']:>8d} "
+                  f"{cold['seconds']:>8.2f} {warm['seconds']:>8.2f} {cold['seconds'] / warm['seconds']:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
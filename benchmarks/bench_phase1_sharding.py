@@ -0,0 +1,45 @@
+"""
+bench_phase1_sharding.py
+Wall time of Phase 1 (heuristics + domain gate) serial vs. sharded across
+worker processes, on the bundled AMI turns replicated to corpus scale.
+
+Usage:
+    python benchmarks/bench_phase1_sharding.py [n_chunks] [workers ...]
+    python benchmarks/bench_phase1_sharding.py 200000 1 2 4 8
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+
+_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(_ROOT / "Noise filter module"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import classifier as C  # noqa: E402
+from bench_heuristics import load_ami_turns  # noqa: E402
+
+
+def main():
+    n_chunks = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    worker_counts = [int(w) for w in sys.argv[2:]] or [1, 2, 4]
+
+    turns = load_ami_turns()
+    chunks = (turns * (n_chunks // len(turns) + 1))[:n_chunks]
+    print(f"Phase 1 on {len(chunks)} chunks (shard size {C.HEURISTIC_SHARD_SIZE})")
+
+    baseline = None
+    for workers in worker_counts:
+        t0 = time.perf_counter()
+        fast, pending = C.run_parallel_heuristics(chunks, workers=workers)
+        elapsed = time.perf_counter() - t0
+        baseline = baseline or elapsed
+        print(f"  workers={workers:<3} {elapsed:7.2f}s  "
+              f"{len(chunks) / elapsed:9.0f} chunks/s  ({baseline / elapsed:.2f}x)  "
+              f"fast={len(fast)} pending={len(pending)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""
+bench_pipeline.py
+End-to-end throughput of the whole pipeline on a synthetic corpus
+(synthetic_corpus.py): parse → heuristics → classification → storage →
+BRD generation → export. Every LLM call is answered by the local fake
+server (fake_llm_server.py, hashed labels, seeded latency) and storage is a
+fresh SQLite AKS, so a run needs no account, no network and no database
+server, and repeats with the same numbers within noise.
+
+Reports, per stage: items, seconds, items/s, p50/p95 latency and the
+process's peak RSS so far, plus the AKS size on disk — as JSON, tagged
+with the git commit, so runs on two commits can be compared (--compare).
+Latency samples per stage: classification — per chunk, run start to
+verdict (as streamed); storage — per STORE_BATCH insert; BRD generation —
+per LLM call. Parse, heuristics and export are single calls (export
+counts bytes of Markdown as its items). The
+classification stage is the full classifier run (Phase 1 included, as in
+production); the heuristics stage isolates Phase 1.
+
+Usage:
+    python benchmarks/bench_pipeline.py [enron|ami] [n_messages] [--out report.json]
+                                        [--delay S] [--in-flight N] [--workers N] [--seed N]
+    python benchmarks/bench_pipeline.py enron 100000 --out before.json
+    python benchmarks/bench_pipeline.py --compare before.json after.json
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(_ROOT / "Noise filter module"))
+sys.path.insert(0, str(_ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import ami_parser  # noqa: E402
+import classifier as C  # noqa: E402
+import enron_parser  # noqa: E402
+from brd_module import brd_pipeline, exporter  # noqa: E402
+from brd_module import storage as aks  # noqa: E402
+from fake_llm_server import FakeLLMServer  # noqa: E402
+from groq import AsyncGroq, Groq  # noqa: E402
+import hedging  # noqa: E402
+from rate_limiter import RateLimitScheduler  # noqa: E402
+from synthetic_corpus import write_ami_json, write_enron_csv  # noqa: E402
+from tracing import span  # noqa: E402
+
+STORE_BATCH = 1_000
+DELAY_S = 0.05              # fake provider latency (median)
+JITTER = 0.3                # lognormal spread around it
+SESSION_ID = "bench-pipeline"
+
+
+def _percentile(samples: list[float], p: float):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size of this process and its (Phase 1 worker) children, in MB."""
+    scale = 1 / 1024 if sys.platform != "darwin" else 1 / 1024 / 1024   # ru_maxrss: KB on Linux, bytes on macOS
+    return round((resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                  + resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss) * scale, 1)
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class _Stages:
+    """Collects one row per stage."""
+
+    def __init__(self):
+        self.rows: list[dict] = []
+
+    def add(self, name: str, items: int, seconds: float, latencies_s: list[float] = ()):
+        p50, p95 = _percentile(list(latencies_s), 50), _percentile(list(latencies_s), 95)
+        row = {
+            "stage": name,
+            "items": items,
+            "seconds": round(seconds, 3),
+            "items_per_s": round(items / seconds, 1) if seconds > 0 else None,
+            "p50_ms": None if p50 is None else round(p50 * 1000, 2),
+            "p95_ms": None if p95 is None else round(p95 * 1000, 2),
+            "peak_rss_mb": _peak_rss_mb(),
+        }
+        self.rows.append(row)
+        rate = f"{row['items_per_s']:>11.1f}/s" if row["items_per_s"] is not None else f"{'':>13s}"
+        latency = f"p50 {row['p50_ms']:.1f} ms  p95 {row['p95_ms']:.1f} ms" if p50 is not None else ""
+        print(f"  {name:15s} {items:>9d} items {seconds:9.2f}s {rate}  rss {row['peak_rss_mb']:8.1f} MB  {latency}")
+
+
+async def _classify(chunks: list[dict], base_url: str, in_flight: int, workers: int):
+    """Classify through the fake server, timing each chunk from run start to its verdict."""
+    client = AsyncGroq(api_key="bench", base_url=base_url, max_retries=0)
+    t0 = time.perf_counter()
+    classified, latencies = [], []
+    try:
+        stream = C.iter_classified_async(
+            chunks, api_key="bench", log_fn=lambda line: None, heuristic_workers=workers,
+            use_cache=False, use_local_model=False, client=client, max_in_flight=in_flight,
+            scheduler=RateLimitScheduler(rpm=1_000_000, tpm=None),
+        )
+        async for item in stream:
+            latencies.append(time.perf_counter() - t0)
+            classified.append(item)
+    finally:
+        await client.close()
+    return classified, latencies
+
+
+def run(kind: str, n_messages: int, delay_s: float, in_flight: int, workers: int, seed: int) -> dict:
+    with tempfile.TemporaryDirectory(prefix="bench_pipeline_") as tmp:
+        work = Path(tmp)
+        t0 = time.perf_counter()
+        if kind == "enron":
+            corpus = write_enron_csv(work / "emails.csv", n_messages, seed)
+        else:
+            corpus = write_ami_json(work / "ami.json", n_messages, seed)
+        generate_s = time.perf_counter() - t0
+        corpus_bytes = corpus.stat().st_size
+        print(f"{kind}: {n_messages} messages, {corpus_bytes / 1e6:.1f} MB corpus "
+              f"(generated in {generate_s:.1f}s)  |  fake LLM {delay_s * 1000:.0f} ms, {in_flight} in flight")
+
+        aks.DB_BACKEND = "sqlite"
+        aks.SQLITE_DB_PATH = work / "aks.db"
+        aks.init_db()
+        stages = _Stages()
+
+        # Parse
+        t0 = time.perf_counter()
+        if kind == "enron":
+            chunks = enron_parser.parse_to_chunks(corpus)
+        else:
+            chunks = ami_parser.parse_to_chunks(corpus, source_type="json")
+        stages.add("parse", n_messages, time.perf_counter() - t0)
+
+        # Phase 1 alone
+        t0 = time.perf_counter()
+        fast, pending = C.run_parallel_heuristics(chunks, workers)
+        stages.add("heuristics", len(chunks), time.perf_counter() - t0)
+
+        with FakeLLMServer(delay_s=delay_s, jitter=JITTER, seed=seed, hashed_labels=True) as server:
+            # Classification
+            t0 = time.perf_counter()
+            classified, latencies = asyncio.run(_classify(chunks, server.base_url, in_flight, workers))
+            stages.add("classification", len(classified), time.perf_counter() - t0, latencies)
+            classify_requests = server.requests
+
+            # Storage
+            for c in classified:
+                c.session_id = SESSION_ID
+            batch_s = []
+            t0 = time.perf_counter()
+            for start in range(0, len(classified), STORE_BATCH):
+                t_batch = time.perf_counter()
+                aks.store_chunks(classified[start:start + STORE_BATCH])
+                batch_s.append(time.perf_counter() - t_batch)
+            stages.add("storage", len(classified), time.perf_counter() - t0, batch_s)
+
+            # BRD generation (snapshot + seven agents)
+            hedging._TRACKERS.pop(brd_pipeline.BRD_MODEL_NAME, None)
+            client = Groq(api_key="bench", base_url=server.base_url, max_retries=0)
+            t0 = time.perf_counter()
+            brd_pipeline.run_brd_generation(SESSION_ID, client=client)
+            brd_s = time.perf_counter() - t0
+            client.close()
+            brd_calls = list(hedging.get_latency_tracker(brd_pipeline.BRD_MODEL_NAME)._samples)
+            signals = len(aks.get_active_signals(SESSION_ID))
+            stages.add("brd_generation", signals, brd_s, brd_calls)
+
+        # Export
+        t0 = time.perf_counter()
+        document = exporter.export_brd(SESSION_ID)
+        stages.add("export", len(document), time.perf_counter() - t0)
+
+        db_bytes = sum(p.stat().st_size for p in work.glob("aks.db*"))
+        print(f"  AKS {db_bytes / 1e6:.1f} MB  |  {len(pending)} chunks past Phase 1  "
+              f"|  {classify_requests} classification requests  |  {len(brd_calls)} BRD calls")
+
+    return {
+        "benchmark": "pipeline",
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "corpus": {"kind": kind, "messages": n_messages, "bytes": corpus_bytes,
+                   "chunks": len(chunks), "seed": seed},
+        "settings": {"fake_delay_s": delay_s, "jitter": JITTER, "in_flight": in_flight,
+                     "heuristic_workers": workers, "store_batch": STORE_BATCH},
+        "stages": stages.rows,
+        "total_seconds": round(sum(r["seconds"] for r in stages.rows), 3),
+        "peak_rss_mb": _peak_rss_mb(),
+        "db_size_mb": round(db_bytes / 1e6, 2),
+        "llm_requests": {"classification": classify_requests, "brd": len(brd_calls)},
+        "labels": dict(Counter(c.label.value for c in classified)),
+    }
+
+
+def compare(before_path: str, after_path: str):
+    before, after = (json.loads(Path(p).read_text()) for p in (before_path, after_path))
+    print(f"{before.get('commit')} → {after.get('commit')}  "
+          f"({before['corpus']['kind']} {before['corpus']['messages']} → "
+          f"{after['corpus']['kind']} {after['corpus']['messages']} messages)")
+    rows = {r["stage"]: r for r in before["stages"]}
+    for new in after["stages"]:
+        old = rows.get(new["stage"])
+        if old is None or not old["seconds"]:
+            continue
+        change = (new["seconds"] - old["seconds"]) / old["seconds"] * 100
+        print(f"  {new['stage']:15s} {old['seconds']:9.2f}s → {new['seconds']:9.2f}s  ({change:+6.1f}%)  "
+              f"p95 {old['p95_ms']} → {new['p95_ms']} ms")
+    print(f"  {'peak RSS':15s} {before['peak_rss_mb']:9.1f} → {after['peak_rss_mb']:9.1f} MB  |  "
+          f"AKS {before['db_size_mb']} → {after['db_size_mb']} MB")
+
+
+def main():
+    args = sys.argv[1:]
+    if args[:1] == ["--compare"]:
+        if len(args) != 3:
+            print(__doc__)
+            sys.exit(1)
+        compare(args[1], args[2])
+        return
+
+    options = {"--out": None, "--delay": DELAY_S, "--in-flight": C.MAX_CONCURRENT_BATCHES,
+               "--workers": None, "--seed": 0}
+    positional = []
+    while args:
+        arg = args.pop(0)
+        if arg in options:
+            if not args:
+                print(__doc__)
+                sys.exit(1)
+            options[arg] = args.pop(0)
+        else:
+            positional.append(arg)
+    kind = positional[0] if positional else "enron"
+    if kind not in ("enron", "ami"):
+        print(__doc__)
+        sys.exit(1)
+    n_messages = int(positional[1]) if len(positional) > 1 else 1_000
+    workers = options["--workers"]
+
+    with span("bench.pipeline", corpus=kind, messages=n_messages):     # one trace when TRACE_PATH is set
+        report = run(kind, n_messages, float(options["--delay"]), int(options["--in-flight"]),
+                     None if workers is None else int(workers), int(options["--seed"]))
+    text = json.dumps(report, indent=2)
+    if options["--out"]:
+        Path(options["--out"]).write_text(text + "\n")
+        print(f"Report written to {options['--out']}")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+bench_prompt_modes.py
+Input/output tokens and latency per chunk for the full and compact batch
+prompt modes (classifier.PROMPT_MODE).
+
+Without GROQ_CLOUD_API (environment or "Noise filter module/.env") the
+benchmark is offline: prompt tokens are estimated with approx_tokens over
+the packed batches, and output tokens over a rendered answer of typical
+size (the compact figure includes the EXPLAIN
+pass for the expected share of low-confidence verdicts). "fixed prefix" is
+the part of the input that is identical on every request: the definitions
+template in full mode, COMPACT_SYSTEM_PROMPT in compact mode, where it sits
+in the system message so the provider can cache it. With a key, each
+mode classifies the same sample through classify_batch_with_llm and the
+provider's reported usage and wall-clock latency are used instead.
+
+Usage:
+    python benchmarks/bench_prompt_modes.py [n_chunks] [low_confidence_share]
+    GROQ_CLOUD_API=... python benchmarks/bench_prompt_modes.py 100
+
+To repeat a live measurement without the provider, record it once through
+the fake server and replay it afterwards (same responses, no network):
+    python "Noise filter module/fake_llm_server.py" --record modes.jsonl     # or --replay modes.jsonl
+    GROQ_BASE_URL=http://127.0.0.1:8765 GROQ_CLOUD_API=... python benchmarks/bench_prompt_modes.py 100
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(_ROOT / "Noise filter module"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from dotenv import load_dotenv  # noqa: E402
+
+load_dotenv(_ROOT / "Noise filter module" / ".env")
+
+import classifier as C  # noqa: E402
+from bench_heuristics import load_ami_turns  # noqa: E402
+from bench_near_dedup import synthetic_enron  # noqa: E402
+from prompts import (  # noqa: E402
+    COMPACT_SYSTEM_PROMPT, build_batch_classification_prompt, build_compact_batch_prompt,
+    build_compact_reasoning_prompt,
+)
+from rate_limiter import approx_tokens  # noqa: E402
+
+_TYPICAL_REASONING = "The speaker states a concrete need for the reporting system being built."
+
+
+def sample_pending(n_chunks: int) -> list[tuple[int, dict]]:
+    """LLM-bound chunks from the synthetic Enron corpus and the AMI turns."""
+    chunks = synthetic_enron(n_chunks) + load_ami_turns()
+    _, pending = C.run_parallel_heuristics(chunks, workers=1)
+    return pending[:n_chunks]
+
+
+def estimate(pending: list[tuple[int, dict]], low_share: float) -> dict[str, dict]:
+    out = {}
+    for mode in ("full", "compact"):
+        tokens_in = tokens_out = requests = fixed = 0
+        for batch in C.pack_batches(pending, prompt_mode=mode):
+            chunks = [c for _, c in batch]
+            requests += 1
+            if mode == "full":
+                tokens_in += approx_tokens(C._JSON_SYSTEM_PROMPT) + approx_tokens(
+                    build_batch_classification_prompt(chunks))
+                fixed += C._BATCH_TEMPLATE_TOKENS
+                tokens_out += approx_tokens(json.dumps({"results": [
+                    {"index": i, "label": "requirement", "confidence": 0.95, "reasoning": _TYPICAL_REASONING}
+                    for i in range(len(chunks))]}))
+                continue
+            tokens_in += approx_tokens(COMPACT_SYSTEM_PROMPT) + approx_tokens(build_compact_batch_prompt(chunks))
+            fixed += approx_tokens(COMPACT_SYSTEM_PROMPT)
+            tokens_out += approx_tokens(json.dumps({"r": [[i, "R", 0.95] for i in range(len(chunks))]}))
+            unsure = chunks[:round(len(chunks) * low_share)]
+            if unsure:
+                requests += 1
+                tokens_in += approx_tokens(COMPACT_SYSTEM_PROMPT) + approx_tokens(
+                    build_compact_reasoning_prompt([(c, "requirement", 0.8) for c in unsure]))
+                fixed += approx_tokens(COMPACT_SYSTEM_PROMPT)
+                tokens_out += approx_tokens(json.dumps({"r": [[i, _TYPICAL_REASONING] for i in range(len(unsure))]}))
+        out[mode] = {"requests": requests, "input_tokens": tokens_in, "fixed_tokens": fixed,
+                     "output_tokens": tokens_out, "latency_s": None}
+    return out
+
+
+class _MeteredClient:
+    """Wraps an AsyncGroq client, summing reported token usage and request latency."""
+
+    def __init__(self, client):
+        self.client = client
+        self.requests = self.input_tokens = self.output_tokens = 0
+        self.latency_s = 0.0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, **kwargs):
+        t0 = time.perf_counter()
+        response = await self.client.chat.completions.create(**kwargs)
+        self.latency_s += time.perf_counter() - t0
+        self.requests += 1
+        usage = getattr(response, "usage", None)
+        self.input_tokens += getattr(usage, "prompt_tokens", 0) or 0
+        self.output_tokens += getattr(usage, "completion_tokens", 0) or 0
+        return response
+
+
+async def measure(pending: list[tuple[int, dict]], api_key: str) -> dict[str, dict]:
+    from groq import AsyncGroq
+
+    out = {}
+    for mode in ("full", "compact"):
+        client = _MeteredClient(AsyncGroq(api_key=api_key))
+        try:
+            for batch in C.pack_batches(pending, prompt_mode=mode):
+                await C.classify_batch_with_llm_async(batch, client, prompt_mode=mode)
+        finally:
+            await client.client.close()
+        out[mode] = {"requests": client.requests, "input_tokens": client.input_tokens,
+                     "fixed_tokens": None, "output_tokens": client.output_tokens,
+                     "latency_s": client.latency_s}
+    return out
+
+
+def report(results: dict[str, dict], n: int, live: bool):
+    print(f"{n} LLM-bound chunks ({'measured' if live else 'estimated, offline'})")
+    print(f"  {'mode':8s} {'requests':>8s} {'in tok/chunk':>13s} {'fixed prefix':>13s} "
+          f"{'out tok/chunk':>14s} {'latency/chunk':>14s}")
+    for mode, r in results.items():
+        latency = f"{r['latency_s'] * 1000 / n:.0f} ms" if r["latency_s"] is not None else "n/a"
+        fixed = f"{r['fixed_tokens'] / n:.1f}" if r["fixed_tokens"] is not None else "n/a"
+        print(f"  {mode:8s} {r['requests']:8d} {r['input_tokens'] / n:13.1f} {fixed:>13s} "
+              f"{r['output_tokens'] / n:14.1f} {latency:>14s}")
+    full, compact = results["full"], results["compact"]
+    print(f"  compact vs full: input {compact['input_tokens'] / full['input_tokens'] - 1:+.0%}, "
+          f"output {compact['output_tokens'] / full['output_tokens'] - 1:+.0%}")
+
+
+def main():
+    n_chunks = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    low_share = float(sys.argv[2]) if len(sys.argv) > 2 else 0.15
+    pending = sample_pending(n_chunks)
+    api_key = os.getenv("GROQ_CLOUD_API", "").split(",")[0].strip()     # one key: latency per request
+    if api_key:
+        report(asyncio.run(measure(pending, api_key)), len(pending), live=True)
+    else:
+        print("(GROQ_CLOUD_API not set — estimating tokens offline; latency needs a live run)")
+        report(estimate(pending, low_share), len(pending), live=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+bench_strip_boilerplate.py
+enron_parser.strip_boilerplate (one line scan) against the previous
+six-regex version (_strip_boilerplate_regex):
+  corpus       — message bodies of a synthetic Enron sample, cleaned the way
+                 _row_chunks does it: flatten_thread, then strip_boilerplate
+                 again on every segment (free for the line scan: its output
+                 is marked as already clean)
+  pathological — inputs on which the old patterns backtrack: long runs of
+                 blank lines (^\\s* of the forwarded-header pattern) and of
+                 dashes (-{3,} in the thread splitter)
+Corpora come from synthetic_corpus.py (seeded).
+
+Usage:
+    python benchmarks/bench_strip_boilerplate.py [n_messages]
+"""
+
+from __future__ import annotations
+
+import csv
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(_ROOT / "Noise filter module"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import enron_parser  # noqa: E402
+
+PATHOLOGICAL_SIZES = (2_000, 8_000, 32_000)
+_OLD_THREAD_DIVIDER = re.compile(
+    r"-{3,}\s*(?:Original Message|Forwarded by|Forwarded Message)[^\n]*\n", re.IGNORECASE)
+
+
+def _old_pipeline(body: str) -> list[str]:
+    """flatten_thread + strip_boilerplate as they were before the line scan."""
+    strip = enron_parser._strip_boilerplate_regex
+    parts = [strip(part) for part in _OLD_THREAD_DIVIDER.split(body)]
+    segments = [part for part in parts if part and len(part.split()) >= 3] or [body.strip()]
+    return [strip(segment) for segment in segments]
+
+
+def _new_pipeline(body: str) -> list[str]:
+    return [enron_parser.strip_boilerplate(segment) for segment in enron_parser.flatten_thread(body)]
+
+
+def _best_of(fn, inputs, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for text in inputs:
+            fn(text)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _bodies(n: int) -> list[str]:
+    from synthetic_corpus import write_enron_csv
+
+    with tempfile.TemporaryDirectory(prefix="bench_strip_") as tmp:
+        path = write_enron_csv(Path(tmp) / "emails.csv", n)
+        with path.open(newline="", encoding="utf-8") as f:
+            return [enron_parser.parse_raw_message(row["message"]).get("body", "") for row in csv.DictReader(f)]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    bodies = _bodies(n)
+    assert [_new_pipeline(b) for b in bodies] == [_old_pipeline(b) for b in bodies]
+    mb = sum(len(b) for b in bodies) / 1e6
+    print(f"corpus: {n} messages, {mb:.1f} MB of bodies")
+    print(f"  {'':28s} {'regex s':>9s} {'scan s':>9s} {'speedup':>8s}")
+    for name, old, new in (
+        ("strip_boilerplate", enron_parser._strip_boilerplate_regex, enron_parser.strip_boilerplate),
+        ("flatten + strip (pipeline)", _old_pipeline, _new_pipeline),
+    ):
+        t_old, t_new = _best_of(old, bodies), _best_of(new, bodies)
+        print(f"  {name:28s} {t_old:>9.3f} {t_new:>9.3f} {t_old / t_new:>7.1f}x")
+
+    print("pathological inputs (one text each):")
+    print(f"  {'':28s} {'size':>7s} {'regex s':>9s} {'scan s':>9s}")
+    for size in PATHOLOGICAL_SIZES:
+        for name, text in (("blank lines", "Status\n" + "\n" * size + "end of note"),
+                           ("dash run", "Status\n" + "-" * size + " end of note\n")):
+            t_old = _best_of(_old_pipeline, [text], repeat=1)
+            t_new = _best_of(_new_pipeline, [text], repeat=1)
+            print(f"  {name:28s} {size:>7d} {t_old:>9.3f} {t_new:>9.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+synthetic_corpus.py
+Seeded synthetic corpora at any size, in the input formats the pipeline
+parses: an Enron-style CSV (file, message — raw RFC 822 text with quoted
+reply chains, forwarded blocks, disclaimers and signatures, as in the Kaggle
+emails.csv) and AMI-style meeting JSON (meeting_id / transcript turns).
+Both are written row by row, so 1M-message corpora never sit in memory.
+
+Usage:
+    python benchmarks/synthetic_corpus.py enron <n_messages> <out.csv> [seed]
+    python benchmarks/synthetic_corpus.py ami <n_turns> <out.json> [seed]
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import random
+import sys
+from pathlib import Path
+
+TURNS_PER_MEETING = 400
+
+_PEOPLE = ["Sara Shackleton", "Vince Kaminski", "Kay Mann", "Jeff Dasovich", "Tana Jones",
+           "Mark Taylor", "Louise Kitchen", "Greg Whalley", "Sally Beck", "Rick Buy"]
+
+_SIGNALS = [
+    "The risk dashboard must show daily gas volumes per trading desk.",
+    "Finance needs the settlement report to reconcile with the ledger system by 9am.",
+    "We decided to move the deal capture module onto the new Oracle database.",
+    "Users asked for an export of counterparty credit data to Excel.",
+    "The scheduling interface should flag nominations that exceed pipeline capacity.",
+    "Legal wants an audit trail for every change to a confirmed trade.",
+    "Performance of the position report degrades when more than fifty books are loaded.",
+    "The integration with the EOL platform has to support real-time price feeds.",
+    "Access to the credit workflow should be limited to the risk group.",
+    "Phase 2 of the implementation is due at the end of the quarter.",
+    "The architecture review approved the message bus design for trade events.",
+    "Traders complained that the application freezes during month-end close.",
+]
+
+_CHATTER = [
+    "Thanks, sounds good.",
+    "Can we meet Tuesday at 2pm to go over this?",
+    "I am out of the office until Monday with limited access to email.",
+    "Please see the attached and let me know if you have questions.",
+    "Lunch is on the 32nd floor today.",
+    "Did anyone find my badge in the conference room?",
+    "FYI - the parking garage will be closed this weekend.",
+]
+
+_DISCLAIMER = ("This e-mail is the property of Enron Corp. and/or its relevant affiliate and may contain "
+               "confidential and privileged material for the sole use of the intended recipient(s).")
+
+_MEETING_TURNS = [
+    "I think the remote control should have a big scroll wheel for the channels.",
+    "We need the design to fit the corporate colours and the logo has to be visible.",
+    "So we agreed the battery will be a standard double A, not a rechargeable one.",
+    "Users told us they lose the remote all the time, so a locator beep would help.",
+    "The final prototype has to be ready for the presentation in two weeks.",
+    "Um, okay, shall we take a short break and get some coffee?",
+    "Can you see the slides? I'll share my screen again.",
+    "The production cost must stay under twelve and a half euros per unit.",
+    "Marketing found that young people prefer a fancy look and feel over functions.",
+    "Right then, let's continue with the next point on the agenda.",
+]
+
+
+def _address(name: str) -> str:
+    return name.lower().replace(" ", ".") + "@enron.com"
+
+
+def _body(rng: random.Random) -> str:
+    lines = rng.sample(_SIGNALS, rng.randint(0, 3)) + rng.sample(_CHATTER, rng.randint(1, 3))
+    rng.shuffle(lines)
+    return " ".join(lines)
+
+
+def synthetic_message(i: int, rng: random.Random) -> str:
+    """One raw email: an original, or a reply / forward carrying an earlier message below a divider."""
+    sender, recipient = rng.sample(_PEOPLE, 2)
+    parts = [_body(rng)]
+    kind = rng.random()
+    if kind < 0.35:
+        parts.append(f"\n\n-----Original Message-----\nFrom: {recipient}\nSent: Monday, May 14, 2001 9:{i % 60:02d} AM\n"
+                     f"To: {sender}\nSubject: RE: project status\n\n{_body(rng)}")
+    elif kind < 0.5:
+        parts.append(f"\n\n---------------------- Forwarded by {recipient}/HOU/ECT on 05/14/2001 "
+                     f"09:{i % 60:02d} AM ---------------------------\n\n{_body(rng)}")
+    if rng.random() < 0.3:
+        parts.append(f"\n\n{sender}\nEnron North America\n713-853-{1000 + i % 9000}")
+    if rng.random() < 0.2:
+        parts.append(f"\n\n{_DISCLAIMER}")
+    subject = rng.choice(["project status", "RE: requirements", "meeting", "FW: report", "deal capture"])
+    return (f"Message-ID: <{i}.{rng.randrange(10**12)}.JavaMail.evans@thyme>\n"
+            f"Date: Mon, 14 May 2001 {i % 24:02d}:{i % 60:02d}:00 -0700 (PDT)\n"
+            f"From: {_address(sender)}\nTo: {_address(recipient)}\nSubject: {subject}\n"
+            f"Mime-Version: 1.0\nContent-Type: text/plain; charset=us-ascii\n"
+            f"Content-Transfer-Encoding: 7bit\nX-From: {sender}\nX-To: {recipient}\n\n" + "".join(parts))
+
+
+def write_enron_csv(path, n_messages: int, seed: int = 0) -> Path:
+    """Write n_messages synthetic emails in the emails.csv layout (file, message)."""
+    rng = random.Random(seed)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["file", "message"])
+        for i in range(n_messages):
+            writer.writerow([f"synthetic/inbox/{i}.", synthetic_message(i, rng)])
+    return path
+
+
+def write_ami_json(path, n_turns: int, seed: int = 0) -> Path:
+    """Write n_turns synthetic meeting turns as a JSON list of AMI-style meetings."""
+    rng = random.Random(seed)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    speakers = ["PM", "ID", "UI", "ME"]
+    with path.open("w", encoding="utf-8") as f:
+        f.write("[")
+        for m, start in enumerate(range(0, n_turns, TURNS_PER_MEETING)):
+            turns = []
+            for t in range(min(TURNS_PER_MEETING, n_turns - start)):
+                # Variants keep turns distinct, as in real transcripts (the parser drops exact repeats)
+                text = f"{rng.choice(_MEETING_TURNS)} ({rng.choice(['yeah', 'okay', 'so', 'right'])} item {start + t})"
+                second = t * 15
+                turns.append({"speaker": f"{rng.choice(speakers)}{m % 9}", "text": text,
+                              "start_time": f"{second // 3600:02d}:{second // 60 % 60:02d}:{second % 60:02d}",
+                              "end_time": f"{(second + 12) // 3600:02d}:{(second + 12) // 60 % 60:02d}:"
+                                          f"{(second + 12) % 60:02d}"})
+            meeting = {"meeting_id": f"SYN{m:05d}", "summary": "", "transcript": turns}
+            f.write(("," if m else "") + json.dumps(meeting))
+        f.write("]")
+    return path
+
+
+def main():
+    if len(sys.argv) < 4 or sys.argv[1] not in ("enron", "ami"):
+        print(__doc__)
+        sys.exit(1)
+    kind, n, out = sys.argv[1], int(sys.argv[2]), sys.argv[3]
+    seed = int(sys.argv[4]) if len(sys.argv) > 4 else 0
+    path = (write_enron_csv if kind == "enron" else write_ami_json)(out, n, seed)
+    print(f"Wrote {n} synthetic {kind} {'messages' if kind == 'enron' else 'turns'} to {path} "
+          f"({path.stat().st_size / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
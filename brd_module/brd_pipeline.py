@@ -4,9 +4,11 @@ Agents and orchestration for the BRD generation pipeline.
 """
 import os
 import json
+import asyncio
 import time
 import uuid
-from typing import List, Dict, Any
+import contextvars
+from typing import List, Dict, Any, Optional
 from datetime import datetime, timezone
 import concurrent.futures
 
@@ -17,50 +19,136 @@ _HERE = Path(__file__).parent
 load_dotenv(_HERE / ".env")
 
 from groq import Groq, APIConnectionError, RateLimitError, APIStatusError
+# The Groq circuit breaker is shared with the noise classifier, so an outage
+# seen by either side short-circuits both. make_client() spreads agent calls
+# over every configured key / endpoint (provider_pool.py). These live in
+# "Noise filter module", which the entry points (api routers, main.py) put on sys.path.
+from circuit_breaker import CLOSED, get_circuit_breaker
+from hedging import Deadline, get_latency_tracker, hedged_call
+from provider_pool import make_client
+from tracing import span, traced
 from brd_module.storage import create_snapshot, get_signals_for_snapshot, store_brd_section
 from brd_module.hitl.versioned_ledger import is_section_locked, get_section_content, create_new_version
 
+# ---------------------------------------------------------------------------
+# Deadlines and hedged requests (hedging.py, shared with the classifier)
+# ---------------------------------------------------------------------------
+
+BRD_MODEL_NAME = "meta-llama/llama-4-maverick-17b-128e-instruct"
+BRD_CALL_TIMEOUT_S = 120.0      # per LLM request
+BRD_RUN_BUDGET_S = 600.0        # whole run_brd_generation(); calls inside it share this deadline
+
+# Deadline of the current run, inherited by the agent threads
+_run_deadline: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar("brd_run_deadline", default=None)
+
+
+def _call_timeout() -> float:
+    """BRD_CALL_TIMEOUT_S, capped by what is left of the current run's budget."""
+    deadline = _run_deadline.get()
+    if deadline is None:
+        return BRD_CALL_TIMEOUT_S
+    return deadline.timeout(BRD_CALL_TIMEOUT_S)
+
+
+def _hedged_create(create, timeout: float):
+    """
+    Blocking hedged_call() over the synchronous create(), timed by the BRD
+    model's shared latency tracker. Each call runs its attempt and hedge on
+    two threads of its own: a losing attempt cannot be cancelled and runs on
+    until its own request timeout, so it must not hold a thread that another
+    agent's call is waiting for. Raises TimeoutError after `timeout` seconds
+    without an answer.
+    """
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix="brd_llm")
+
+    async def attempt(hedge: bool):
+        return await asyncio.get_running_loop().run_in_executor(pool, create)
+
+    async def run():
+        return await asyncio.wait_for(hedged_call(attempt, get_latency_tracker(BRD_MODEL_NAME)), timeout=timeout)
+
+    try:
+        return asyncio.run(run())
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"No LLM response within {timeout:.0f}s") from None
+    finally:
+        pool.shutdown(wait=False)
+
+
 def call_llm_with_retry(client: Groq, messages: List[Dict[str, str]], json_mode: bool = False, max_tokens: int = 2048) -> str:
-    """Rate limit handler reusing the exact same retry logic from classifier.py."""
-    MODEL_NAME = "meta-llama/llama-4-maverick-17b-128e-instruct"
+    """
+    Rate limit handler reusing the exact same retry logic from classifier.py.
+    Each request times out after BRD_CALL_TIMEOUT_S, or sooner when the
+    current run's BRD_RUN_BUDGET_S is nearly spent, and slow requests are
+    hedged with a duplicate (_hedged_create).
+    Calls go through the shared Groq circuit breaker: while it is open they
+    fail at once with "LLM API error: Groq circuit breaker open" instead of
+    waiting out timeouts and retries.
+    """
     response_format = {"type": "json_object"} if json_mode else None
+    breaker = get_circuit_breaker()
     
-    for attempt in range(2):
-        try:
-            chat_completion = client.chat.completions.create(
-                messages=messages,
-                model=MODEL_NAME,
-                temperature=0.0,
-                max_tokens=max_tokens,
-                response_format=response_format,
-            )
-            raw = chat_completion.choices[0].message.content
-            if not raw:
-                raise ValueError("Empty response from LLM")
-            return raw
-        except (ValueError, AttributeError) as e:
-            if attempt == 0:
-                time.sleep(1)
-                continue
-            raise Exception(f"LLM parse error: {e}")
-        except (APIConnectionError, RateLimitError, APIStatusError) as e:
-            if attempt == 0:
-                time.sleep(2)
-                continue
-            raise Exception(f"LLM API error: {e}")
-        except Exception as e:
-            if "JSON" in str(e) and attempt == 0:
-                time.sleep(1)
-                continue
-            raise Exception(f"LLM unexpected error: {e}")
+    with span("llm.request", model=BRD_MODEL_NAME, json_mode=json_mode, max_tokens=max_tokens) as call_span:
+        for attempt in range(2):
+            call_span.set(attempts=attempt + 1)
+            timeout = _call_timeout()
+            if timeout <= 0:
+                raise Exception("LLM API error: BRD run budget exhausted")
+            if not breaker.allow():
+                raise Exception("LLM API error: Groq circuit breaker open")
+            settled = False
+            try:
+                chat_completion = _hedged_create(lambda: client.chat.completions.create(
+                    messages=messages,
+                    model=BRD_MODEL_NAME,
+                    temperature=0.0,
+                    max_tokens=max_tokens,
+                    response_format=response_format,
+                    timeout=timeout,
+                ), timeout)
+                settled = True
+                breaker.record_success()
+                usage = getattr(chat_completion, "usage", None)
+                call_span.set(prompt_tokens=getattr(usage, "prompt_tokens", None),
+                              completion_tokens=getattr(usage, "completion_tokens", None),
+                              total_tokens=getattr(usage, "total_tokens", None))
+                raw = chat_completion.choices[0].message.content
+                if not raw:
+                    raise ValueError("Empty response from LLM")
+                return raw
+            except (ValueError, AttributeError) as e:
+                if attempt == 0:
+                    time.sleep(1)
+                    continue
+                raise Exception(f"LLM parse error: {e}")
+            except (APIConnectionError, RateLimitError, APIStatusError, TimeoutError) as e:
+                settled = True
+                # Connection errors, timeouts and 5xx mean Groq is down; a 429 or 4xx means it answered
+                if isinstance(e, RateLimitError) or getattr(e, "status_code", 500) < 500:
+                    breaker.record_success()
+                else:
+                    breaker.record_failure()
+                if attempt == 0 and breaker.state == CLOSED:
+                    time.sleep(min(2, max(0.0, _call_timeout())))
+                    continue
+                raise Exception(f"LLM API error: {e!r}")
+            except Exception as e:
+                if "JSON" in str(e) and attempt == 0:
+                    time.sleep(1)
+                    continue
+                raise Exception(f"LLM unexpected error: {e}")
+            finally:
+                if not settled:
+                    breaker.record_abandoned()
             
-    raise Exception("Max retries exceeded")
+        raise Exception("Max retries exceeded")
 
+@traced("brd.agent", section="functional_requirements")
 def functional_requirements_agent(session_id: str, snapshot_id: str, client: Groq = None, additional_context: str = "") -> str:
     if is_section_locked(session_id, 'functional_requirements') and not additional_context:
         return get_section_content(session_id, 'functional_requirements')
     if client is None:
-        client = Groq(api_key=os.environ.get("GROQ_CLOUD_API", ""))
+        client = make_client()
         
     reqs = get_signals_for_snapshot(snapshot_id, label_filter='requirement')
     
@@ -108,11 +196,12 @@ Output ONLY the final markdown content for this section. Do not wrap in markdown
     create_new_version(session_id, None, 'functional_requirements', content, 'system', snapshot_id=snapshot_id)
     return content
 
+@traced("brd.agent", section="stakeholder_analysis")
 def stakeholder_analysis_agent(session_id: str, snapshot_id: str, client: Groq = None, additional_context: str = "") -> str:
     if is_section_locked(session_id, 'stakeholder_analysis') and not additional_context:
         return get_section_content(session_id, 'stakeholder_analysis')
     if client is None:
-        client = Groq(api_key=os.environ.get("GROQ_CLOUD_API", ""))
+        client = make_client()
         
     all_signals = get_signals_for_snapshot(snapshot_id)
     
@@ -176,9 +265,10 @@ Output ONLY the final markdown content for this section. Do not wrap in markdown
     create_new_version(session_id, None, 'stakeholder_analysis', content, 'system', snapshot_id=snapshot_id)
     return content
 
+@traced("brd.agent", section="timeline")
 def timeline_agent(session_id: str, snapshot_id: str, client: Groq = None) -> str:
     if client is None:
-        client = Groq(api_key=os.environ.get("GROQ_CLOUD_API", ""))
+        client = make_client()
         
     timeline_refs = get_signals_for_snapshot(snapshot_id, label_filter='timeline_reference')
     
@@ -219,11 +309,12 @@ Output ONLY the final markdown content for this section. Do not wrap in markdown
     create_new_version(session_id, None, 'timeline', content, 'system', snapshot_id=snapshot_id)
     return content
 
+@traced("brd.agent", section="decisions")
 def decisions_agent(session_id: str, snapshot_id: str, client: Groq = None, additional_context: str = "") -> str:
     if is_section_locked(session_id, 'decisions') and not additional_context:
         return get_section_content(session_id, 'decisions')
     if client is None:
-        client = Groq(api_key=os.environ.get("GROQ_CLOUD_API", ""))
+        client = make_client()
         
     decision_refs = get_signals_for_snapshot(snapshot_id, label_filter='decision')
     
@@ -258,9 +349,10 @@ Output ONLY the final markdown content for this section.
     create_new_version(session_id, None, 'decisions', content, 'system', snapshot_id=snapshot_id)
     return content
 
+@traced("brd.agent", section="assumptions")
 def assumptions_agent(session_id: str, snapshot_id: str, client: Groq = None) -> str:
     if client is None:
-        client = Groq(api_key=os.environ.get("GROQ_CLOUD_API", ""))
+        client = make_client()
         
     all_refs = get_signals_for_snapshot(snapshot_id)
     if not all_refs:
@@ -294,9 +386,10 @@ Output ONLY the final markdown content for this section.
     store_brd_section(session_id, snapshot_id, 'assumptions', content, source_ids)
     return content
 
+@traced("brd.agent", section="success_metrics")
 def success_metrics_agent(session_id: str, snapshot_id: str, client: Groq = None) -> str:
     if client is None:
-        client = Groq(api_key=os.environ.get("GROQ_CLOUD_API", ""))
+        client = make_client()
         
     signals = []
     signals.extend(get_signals_for_snapshot(snapshot_id, label_filter='requirement'))
@@ -332,10 +425,11 @@ Output ONLY the final markdown content for this section.
     store_brd_section(session_id, snapshot_id, 'success_metrics', content, source_ids)
     return content
 
+@traced("brd.agent", section="executive_summary")
 def executive_summary_agent(session_id: str, snapshot_id: str, client: Groq = None) -> str:
     """Runs LAST after all other agents."""
     if client is None:
-        client = Groq(api_key=os.environ.get("GROQ_CLOUD_API", ""))
+        client = make_client()
         
     # We need to import this here if it's newly added to storage
     from brd_module.storage import get_latest_brd_sections
@@ -384,16 +478,26 @@ Output ONLY the final markdown content for this section.
     store_brd_section(session_id, snapshot_id, 'executive_summary', content, [])
     return content
 
+@traced("brd.generate")
 def run_brd_generation(session_id: str, client: Groq = None) -> str:
     """
     Main orchestration function for the BRD generation pipeline.
     Creates the snapshot, runs stages 2-6 in parallel, then runs stage 5 (executive summary).
+    All LLM calls of the run share one BRD_RUN_BUDGET_S deadline.
     """
     if client is None:
-        client = Groq(api_key=os.environ.get("GROQ_CLOUD_API", ""))
+        client = make_client()
         
     print(f"[{session_id}] Starting BRD Generation...")
+    # Every LLM call of this run, in any agent thread, shares one deadline
+    run_context = contextvars.copy_context()
+    run_context.run(_run_deadline.set, Deadline(BRD_RUN_BUDGET_S))
+    snapshot_id = run_context.run(_run_brd_stages, session_id, client)
+    print(f"[{session_id}] BRD Generation complete.  LLM latency: {get_latency_tracker(BRD_MODEL_NAME).summary()}")
     
+    return snapshot_id
+
+def _run_brd_stages(session_id: str, client: Groq) -> str:
     # Stage 1: Snapshot Creation
     snapshot_id = create_snapshot(session_id)
     print(f"[{session_id}] Snapshot {snapshot_id} created. Freezing DB state for this run.")
@@ -412,7 +516,7 @@ def run_brd_generation(session_id: str, client: Groq = None) -> str:
     print(f"[{session_id}] Launching {len(agents_to_run)} parallel agents...")
     with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
         future_to_agent = {
-            executor.submit(func, session_id, snapshot_id, client): name 
+            executor.submit(contextvars.copy_context().run, func, session_id, snapshot_id, client): name
             for name, func in agents_to_run
         }
         
@@ -428,8 +532,6 @@ def run_brd_generation(session_id: str, client: Groq = None) -> str:
     # Stage 5: Executive Summary (Runs last)
     print(f"[{session_id}] All parallel agents finished. Generating final Executive Summary...")
     executive_summary_agent(session_id, snapshot_id, client)
-    print(f"[{session_id}] BRD Generation complete.")
-    
     return snapshot_id
 
 def run_single_agent(
@@ -4,7 +4,8 @@ Compiles the latest version of all BRD sections into a single Markdown document,
 including a section for Validation Flags. Supports Markdown, PDF, and DOCX export
 with template-based formatting for DOCX.
 """
-from brd_module.storage import get_latest_brd_sections, get_connection
+from brd_module.storage import get_latest_brd_sections, get_connection, execute_query
+from tracing import traced
 from datetime import datetime, timezone
 import markdown
 import re
@@ -27,6 +28,7 @@ try:
 except ImportError:
     PYTHON_DOCX_AVAILABLE = False
 
+@traced("brd.export", format="markdown")
 def export_brd(session_id: str, title: str = "Business Requirements Document") -> str:
     """
     Fetches the latest BRD sections and any active validation flags,
@@ -52,17 +54,16 @@ def export_brd(session_id: str, title: str = "Business Requirements Document") -
     doc.append("---\n")
     
     # 1. Fetch Validation Flags
-    conn = get_connection()
+    conn, db_type = get_connection()
     flags = []
     try:
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT section_name, flag_type, severity, description 
-                FROM brd_validation_flags 
-                WHERE session_id = %s
-                ORDER BY severity DESC
-            """, (session_id,))
-            flags = cur.fetchall()
+        rows = execute_query(conn, db_type, """
+            SELECT section_name, flag_type, severity, description 
+            FROM brd_validation_flags 
+            WHERE session_id = %s
+            ORDER BY severity DESC
+        """, (session_id,), fetch=True)
+        flags = [(r['section_name'], r['flag_type'], r['severity'], r['description']) for r in rows]
     except Exception as e:
         doc.append(f"> **Warning:** Could not fetch validation flags: {e}\n")
     finally:
@@ -89,6 +90,7 @@ def export_brd(session_id: str, title: str = "Business Requirements Document") -
     return "\n".join(doc)
 
 
+@traced("brd.export", format="pdf")
 def export_brd_to_pdf(session_id: str, output_file: str = None, title: str = "Business Requirements Document") -> bytes:
     """
     Fetches the latest BRD sections and exports as PDF with enhanced formatting.
@@ -438,6 +440,7 @@ def _add_color_highlights(html_content: str) -> str:
     return html_content
 
 
+@traced("brd.export", format="docx")
 def export_brd_to_docx(session_id: str, output_file: str = None, title: str = "Business Requirements Document", template_path: str = None) -> bytes:
     """
     Export BRD as DOCX using template if available, otherwise generate from scratch.
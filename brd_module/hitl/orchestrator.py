@@ -1,10 +1,9 @@
-from groq import Groq
-import os
 from brd_module.storage import get_connection, create_snapshot
 from brd_module.hitl.nl_edit_parser import parse_ad_hoc_prompt, store_edit_intent, apply_edit
+from brd_module.brd_pipeline import make_client
 
 def get_groq_client():
-    return Groq(api_key=os.environ.get("GROQ_CLOUD_API", ""))
+    return make_client()
 
 def submit_ad_hoc_prompt(
     session_id: str,
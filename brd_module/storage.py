@@ -20,6 +20,8 @@ import sqlite3
 import uuid
 from datetime import datetime, timezone
 
+from tracing import current_span, span, traced
+
 # Load .env from the same directory as this script
 _HERE = Path(__file__).parent
 load_dotenv(_HERE / ".env")
@@ -30,9 +32,22 @@ DB_PORT = os.getenv("DB_PORT", "5432")
 DB_NAME = os.getenv("DB_NAME", "hackfest_aks")
 DB_USER = os.getenv("DB_USER", "postgres")
 DB_PASS = os.getenv("DB_PASS", "postgres")
+DB_BACKEND = os.getenv("DB_BACKEND", "auto")  # "auto": PostgreSQL if reachable, else SQLite; "sqlite": SQLite only
+
+# SQLite database path
+SQLITE_DB_PATH = _HERE / "aks_storage.db"
+
+def _sqlite_connection():
+    conn = sqlite3.connect(str(SQLITE_DB_PATH))
+    conn.row_factory = sqlite3.Row
+    return conn, "sqlite"
 
+@traced("db.connect")
 def get_connection():
     """Returns a connection to PostgreSQL if available, otherwise falls back to SQLite."""
+    if DB_BACKEND == "sqlite":
+        current_span().set(db_system="sqlite")
+        return _sqlite_connection()
     try:
         # Try PostgreSQL first
         conn = psycopg2.connect(
@@ -43,13 +58,12 @@ def get_connection():
             password=DB_PASS,
             connect_timeout=2
         )
+        current_span().set(db_system="postgresql")
         return conn, "postgres"
     except Exception:
         # Fallback to SQLite
-        sqlite_path = os.path.join(_HERE, "aks_storage.db")
-        conn = sqlite3.connect(sqlite_path)
-        conn.row_factory = sqlite3.Row
-        return conn, "sqlite"
+        current_span().set(db_system="sqlite")
+        return _sqlite_connection()
 
 def execute_query(conn, type, query, params=None, fetch=False):
     """Abstraction to handle parameter naming differences and cursor behavior."""
@@ -63,17 +77,19 @@ def execute_query(conn, type, query, params=None, fetch=False):
         cur = conn.cursor(cursor_factory=RealDictCursor)
         
     try:
-        cur.execute(query, params or ())
-        if fetch:
-            if type == "sqlite":
-                return [dict(row) for row in cur.fetchall()]
-            return cur.fetchall()
-        if type == "postgres":
-            conn.commit()
+        with span("db.query", db_system=type, db_statement=" ".join(query.split())[:120]) as s:
+            cur.execute(query, params or ())
+            if fetch:
+                rows = [dict(row) for row in cur.fetchall()] if type == "sqlite" else cur.fetchall()
+                s.set(rows=len(rows))
+                return rows
+            if type == "postgres":
+                conn.commit()
     finally:
         cur.close()
     return None
 
+@traced("aks.init_db")
 def init_db():
     """Creates the necessary tables using a compatible schema for both PG and SQLite."""
     conn, db_type = get_connection()
@@ -140,6 +156,7 @@ def init_db():
     finally:
         conn.close()
 
+@traced("aks.store_chunks")
 def store_chunks(chunks: List[ClassifiedChunk]):
     """Batch inserts chunks with DB fallback support."""
     if not chunks: return
@@ -179,6 +196,32 @@ def store_chunks(chunks: List[ClassifiedChunk]):
     finally:
         conn.close()
 
+@traced("aks.update_chunk_verdicts")
+def update_chunk_verdicts(chunks: List[ClassifiedChunk]):
+    """Overwrites label/flags of stored chunks (by chunk_id); manually restored chunks are skipped."""
+    if not chunks: return
+
+    conn, db_type = get_connection()
+    try:
+        query = """
+            UPDATE classified_chunks
+            SET label = %s, suppressed = %s, flagged_for_review = %s, data = %s
+            WHERE chunk_id = %s AND manually_restored = FALSE;
+        """
+        if db_type == "sqlite":
+            query = query.replace("%s", "?").replace(";", "").replace("FALSE", "0")
+
+        values = [
+            (c.label.value, c.suppressed, c.flagged_for_review, json.dumps(c.model_dump(mode="json")), str(c.chunk_id))
+            for c in chunks
+        ]
+        with conn.cursor() if db_type == "postgres" else conn as cur:
+            cur.executemany(query, values)
+            if db_type == "postgres": conn.commit()
+    finally:
+        conn.close()
+
+@traced("aks.get_active_signals")
 def get_active_signals(session_id: str = None) -> List[ClassifiedChunk]:
     """Retrieves all active chunks using abstracted query execution, optionally filtered by session."""
     conn, db_type = get_connection()
@@ -194,6 +237,7 @@ def get_active_signals(session_id: str = None) -> List[ClassifiedChunk]:
     finally:
         conn.close()
 
+@traced("aks.get_noise_items")
 def get_noise_items(session_id: str = None) -> List[ClassifiedChunk]:
     """Retrieves noise chunks using abstracted query execution, optionally filtered by session."""
     conn, db_type = get_connection()
@@ -209,6 +253,7 @@ def get_noise_items(session_id: str = None) -> List[ClassifiedChunk]:
     finally:
         conn.close()
 
+@traced("aks.restore_noise_item")
 def restore_noise_item(chunk_id: str):
     """
     Manually restores a misclassified noise chunk back to an active signal.
@@ -232,6 +277,7 @@ def restore_noise_item(chunk_id: str):
     finally:
         conn.close()
 
+@traced("aks.create_snapshot")
 def create_snapshot(session_id: str) -> str:
     """
     Creates a frozen snapshot of all active signals from AKS via get_active_signals().
@@ -243,17 +289,18 @@ def create_snapshot(session_id: str) -> str:
     
     conn, db_type = get_connection()
     try:
-        with conn.cursor() as cur:
-            cur.execute("""
-                INSERT INTO brd_snapshots (snapshot_id, session_id, created_at, chunk_ids)
-                VALUES (%s, %s, %s, %s)
-            """, (snapshot_id, session_id, datetime.now(timezone.utc), json.dumps(chunk_ids)))
-        conn.commit()
+        created_at = datetime.now(timezone.utc)
+        execute_query(conn, db_type, """
+            INSERT INTO brd_snapshots (snapshot_id, session_id, created_at, chunk_ids)
+            VALUES (%s, %s, %s, %s)
+        """, (snapshot_id, session_id, created_at.isoformat() if db_type == "sqlite" else created_at, json.dumps(chunk_ids)))
+        if db_type == "sqlite": conn.commit()
     finally:
         conn.close()
         
     return snapshot_id
 
+@traced("aks.get_signals_for_snapshot")
 def get_signals_for_snapshot(snapshot_id: str, label_filter: str = None) -> List[ClassifiedChunk]:
     """
     Queries AKS for chunks whose IDs are in the snapshot's chunk_ids array,
@@ -262,6 +309,19 @@ def get_signals_for_snapshot(snapshot_id: str, label_filter: str = None) -> List
     conn, db_type = get_connection()
     results = []
     try:
+        if db_type == "sqlite":
+            # Expand the snapshot's JSON id list inside SQLite: no bound-parameter limit on large snapshots
+            query = """
+                SELECT data FROM classified_chunks
+                WHERE chunk_id IN (SELECT value FROM json_each(
+                    (SELECT chunk_ids FROM brd_snapshots WHERE snapshot_id = %s)))
+            """
+            params = [snapshot_id]
+            if label_filter:
+                query += " AND label = %s"
+                params.append(label_filter)
+            rows = execute_query(conn, db_type, query, params=params, fetch=True)
+            return [ClassifiedChunk.model_validate(json.loads(r['data'])) for r in rows]
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
             cur.execute("SELECT chunk_ids FROM brd_snapshots WHERE snapshot_id = %s", (snapshot_id,))
             row = cur.fetchone()
@@ -287,31 +347,33 @@ def get_signals_for_snapshot(snapshot_id: str, label_filter: str = None) -> List
         conn.close()
     return results
 
+@traced("aks.store_brd_section")
 def store_brd_section(session_id: str, snapshot_id: str, section_name: str, content: str, source_chunk_ids: List[str], human_edited: bool = False):
     """Stores a generated BRD section with automatic version incrementing."""
     conn, db_type = get_connection()
     try:
-        with conn.cursor() as cur:
-            # Get next version number
-            cur.execute("""
-                SELECT COALESCE(MAX(version_number), 0) + 1 
-                FROM brd_sections 
-                WHERE session_id = %s AND section_name = %s
-            """, (session_id, section_name))
-            version_row = cur.fetchone()
-            version_number = version_row[0] if version_row else 1
-            
-            section_id = str(uuid.uuid4())
-            cur.execute("""
-                INSERT INTO brd_sections (
-                    section_id, session_id, snapshot_id, section_name, 
-                    version_number, content, source_chunk_ids, human_edited, generated_at
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """, (section_id, session_id, snapshot_id, section_name, version_number, content, json.dumps(source_chunk_ids), human_edited, datetime.now(timezone.utc)))
-        conn.commit()
+        rows = execute_query(conn, db_type, """
+            SELECT COALESCE(MAX(version_number), 0) + 1 AS next_version
+            FROM brd_sections 
+            WHERE session_id = %s AND section_name = %s
+        """, (session_id, section_name), fetch=True)
+        version_number = rows[0]['next_version'] if rows else 1
+        
+        section_id = str(uuid.uuid4())
+        generated_at = datetime.now(timezone.utc)
+        execute_query(conn, db_type, """
+            INSERT INTO brd_sections (
+                section_id, session_id, snapshot_id, section_name, 
+                version_number, content, source_chunk_ids, human_edited, generated_at
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, (section_id, session_id, snapshot_id, section_name, version_number, content,
+              json.dumps(source_chunk_ids), human_edited,
+              generated_at.isoformat() if db_type == "sqlite" else generated_at))
+        if db_type == "sqlite": conn.commit()
     finally:
         conn.close()
 
+@traced("aks.get_latest_brd_sections")
 def get_latest_brd_sections(session_id: str) -> Dict[str, str]:
     """Returns the latest generated content for each section name in a session."""
     conn, db_type = get_connection()
@@ -322,12 +384,14 @@ def get_latest_brd_sections(session_id: str) -> Dict[str, str]:
             from psycopg2.extras import RealDictCursor
             cur = conn.cursor(cursor_factory=RealDictCursor)
             
-        cur.execute("""
+        query = """
             SELECT section_name, content 
             FROM brd_sections 
             WHERE session_id = %s
             ORDER BY version_number DESC
-        """, (session_id,))
+        """
+        if db_type == "sqlite": query = query.replace("%s", "?")
+        cur.execute(query, (session_id,))
         rows = cur.fetchall()
         for r in rows:
             # Handle both dict-like and tuple-like row access
@@ -339,6 +403,7 @@ def get_latest_brd_sections(session_id: str) -> Dict[str, str]:
         conn.close()
     return sections
 
+@traced("aks.get_current_snapshot_id")
 def get_current_snapshot_id(session_id: str) -> str:
     """Helper to get the most recent snapshot ID for a session."""
     conn, db_type = get_connection()
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# brd_module imports the shared circuit breaker, hedging and tracing from the noise filter module
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                             "Noise filter module"))
@@ -0,0 +1,40 @@
+# tests/test_llm_circuit_breaker.py
+import time
+
+import pytest
+from groq import Groq
+
+import circuit_breaker
+from brd_pipeline import call_llm_with_retry
+from circuit_breaker import OPEN, CircuitBreaker
+from fake_llm_server import FakeLLMServer
+
+MESSAGES = [{"role": "user", "content": "Write the timeline section."}]
+
+@pytest.fixture
+def breaker():
+    breaker = CircuitBreaker(circuit_breaker.GROQ_BREAKER, failure_threshold=2)
+    circuit_breaker._BREAKERS[circuit_breaker.GROQ_BREAKER] = breaker
+    yield breaker
+    circuit_breaker._BREAKERS.clear()
+
+def test_open_breaker_fails_fast(breaker):
+    # Nothing listens on this port: every attempt is a connection error
+    client = Groq(api_key="test", base_url="http://127.0.0.1:9", max_retries=0)
+    with pytest.raises(Exception, match="LLM API error"):
+        call_llm_with_retry(client, MESSAGES)
+    assert breaker.state == OPEN
+
+    t0 = time.monotonic()
+    with pytest.raises(Exception, match="circuit breaker open"):
+        call_llm_with_retry(client, MESSAGES)
+    assert time.monotonic() - t0 < 0.05
+
+def test_breaker_opened_elsewhere_short_circuits(breaker):
+    breaker.record_failure()
+    breaker.record_failure()
+    with FakeLLMServer() as server:
+        client = Groq(api_key="test", base_url=server.base_url, max_retries=0)
+        with pytest.raises(Exception, match="circuit breaker open"):
+            call_llm_with_retry(client, MESSAGES)
+        assert server.requests == 0
@@ -0,0 +1,46 @@
+# tests/test_llm_deadlines.py
+import time
+import contextvars
+
+import pytest
+from groq import Groq
+
+import brd_pipeline
+import hedging
+from brd_pipeline import call_llm_with_retry
+from hedging import Deadline, get_latency_tracker
+from fake_llm_server import FakeLLMServer
+
+MESSAGES = [{"role": "user", "content": "Write the timeline section."}]
+
+@pytest.fixture(autouse=True)
+def fresh_latencies():
+    hedging._TRACKERS.clear()
+    yield
+    hedging._TRACKERS.clear()
+
+def test_slow_call_is_hedged():
+    tracker = get_latency_tracker(brd_pipeline.BRD_MODEL_NAME)
+    for _ in range(tracker.min_samples):
+        tracker.record(0.05)
+    with FakeLLMServer(delay_fn=lambda n: 3.0 if n == 1 else 0.01) as server:
+        client = Groq(api_key="test", base_url=server.base_url, max_retries=0)
+        t0 = time.monotonic()
+        content = call_llm_with_retry(client, MESSAGES)
+        elapsed = time.monotonic() - t0
+
+    assert content.startswith("Generated section text")
+    assert elapsed < 2
+    assert tracker.hedge_wins >= 1
+
+def test_run_deadline_bounds_each_call():
+    with FakeLLMServer(delay_s=5) as server:
+        client = Groq(api_key="test", base_url=server.base_url, max_retries=0)
+        ctx = contextvars.copy_context()
+        ctx.run(brd_pipeline._run_deadline.set, Deadline(0.5))
+        t0 = time.monotonic()
+        with pytest.raises(Exception, match="LLM API error"):
+            ctx.run(call_llm_with_retry, client, MESSAGES)
+        elapsed = time.monotonic() - t0
+
+    assert elapsed < 2
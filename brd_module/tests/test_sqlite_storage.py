@@ -0,0 +1,39 @@
+# tests/test_sqlite_storage.py
+# Snapshot → BRD sections → export on the SQLite fallback (no PostgreSQL needed).
+import uuid
+
+import pytest
+
+from brd_module import exporter
+from brd_module import storage as aks
+from schema import ClassifiedChunk, SignalLabel
+
+@pytest.fixture(autouse=True)
+def sqlite_aks(monkeypatch, tmp_path):
+    monkeypatch.setattr(aks, "DB_BACKEND", "sqlite")
+    monkeypatch.setattr(aks, "SQLITE_DB_PATH", tmp_path / "aks.db")
+    aks.init_db()
+
+def _chunk(session_id, text, label, suppressed=False):
+    return ClassifiedChunk(chunk_id=str(uuid.uuid4()), session_id=session_id, source_ref="t", raw_text=text,
+                           cleaned_text=text, label=label, confidence=0.9, reasoning="r", suppressed=suppressed)
+
+def test_snapshot_sections_and_export_on_sqlite():
+    session_id = "sqlite_session"
+    req = _chunk(session_id, "The system must support SSO.", SignalLabel.REQUIREMENT)
+    dec = _chunk(session_id, "We will use AWS.", SignalLabel.DECISION)
+    noise = _chunk(session_id, "Lunch?", SignalLabel.NOISE, suppressed=True)
+    other = _chunk("other_session", "The portal must export CSV.", SignalLabel.REQUIREMENT)
+    aks.store_chunks([req, dec, noise, other])
+
+    snapshot_id = aks.create_snapshot(session_id)
+    assert {c.chunk_id for c in aks.get_signals_for_snapshot(snapshot_id)} == {req.chunk_id, dec.chunk_id}
+    assert [c.chunk_id for c in aks.get_signals_for_snapshot(snapshot_id, label_filter="requirement")] == [req.chunk_id]
+
+    aks.store_brd_section(session_id, snapshot_id, "functional_requirements", "v1", [req.chunk_id])
+    aks.store_brd_section(session_id, snapshot_id, "functional_requirements", "v2", [req.chunk_id])
+    assert aks.get_latest_brd_sections(session_id) == {"functional_requirements": "v2"}
+
+    document = exporter.export_brd(session_id)
+    assert "## 2. Functional Requirements\n\nv2" in document
+    assert "Could not fetch validation flags" not in document
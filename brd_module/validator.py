@@ -16,7 +16,8 @@ _HERE = Path(__file__).parent
 load_dotenv(_HERE / ".env")
 
 from brd_module.storage import get_latest_brd_sections, get_connection
-from brd_module.brd_pipeline import call_llm_with_retry
+from brd_module.brd_pipeline import call_llm_with_retry, make_client
+from tracing import traced
 
 def store_validation_flag(session_id: str, section_name: str, flag_type: str, description: str, severity: str):
     conn = get_connection()
@@ -32,13 +33,14 @@ def store_validation_flag(session_id: str, section_name: str, flag_type: str, de
     finally:
         conn.close()
 
+@traced("brd.validate")
 def validate_brd(session_id: str, client: Groq = None):
     """
     Runs rule-based and AI-semantic validation on the current session's BRD.
     Records flags to brd_validation_flags.
     """
     if client is None:
-        client = Groq(api_key=os.environ.get("GROQ_CLOUD_API", ""))
+        client = make_client()
         
     sections = get_latest_brd_sections(session_id)
     if not sections: